@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+"""
+Micro-benchmarks for mLJR hot paths, runnable offline from a source checkout
+
+Usage:
+    python benchmarks/bench.py                       # all, JSON to stdout
+    python benchmarks/bench.py -k formula mljr       # only names containing any of the words
+    python benchmarks/bench.py -o new.json --compare baseline.json
+    python benchmarks/bench.py -k startup --import-budget 50
+
+Each benchmark is timed in samples, every sample runs the operation enough times
+to last about --min-time seconds, reported per operation:
+    ops_per_sec (by median), min, mean, p50, p90, p99 (seconds)
+
+Time of `import mljr` in a new interpreter is reported as import_time (seconds),
+exit 1 when it is over --import-budget
+"""
+
+import os
+import sys
+import time
+import json
+import math
+import platform
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mljr import mljr
+
+
+SAMPLES = os.path.join(ROOT, 'samples')
+
+# pathological formulas: long, separators everywhere, legacy two-letter elements
+FORMULAS = {
+    'simple'      : 'C5H14NO Cl',
+    'separated'   : 'C2 - H3 - O4 - N5 - Br - Cl2',
+    'legacy'      : 'c3h4o5br1cl2brclbrcl',
+    'long'        : ' - '.join(['C{:}H{:}'.format(i,2*i) for i in range(1,101)]),
+    'standard'    : 'NaCl CoCl2 C6H12O6 MgSO4',
+}
+
+# SMILES: ionic, aromatic cation with a long chain, fused rings
+SMILES = {
+    'choline-chloride' : 'C[N+](C)(C)CCO.[Cl-]',
+    'imidazolium'      : 'CCCCCCCCCCCC[n+]1ccn(C)c1.[Br-]',
+    'fused'            : 'O=C(O)c1ccc2ccccc2c1',
+}
+
+
+
+def func_percentile(values, q):
+    """values are sorted, q in range [0, 100], linear interpolation"""
+    if len(values) == 1: return values[0]
+    k = (len(values) - 1) * q / 100
+    f = math.floor(k)
+    c = min(f + 1, len(values) - 1)
+    return values[f] + (values[c] - values[f]) * (k - f)
+
+
+
+def func_timeit(func, min_time=0.02, samples=30):
+    """
+    Parameters:
+        func     : callable without arguments, one operation
+        min_time : seconds, minimum duration of one sample
+        samples  : number of samples
+
+    Return:
+        dict, seconds per operation
+    """
+    # calibrate number of operations per sample
+    number = 1
+    while True:
+        beg = time.perf_counter()
+        for i in range(number): func()
+        dt = time.perf_counter() - beg
+        if dt >= min_time or number >= 1000000: break
+        number = max(number*2, int(number * min_time / max(dt,1e-9)))
+
+    times = []
+    for n in range(samples):
+        beg = time.perf_counter()
+        for i in range(number): func()
+        times.append((time.perf_counter() - beg) / number)
+    times.sort()
+    p50 = func_percentile(times,50)
+    return {
+        'ops_per_sec' : 1.0 / p50 if p50 > 0 else None,
+        'min'         : times[0],
+        'mean'        : sum(times) / len(times),
+        'p50'         : p50,
+        'p90'         : func_percentile(times,90),
+        'p99'         : func_percentile(times,99),
+        'samples'     : samples,
+        'number'      : number,
+    }
+
+
+
+def func_import_time(runs=10):
+    """
+    Return:
+        float, seconds, best of runs of `import mljr` in new interpreters, interpreter startup is excluded
+    """
+    code = 'import time; beg = time.perf_counter(); import mljr; print(time.perf_counter() - beg)'
+    times = []
+    for i in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, stdout=subprocess.PIPE, check=True).stdout
+        times.append(float(out))
+    return min(times)
+
+
+
+def func_pro_benchmarks():
+    """
+    Return:
+        1D list, [ [name, callable], ... ], in sequence of stages
+    """
+    benchs = []
+    files = sorted([os.path.join(SAMPLES,f) for f in os.listdir(SAMPLES) if f.endswith('.txt')])
+
+    # input files
+    for f in files:
+        benchs.append(['profile/' + os.path.basename(f)[:-4], lambda f=f: mljr.func_profile(f)])
+
+    # molecular formula, cached (repeated inputs) and cold (cache cleared for every call)
+    def fcold(S):
+        mljr._FORMULA_CACHE.clear()
+        return mljr.func_calc_M(S)
+    for k,S in FORMULAS.items():
+        benchs.append(['formula/{:}-cached'.format(k), lambda S=S: mljr.func_calc_M(S)])
+        benchs.append(['formula/{:}-cold'.format(k), lambda S=S: fcold(S)])
+
+    # group resolution, same as used by main
+    log, ccl = mljr.func_pro_jdict(mljr.TEMPLATE_CCL)
+    log, ccg = mljr.func_pro_jdict(mljr.TEMPLATE_CCG)
+    benchs.append(['groups/tables-rebuild', lambda: mljr.func_group_tables(rebuild=True)])
+    benchs.append(['groups/resolve-purity', lambda: mljr.func_pro_component(ccl)])
+    def fsmiles(S):
+        mljr._SMILES_CACHE.clear()
+        return mljr.func_pro_smiles(S)
+    for k,S in SMILES.items():
+        benchs.append(['smiles/{:}-cached'.format(k), lambda S=S: mljr.func_pro_smiles(S)])
+        benchs.append(['smiles/{:}-cold'.format(k), lambda S=S: fsmiles(S)])
+    benchs.append(['groups/resolve-mixture',
+                   lambda: [mljr.func_pro_component(ccg,1), mljr.func_pro_component(ccg,2)]])
+
+    # equations, component cache disabled (cold) or enabled (warm)
+    log, m, table = mljr.func_pro_component(ccl)
+    log, m1, table1 = mljr.func_pro_component(ccg,1)
+    log, m2, table2 = mljr.func_pro_component(ccg,2)
+    # MLJR.cache is global, it is always restored, benchmarks never depend on run order
+    def fpurity(cache):
+        saved, mljr.MLJR.cache = mljr.MLJR.cache, cache
+        try:
+            rst = mljr.MLJR(type='purity', table=table, m=m)
+            rst.run()
+        finally:
+            mljr.MLJR.cache = saved
+        return rst
+    def fmixture(cache):
+        saved, mljr.MLJR.cache = mljr.MLJR.cache, cache
+        try:
+            rst = mljr.MLJR(type='mixture', table1=table1, table2=table2, m1=m1, m2=m2, y1=1/3, y2=2/3)
+            rst.run()
+        finally:
+            mljr.MLJR.cache = saved
+        return rst
+    warm = mljr.LRUCache()
+    benchs.append(['mljr/purity-cold', lambda: fpurity(None)])
+    benchs.append(['mljr/purity-warm', lambda: fpurity(warm)])
+    benchs.append(['mljr/mixture-cold', lambda: fmixture(None)])
+    benchs.append(['mljr/mixture-warm', lambda: fmixture(warm)])
+
+    rst = fpurity(None)
+    benchs.append(['property/density', lambda: mljr.func_calc_density(rst.m,298.15,rst.Tc,rst.Pc,rst.Vc,rst.Tb)])
+    benchs.append(['property/st', lambda: mljr.func_calc_st(350.0,56.0,298.15,rst.Tc)])
+    if mljr.func_numpy() is not None:
+        temps = mljr.np.linspace(273.15, rst.Tc-1, 1000)
+        benchs.append(['property/density-1000T',
+                       lambda: mljr.func_calc_density(rst.m,temps,rst.Tc,rst.Pc,rst.Vc,rst.Tb)])
+        benchs.append(['property/st-1000T', lambda: mljr.func_calc_st(temps,56.0,298.15,rst.Tc)])
+        grad = mljr.MLJR(type='purity', table=table, m=m)
+        benchs.append(['gradients/purity', lambda: grad.gradients(298.15,298.15,50.0)])
+
+    # end to end, in process (default component cache) and as a new interpreter
+    benchs.append(['e2e/compute-purity', lambda: mljr.compute(mljr.TEMPLATE_CCL, calc=[298.15])])
+    if files:
+        cmd = [sys.executable, '-m', 'mljr', '-f', files[0]]
+        benchs.append(['e2e/cli', lambda: subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)])
+    cmd_version = [sys.executable, '-m', 'mljr', '-v']
+    benchs.append(['startup/version',
+                   lambda: subprocess.run(cmd_version, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)])
+    return benchs
+
+
+
+def func_compare(results, baseline, threshold):
+    """
+    Compare ops_per_sec with baseline results
+
+    Return:
+        1D list of str, benchmarks slower than (1 - threshold) of baseline
+    """
+    base = dict([(b['name'],b) for b in baseline['benchmarks']])
+    slower = []
+    for b in results['benchmarks']:
+        if b['name'] not in base or not b['ops_per_sec'] or not base[b['name']]['ops_per_sec']: continue
+        ratio = b['ops_per_sec'] / base[b['name']]['ops_per_sec']
+        b['ratio'] = ratio
+        if ratio < 1 - threshold:
+            slower.append('{:}: {:.3g} ops/sec, {:.2f}x of baseline'.format(b['name'],b['ops_per_sec'],ratio))
+    return slower
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description='mLJR micro-benchmarks, JSON output')
+    parser.add_argument('-k','--keyword',help='Only run benchmarks whose names contain any of the words',nargs='+')
+    parser.add_argument('-o','--output',help='Write JSON results to file (default stdout)')
+    parser.add_argument('--min-time',help='Minimum seconds of one sample (default 0.02)',type=float,default=0.02)
+    parser.add_argument('--samples',help='Number of samples (default 30)',type=int,default=30)
+    parser.add_argument('--compare',help='Baseline JSON results, ratio is added to each benchmark')
+    parser.add_argument('--threshold',help='With --compare, exit 1 when any benchmark is slower \
+                            by this fraction (default 0.2)',type=float,default=0.2)
+    parser.add_argument('--import-budget',help='Exit 1 when import_time is over this budget in milliseconds \
+                            (default 50)',type=float,default=50.0)
+    args = parser.parse_args()
+
+    results = {
+        'version'    : mljr.__version__,
+        'python'     : platform.python_version(),
+        'platform'   : platform.platform(),
+        'numpy'      : None if mljr.func_numpy() is None else mljr.np.__version__,
+        'benchmarks' : [],
+    }
+    for name, func in func_pro_benchmarks():
+        if args.keyword and not any([k in name for k in args.keyword]): continue
+        # new interpreters are much slower, fewer samples
+        if name.startswith('e2e/cli') or name.startswith('startup/'):
+            stat = func_timeit(func, 0.0, max(5,args.samples//3))
+        else:
+            stat = func_timeit(func, args.min_time, args.samples)
+        results['benchmarks'].append(dict([('name',name)] + list(stat.items())))
+        print('{:40} {:>14.1f} ops/sec'.format(name,stat['ops_per_sec'] or 0), file=sys.stderr)
+
+    slower = []
+    if not args.keyword or any([k in 'startup/import' for k in args.keyword]):
+        results['import_time'] = func_import_time()
+        print('{:40} {:>14.1f} ms'.format('startup/import',results['import_time']*1000), file=sys.stderr)
+        if results['import_time']*1000 > args.import_budget:
+            slower.append('startup/import: {:.1f} ms, over budget {:.1f} ms'.format(
+                          results['import_time']*1000,args.import_budget))
+    if args.compare:
+        with open(args.compare,'rt') as f: slower += func_compare(results, json.load(f), args.threshold)
+
+    txt = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output,'wt') as f: f.write(txt + '\n')
+    else:
+        print(txt)
+    for s in slower: print('Slower: ' + s, file=sys.stderr)
+    if slower: sys.exit(1)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+from .mljr import __version__, compute, compute_many, acompute, Result, MLJRError, InputError, CalculationError, \
+                  add_profile_hook, remove_profile_hook, Profiler, Component
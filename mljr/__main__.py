@@ -0,0 +1,3 @@
+from .mljr import main
+
+main()
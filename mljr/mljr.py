@@ -1,10 +1,38 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import math
-import argparse
+import sys
+import json
+import warnings
+import collections
+import heapq
+import glob
+import io
+import time
+import atexit
+import functools
+import contextlib
+import weakref
+import array
+import threading
+
+# Startup cost matters when mljr is called many times from shell pipelines,
+# modules only needed by some features are imported when they are used:
+#    numpy                      : func_numpy
+#    argparse                   : func_pro_argparse*
+#    asyncio                    : acompute
+#    concurrent.futures         : func_calc_files
+#    hashlib, sqlite3           : func_data_version, ResultCache, func_pro_smiles_key
+#    signal, socketserver, http : func_main_serve
+
+# numpy is only required by batch calculations, bound by func_numpy
+np = None
+_NUMPY_MISSING = False
+
+__version__ = 0.52
 
-__version__ = 0.51
 
 # Modified Lydersen-Joback-Reid method
 #
@@ -69,6 +97,42 @@ DATA_LJR_RING = [
 ]
 
 
+# Periodic Table, in sequence of atomic number
+# symbol    atomic weight (g/mol)
+#
+# Note: H B C N O F P S Cl Br I keep the values used since the first version,
+#       so molecular weights of existing inputs do not change
+DATA_ELEMENTS = [
+['H' ,   1.008], ['He',   4.003], ['Li',   6.94 ], ['Be',   9.012], ['B' ,  10.81 ],
+['C' ,  12.01 ], ['N' ,  14.01 ], ['O' ,  16.00 ], ['F' ,  19.00 ], ['Ne',  20.18 ],
+['Na',  22.99 ], ['Mg',  24.305], ['Al',  26.98 ], ['Si',  28.085], ['P' ,  30.91 ],
+['S' ,  32.06 ], ['Cl',  35.45 ], ['Ar',  39.95 ], ['K' ,  39.10 ], ['Ca',  40.08 ],
+['Sc',  44.96 ], ['Ti',  47.87 ], ['V' ,  50.94 ], ['Cr',  52.00 ], ['Mn',  54.94 ],
+['Fe',  55.85 ], ['Co',  58.93 ], ['Ni',  58.69 ], ['Cu',  63.55 ], ['Zn',  65.38 ],
+['Ga',  69.72 ], ['Ge',  72.63 ], ['As',  74.92 ], ['Se',  78.97 ], ['Br',  79.90 ],
+['Kr',  83.80 ], ['Rb',  85.47 ], ['Sr',  87.62 ], ['Y' ,  88.91 ], ['Zr',  91.22 ],
+['Nb',  92.91 ], ['Mo',  95.95 ], ['Tc',  98.   ], ['Ru', 101.07 ], ['Rh', 102.91 ],
+['Pd', 106.42 ], ['Ag', 107.87 ], ['Cd', 112.41 ], ['In', 114.82 ], ['Sn', 118.71 ],
+['Sb', 121.76 ], ['Te', 127.60 ], ['I' , 126.90 ], ['Xe', 131.29 ], ['Cs', 132.91 ],
+['Ba', 137.33 ], ['La', 138.91 ], ['Ce', 140.12 ], ['Pr', 140.91 ], ['Nd', 144.24 ],
+['Pm', 145.   ], ['Sm', 150.36 ], ['Eu', 151.96 ], ['Gd', 157.25 ], ['Tb', 158.93 ],
+['Dy', 162.50 ], ['Ho', 164.93 ], ['Er', 167.26 ], ['Tm', 168.93 ], ['Yb', 173.05 ],
+['Lu', 174.97 ], ['Hf', 178.49 ], ['Ta', 180.95 ], ['W' , 183.84 ], ['Re', 186.21 ],
+['Os', 190.23 ], ['Ir', 192.22 ], ['Pt', 195.08 ], ['Au', 196.97 ], ['Hg', 200.59 ],
+['Tl', 204.38 ], ['Pb', 207.2  ], ['Bi', 208.98 ], ['Po', 209.   ], ['At', 210.   ],
+['Rn', 222.   ], ['Fr', 223.   ], ['Ra', 226.   ], ['Ac', 227.   ], ['Th', 232.04 ],
+['Pa', 231.04 ], ['U' , 238.03 ], ['Np', 237.   ], ['Pu', 244.   ], ['Am', 243.   ],
+['Cm', 247.   ], ['Bk', 247.   ], ['Cf', 251.   ], ['Es', 252.   ], ['Fm', 257.   ],
+['Md', 258.   ], ['No', 259.   ], ['Lr', 262.   ], ['Rf', 267.   ], ['Db', 268.   ],
+['Sg', 269.   ], ['Bh', 270.   ], ['Hs', 269.   ], ['Mt', 278.   ], ['Ds', 281.   ],
+['Rg', 282.   ], ['Cn', 285.   ], ['Nh', 286.   ], ['Fl', 289.   ], ['Mc', 290.   ],
+['Lv', 293.   ], ['Ts', 294.   ], ['Og', 294.   ],
+]
+
+# symbol -> atomic weight, built once at module load
+PERIODIC_TABLE = dict([(i[0],i[1]) for i in DATA_ELEMENTS])
+
+
 
 # a template for Choline Chloride   --  Purity
 TEMPLATE_CCL = {
@@ -119,6 +183,39 @@ TEMPLATE_CCG = {
 
 
 # The following is the predefined info for help message
+def func_show_groups():
+    """Print available group names, used by -g/--avail-group-name"""
+    tables = func_group_tables()
+    print('Quoted in brace, may have many names, case-insensitive')
+    print('Symbol @ means three bonds\n')
+    print('For Ring, Available Group Names are:')
+    tot = '--> '
+    for i in tables['ring']:
+        line = ''
+        for j in i[0]: line += j + '   '
+        line = '{ ' + line.strip() + ' }'
+
+        tot += line + '    '
+        if len(tot) > 54:
+            print(tot.strip())
+            tot = '--> '
+    print(tot)
+
+    print('\nFor No-Ring, Available Group Names are:')
+    tot = '--> '
+    for i in tables['no-ring']:
+        line = ''
+        for j in i[0]: line += j + '   '
+        line = '{ ' + line.strip() + ' }'
+
+        tot += line + '    '
+        if len(tot) > 54:
+            print(tot.strip())
+            tot = '--> '
+    print(tot)
+
+
+
 def func_show_template(template,file=False):
     """This function is used to show help message either to screen or write a template when file is
        set to True. Note: the new generated template file will always NOT overwrite any files"""
@@ -135,6 +232,8 @@ def func_show_template(template,file=False):
            '# Note: only keywords < type >; < mark >; < ratio >; < M > < S > & < no-ring > & < ring >\n' + \
            '#       (for purity) OR < M1 > < S1 > & < M2 > < S2 > & < no-ring-1 > & < no-ring-2 > &\n' + \
            '#       < ring-1 > & < ring-2 > (for mixture); < T-ref > < Q-ref > < T > can be used\n' + \
+           '#       More components can be added in mixture, e.g. < M3 > < S3 > < no-ring-3 >,\n' + \
+           '#       along with < ratio > like 1:1:2\n' + \
            '#\n' + \
            '# Note: keyword < name > will be ignored\n' + \
            '# Note: keyword < M > is precendent of < S >, they both are used to get molecular weight\n' + \
@@ -144,6 +243,10 @@ def func_show_template(template,file=False):
            '#            Example 2:   C2 - H3 - O4 - N5\n' + \
            '#            Example 3:   C2   H3   O4   N5\n' + \
            '#            Example 4:   C2   H3 - O4 - N5\n' + \
+           '# Note: keyword < smiles > (OR < smiles1 >, ...) defines a molecule in SMILES, groups & molecular\n' + \
+           '#       weight are derived from it, when groups & < M > < S > are not defined, e.g.\n' + \
+           '#            smiles : C[N+](C)(C)CCO.[Cl-]\n' + \
+           '#       for SMILES, comments have to be separated by a blank space, e.g.  CC#N  # comment\n' + \
            '# Note: keyword < t-ref >, < q-ref >, < t > is used to calculate Surface Tension\n' + \
            '#       < t-ref >  :  reference temperature\n' + \
            '#       < q-ref >  :  reference Surface Tension at T-ref\n' + \
@@ -157,7 +260,9 @@ def func_show_template(template,file=False):
            '# For every group, they have to be input line by line\n' + \
            '# Symbol @ means three bonds\n' + \
            '#\n' + \
-           '# Specially, for < type >, "mixture" & "mix" & "m" OR "purity" & "pure" & "p" is equal\n\n\n'
+           '# Specially, for < type >, "mixture" & "mix" & "m" OR "purity" & "pure" & "p" is equal\n' + \
+           '#\n' + \
+           '# Many systems can be defined in one file, separated by a line of < {:} >\n\n\n'.format(RECORD_SEPARATOR)
 
     if 'type' in template: info += 'type : ' + template['type'] + '\n\n'
     if 'name' in template: info += 'name : ' + template['name'] + '\n\n'
@@ -197,6 +302,232 @@ def func_show_template(template,file=False):
 
 
 
+def func_numpy():
+    """
+    Import numpy on first use, it is then also bound to module global < np >
+
+    Return:
+        numpy module, None if it is not installed
+    """
+    global np, _NUMPY_MISSING
+    if np is None and not _NUMPY_MISSING:
+        try:
+            import numpy as np
+        except ImportError:
+            _NUMPY_MISSING = True
+    return np
+
+
+def func_is_array(v):
+    """True if v is numpy array, numpy is never imported only for this check"""
+    if 'numpy' not in sys.modules: return False
+    return isinstance(v, func_numpy().ndarray)
+
+
+
+# callables receiving timing events, see add_profile_hook
+_PROFILE_HOOKS = []
+
+# stages in sequence of a run
+PROFILE_STAGES = ['argparse', 'file', 'formula', 'groups', 'run', 'property', 'output']
+
+def add_profile_hook(hook):
+    """
+    Register a callable, it receives one dict for every timed stage:
+        { 'stage': str, 'name': function name, 'start': time.perf_counter(), 'time': seconds }
+
+    Stages: argparse, file, formula, groups, run, property, output
+    Note: nested stages are also included in the time of their outer stages
+    """
+    if hook not in _PROFILE_HOOKS: _PROFILE_HOOKS.append(hook)
+
+
+def remove_profile_hook(hook):
+    if hook in _PROFILE_HOOKS: _PROFILE_HOOKS.remove(hook)
+
+
+def func_profile_event(stage, name, start, dt):
+    """Send one timing event to all hooks"""
+    event = {'stage':stage, 'name':name, 'start':start, 'time':dt}
+    for hook in list(_PROFILE_HOOKS): hook(event)
+
+
+
+def func_staged(stage):
+    """
+    Decorator, time every call of the function as < stage >, only when hooks are registered,
+    for generator function, time spent to produce every item
+    """
+    def decorator(func):
+        name = func.__name__
+        # same as inspect.isgeneratorfunction, inspect is slow to import
+        if func.__code__.co_flags & 0x20:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                gen = func(*args, **kwargs)
+                while True:
+                    beg = time.perf_counter()
+                    try:
+                        item = next(gen)
+                    except StopIteration:
+                        return
+                    finally:
+                        if _PROFILE_HOOKS: func_profile_event(stage, name, beg, time.perf_counter()-beg)
+                    yield item
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not _PROFILE_HOOKS: return func(*args, **kwargs)
+                beg = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    func_profile_event(stage, name, beg, time.perf_counter()-beg)
+        return wrapper
+    return decorator
+
+
+
+@contextlib.contextmanager
+def func_timed(stage, name):
+    """Context manager, time a block of code as < stage >, see func_staged"""
+    beg = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _PROFILE_HOOKS: func_profile_event(stage, name, beg, time.perf_counter()-beg)
+
+
+
+def func_lazy(func):
+    """
+    Decorator, read-only attribute calculated on first access, then cached in slot < _name >,
+    thus the class has to define that slot in __slots__
+    """
+    slot = '_' + func.__name__
+    @functools.wraps(func)
+    def getter(self):
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            value = func(self)
+            setattr(self, slot, value)
+            return value
+    return property(getter)
+
+
+
+class Profiler(object):
+    """
+    Profile hook, collect wall time and call counts for each stage
+
+    Example:
+        profiler = Profiler()
+        add_profile_hook(profiler)
+        ...
+        remove_profile_hook(profiler)
+        print(profiler.format())
+    """
+    def __init__(self):
+        self.stages = collections.OrderedDict()
+        self.beg = time.perf_counter()
+
+
+    def __call__(self, event):
+        if event['stage'] not in self.stages: self.stages[event['stage']] = [0, 0.0]
+        self.stages[event['stage']][0] += 1
+        self.stages[event['stage']][1] += event['time']
+
+
+    def report(self):
+        """Return dict, { stage: { 'calls', 'time', 'mean' } }, along with 'total' wall time"""
+        rst = collections.OrderedDict()
+        keys = [k for k in PROFILE_STAGES if k in self.stages] + [k for k in self.stages if k not in PROFILE_STAGES]
+        for k in keys:
+            n, t = self.stages[k]
+            rst[k] = {'calls':n, 'time':t, 'mean':t/n}
+        rst['total'] = {'calls':1, 'time':time.perf_counter()-self.beg}
+        rst['total']['mean'] = rst['total']['time']
+        return rst
+
+
+    def format(self):
+        info = '# Profile: wall time (s) and call counts of each stage, nested stages are included in outer stages\n'
+        info += '#{:>11}{:>12}{:>14}{:>14}\n'.format('stage','calls','time','mean')
+        for k,v in self.report().items():
+            info += '{:>12}{:>12}{:>14.6f}{:>14.8f}\n'.format(k,v['calls'],v['time'],v['mean'])
+        return info
+
+
+
+class GroupTable(list):
+    """
+    Pre-processed DATA list, returned by func_proDATA
+
+    It is the same 3D nested list, besides, all names (symbol & nickNames) are indexed
+    case-insensitively to their entries, thus group lookup is O(1)
+
+    Attributes:
+        index      : dict, { name.lower() : entry index }
+        duplicates : 1D list, [ (name, index of first entry, index of duplicated entry), ... ]
+                     the first entry is always used
+    """
+    def __init__(self, prolist):
+        super(GroupTable,self).__init__(prolist)
+        self.index = {}
+        self.duplicates = []
+        for i,entry in enumerate(self):
+            for name in entry[0]:
+                key = name.lower()
+                if key not in self.index:
+                    self.index[key] = i
+                elif self.index[key] != i:
+                    self.duplicates.append((name, self.index[key], i))
+
+
+    @classmethod
+    def from_snapshot(cls, prolist, index, duplicates):
+        """GroupTable written by func_write_snapshot, names are already indexed"""
+        grouptable = list.__new__(cls)
+        list.__init__(grouptable, prolist)
+        grouptable.index = index
+        grouptable.duplicates = duplicates
+        return grouptable
+
+
+    def warn(self):
+        """Report duplicate or ambiguous names as warnings"""
+        for name, i, j in self.duplicates:
+            warnings.warn('Warning: name < {:} > is defined in both entries {:} and {:}, the first one is used'.format(
+                          name, self[i][0], self[j][0]))
+
+
+    def lookup(self, sym):
+        """Return entry index of symbol or nickName (case-insensitive), None if not defined"""
+        return self.index.get(sym.lower())
+
+
+    @func_staged('groups')
+    def get_table(self, groups, label=''):
+        """
+        Parameters:
+            groups : dict, { symbol : number, ... }
+            label  : str, used in error message, like 'ring', 'no-ring'
+
+        Return:
+            2D list: [ [deltaTbM    deltaTM    deltaPM   deltaVM  Number], ... ]
+        """
+        table = []
+        for sym, nm in groups.items():
+            ndx = self.lookup(sym)
+            if ndx is None:
+                raise ValueError('Error: for {:}, symbol < {:} > is not defined'.format(label,sym))
+            # Note: make a copy!!
+            table.append( self[ndx][1][:] + [nm,] )
+        return table
+
+
+
 def func_proDATA(inlist):
     """
     Pre-process input DATA list
@@ -207,7 +538,7 @@ def func_proDATA(inlist):
         [ symbol    deltaTbM    deltaTM    deltaPM   deltaVM      nickName(as many as you can) ]
     
     Return:
-        3D nested list
+        GroupTable, 3D nested list
 
         in a format,
 
@@ -216,6 +547,8 @@ def func_proDATA(inlist):
             [ [ allNames ], [ deltaTbM    deltaTM    deltaPM   deltaVM ] ],
             ...
         ]
+
+    Note: duplicate or ambiguous names are reported as warnings
     """
     # avoid any predefined-error
     prolist = []
@@ -237,11 +570,335 @@ def func_proDATA(inlist):
             prolist.append([name,data])
         else:
             raise ValueError('Error: wrong defined entry: {:}'.format(i))
-    
-    return prolist
 
+    grouptable = GroupTable(prolist)
+    grouptable.warn()
+
+    return grouptable
+
+
+
+def func_group_tables(rebuild=False):
+    """
+    Pre-processed DATA_LJR_RING & DATA_LJR_NO_RING, built only once and shared across calls,
+    loaded from the snapshot written at build time when it matches, see func_write_snapshot
+
+    Parameter:
+        rebuild : bool, set to True when DATA_LJR_* are modified, the snapshot is not used
+
+    Return:
+        dict, { 'ring' : GroupTable, 'no-ring' : GroupTable }
+    """
+    if rebuild or not _GROUP_TABLES:
+        snapshot = None if rebuild else func_load_snapshot()
+        for key, data in [('ring',DATA_LJR_RING), ('no-ring',DATA_LJR_NO_RING)]:
+            if snapshot is None:
+                _GROUP_TABLES[key] = func_proDATA(data)
+            else:
+                _GROUP_TABLES[key] = GroupTable.from_snapshot(*snapshot[key])
+                _GROUP_TABLES[key].warn()
+        _GROUP_COLUMNS.clear()
+        _DATA_VERSION.clear()
+    return _GROUP_TABLES
+
+_GROUP_TABLES = {}
+
+
+
+def func_write_snapshot(path):
+    """
+    Write validated and indexed group tables in marshal format, e.g. mljr/_tables.bin,
+    it is done at build time by setup.py, thus startup skips func_proDATA
+
+    Note: the snapshot keeps DATA_LJR_RING & DATA_LJR_NO_RING, it is only used when they are the same,
+          by the same program version and Python version
+    """
+    import marshal
+    tables = {}
+    for key, data in [('ring',DATA_LJR_RING), ('no-ring',DATA_LJR_NO_RING)]:
+        t = func_proDATA(data)
+        tables[key] = (list(t), t.index, t.duplicates)
+    data = {'ring':DATA_LJR_RING, 'no-ring':DATA_LJR_NO_RING}
+    with open(path,'wb') as f:
+        f.write(marshal.dumps((__version__, tuple(sys.version_info[:2]), data, tables)))
+
+
+def func_load_snapshot(path=None):
+    """
+    Parameter:
+        path : snapshot written by func_write_snapshot, default _tables.bin next to this file
+
+    Return:
+        dict, { 'ring' : (entries, index, duplicates), 'no-ring' : ... }, None if it is missing or outdated
+    """
+    import marshal
+    if path is None: path = os.path.join(os.path.dirname(os.path.abspath(__file__)),'_tables.bin')
+    try:
+        with open(path,'rb') as f:
+            version, python, data, tables = marshal.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if version != __version__ or python != tuple(sys.version_info[:2]) or \
+       data != {'ring':DATA_LJR_RING, 'no-ring':DATA_LJR_NO_RING}:
+        return None
+    return tables
+
+
+
+def func_group_columns():
+    """
+    Columns of group counts, shared by Component and batch calculations
+
+    Return:
+        offsets, values
+
+        offsets : dict, { 'no-ring' : 0, 'ring' : number of no-ring entries }, first column of each table
+        values  : 2D list, [ [ deltaTbM    deltaTM    deltaPM   deltaVM ], ... ], one row for each column,
+                  in sequence of DATA_LJR_NO_RING then DATA_LJR_RING
+    """
+    tables = func_group_tables()
+    if not _GROUP_COLUMNS:
+        _GROUP_COLUMNS['offsets'] = {'no-ring':0, 'ring':len(tables['no-ring'])}
+        _GROUP_COLUMNS['values'] = [i[1] for i in tables['no-ring'] + tables['ring']]
+    return _GROUP_COLUMNS['offsets'], _GROUP_COLUMNS['values']
+
+_GROUP_COLUMNS = {}
+
+
+
+@func_staged('groups')
+def func_pro_counts(groups):
+    """
+    Resolve group definitions of one molecule into a group-count array
+
+    Parameter:
+        groups : dict, { 'ring' : { symbol : number, ... },  'no-ring' : { symbol : number, ... } },
+                 either key can be omitted
+
+    Return:
+        array.array('i'), fixed width, columns follow func_group_columns
+    """
+    tables = func_group_tables()
+    offsets, values = func_group_columns()
+    counts = array.array('i', [0]) * len(values)
+    for key in ['ring','no-ring']:
+        if key not in groups: continue
+        for sym, nm in groups[key].items():
+            ndx = tables[key].lookup(sym)
+            if ndx is None:
+                raise ValueError('Error: for {:}, symbol < {:} > is not defined'.format(key,sym))
+            counts[offsets[key]+ndx] += nm
+    return counts
+
+
+
+class Component(object):
+    """
+    One molecule in a compact form, screening libraries can hold millions of them
+
+    Attributes:
+        counts : array.array('i'), number of each group, columns follow func_group_columns
+        M      : float, molecular weight (g/mol)
+        sums   : tuple, calculated once when it is created,
+                 ( SUM{ n*deltaTbM }, SUM{ n*deltaTM }, SUM{ n*deltaPM }, SUM{ n*deltaVM } ),
+                 an item is None when any of the used groups has no contribution defined for it
+        name   : str, optional
+    """
+    __slots__ = ('counts', 'M', 'sums', 'name')
+
+    def __init__(self, counts, M, name=None):
+        offsets, values = func_group_columns()
+        if len(counts) != len(values):
+            raise ValueError('Error: group counts have to have {:} columns'.format(len(values)))
+        if not isinstance(counts,array.array) or counts.typecode != 'i':
+            counts = array.array('i', counts)
+        self.counts = counts
+        self.M = M
+        self.name = name
+
+        sums = [0.0, 0.0, 0.0, 0.0]
+        for col, nm in enumerate(counts):
+            if not nm: continue
+            for k, v in enumerate(values[col]):
+                sums[k] = None if v is None or sums[k] is None else sums[k] + v*nm
+        self.sums = tuple(sums)
+
+
+    def __repr__(self):
+        return 'Component(name={:}, M={:}, sums={:})'.format(repr(self.name), self.M, self.sums)
+
+
+
+class LRUCache(object):
+    """
+    Bounded cache with least-recently-used eviction
+
+    Attributes:
+        maxsize : int, maximum number of entries
+        hits    : int, number of successful lookups
+        misses  : int, number of failed lookups
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.data = collections.OrderedDict()
+
+
+    def get(self, key, default=None):
+        if key in self.data:
+            self.hits += 1
+            self.data.move_to_end(key)
+            return self.data[key]
+        self.misses += 1
+        return default
+
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+
+    def clear(self):
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+    def stats(self):
+        """Return dict, { 'hits', 'misses', 'size', 'maxsize' }"""
+        return {'hits':self.hits, 'misses':self.misses, 'size':len(self.data), 'maxsize':self.maxsize}
+
+
+
+def func_pro_formula(S):
+    """
+    Tokenize molecules structure/symbol into atom counts in a single pass
+
+    Parameter:
+        S  :   same as func_calc_M
+
+    Note: input is case-insensitive, only < Br > & < Cl > are two-letter elements,
+          e.g. CCL = C + Cl, CO = C + O, Co2 = C + O2. Only when it fails and both upper
+          and lower cases are used, e.g. NaCl, standard notation is applied, which is
+          case-sensitive, elements are one upper case optionally followed by one lower case.
+          A warning is given when both of them work but with different results
+
+    Note: results are memoized in _FORMULA_CACHE, keyed on normalized structure
+
+    Return:
+        log, counts, M
+
+        counts : 1D list, [ (atomtype, number), ... ], in sequence of input, merged
+        M      : molecular weight (g/mol)
+    """
+    if not isinstance(S,str):
+        return {'nice':False, 'info':'Error: Molecule structure has to be a string'}, [], 0.0
+
+    # separators only matter between numbers
+    key = ' '.join(S.replace('-',' ').split())
+    rst = _FORMULA_CACHE.get(key)
+    if rst is None:
+        log, counts = func_pro_formula_tokens(key.lower(), _FORMULA_LEGACY)
+        if key.lower() != key and key.upper() != key:
+            standard, other = func_pro_formula_tokens(key, _FORMULA_STANDARD)
+            if not log['nice']:
+                if standard['nice']: log, counts = standard, other
+            elif standard['nice'] and dict(other) != dict(counts):
+                warnings.warn('Warning: structure < {:} > is case-insensitive as < {:} >, not < {:} >'.format(
+                              S, ' '.join(['{:}{:}'.format(k,v) for k,v in counts]),
+                              ' '.join(['{:}{:}'.format(k,v) for k,v in other])))
+        M = sum([PERIODIC_TABLE[k]*v for k,v in counts]) if log['nice'] else 0.0
+        rst = (log, counts, M)
+        _FORMULA_CACHE.put(key, rst)
+    return dict(rst[0]), rst[1], rst[2]
+
+
+# token : groups, atomtype, number, separator, anything else
+# simple: common case, every number directly follows its atomtype, scanned by pair
+# symbols: matched atomtype -> symbol in PERIODIC_TABLE
+_FORMULA_STANDARD = {
+    'token'   : re.compile(r'([A-Z][a-z]?)|(\d+)|([\s\-]+)|(.)', re.DOTALL),
+    'simple'  : re.compile(r'(?: ?[A-Z][a-z]?\d*)+'),
+    'pair'    : re.compile(r'([A-Z][a-z]?)(\d*)'),
+    'symbols' : dict([(k,k) for k in PERIODIC_TABLE]),
+}
+_FORMULA_LEGACY = {
+    'token'   : re.compile(r'(br|cl|[a-z])|(\d+)|([\s\-]+)|(.)', re.DOTALL),
+    'simple'  : re.compile(r'(?: ?(?:br|cl|[a-z])\d*)+'),
+    'pair'    : re.compile(r'(br|cl|[a-z])(\d*)'),
+    'symbols' : dict([(k.lower(),k) for k in PERIODIC_TABLE if len(k) == 1 or k in ['Br','Cl']]),
+}
+
+
+
+def func_pro_formula_tokens(S, mode):
+    """
+    Scan formula by regular expressions, see func_pro_formula
+
+    Parameters:
+        mode : dict, _FORMULA_STANDARD or _FORMULA_LEGACY
+    """
+    log = {'nice':True, }
+    counts = collections.OrderedDict()
+    symbols = mode['symbols']
+    if mode['simple'].fullmatch(S):
+        for atom, num in mode['pair'].findall(S):
+            sym = symbols.get(atom)
+            if sym is None:
+                log['nice'] = False
+                log['info'] = 'Error: atomtype < {:} > is not defined in Periodic Table'.format(atom.capitalize())
+                return log, []
+            counts[sym] = counts.get(sym,0) + (int(num) if num else 1)
+        return log, list(counts.items())
+
+    # No adjacent numbers is allowed
+    # However the number of each adjacent character is defined at 1
+    # Consider cases like:
+    #   C 1 2 H <bad>
+    #   C C C 3 <good>
+    #   C 1 H 3 <good>
+    last = None
+    for atom, num, sep, bad in mode['token'].findall(S):
+        if sep: continue
+        if bad:
+            log['nice'] = False
+            log['info'] = 'Error: input < {:} > is not correctly defined'.format(bad)
+            return log, []
+        if atom:
+            sym = symbols.get(atom)
+            if sym is None:
+                log['nice'] = False
+                log['info'] = 'Error: atomtype < {:} > is not defined in Periodic Table'.format(atom.capitalize())
+                return log, []
+            counts[sym] = counts.get(sym,0) + 1
+            last = sym
+        elif last is None:
+            log['nice'] = False
+            log['info'] = 'Error: the atomtype has to be in the first input along with its numbers\n' + \
+                          '     : < {:} > is not correctly defined'.format(num)
+            return log, []
+        elif isinstance(last,int):
+            log['nice'] = False
+            log['info'] = 'Error: no adjacent number inputs is allowd\n' + \
+                          '     : < {:} > is not correctly defined'.format(num)
+            return log, []
+        else:
+            counts[last] += int(num) - 1
+            last = int(num)
+    if last is None:
+        log['nice'] = False
+        log['info'] = 'Error: empty inputs'
+        return log, []
+    return log, list(counts.items())
+
+_FORMULA_CACHE = LRUCache(maxsize=65536)
 
 
+
+@func_staged('formula')
 def func_calc_M(S):
     """
     Use molecules structure/symbol to calculate molecular weight
@@ -266,172 +923,586 @@ def func_calc_M(S):
     ##Slist = [ 123, '  ', '- - ', '---', '1,2,','1 +','4 $',   #bad
     #          'C3H4O5Br1Cl2', 'CHOBrCl','Br Br BrBr',          #good
     #          'C3 - H -2 - 2 - O', 'C3 - H2  2 - O'            #bad]
-    log = {'nice':True, }
-    # define Periodic Table
-    PT = { 'H':1.008, 'B':10.81, 'C':12.01, 'N':14.01, 'O':16.00, 'F':19.00,
-           'P':30.91, 'S':32.06, 'Cl':35.45, 'Br':79.90, 'I':126.90 }
-    if not isinstance(S,str):
-        log['nice'] = False
-        log['info'] = 'Error: Molecule structure has to be a string'
-        return log, 0.0
-    S = S.lower()
-    
-    proS = []
-    # format: split by '-' then split by blank space
-    for t in S.split('-'): proS += t.split()
-    if len(proS) == 0:
-        log['nice'] = False
-        log['info'] = 'Error: empty inputs'
-        return log, 0.0
-    
-    proSS = []
-    # 1D: split to [  character   number   character   number  ]
-    for t in proS:
-        if t.isdigit():
-            proSS.append(int(t))
-        elif t.isalpha():
-            proSS.append(t)
-        elif t.isalnum():
-            stmp = ''
-            for c in t:
-                if c.isdigit():
-                    if stmp.isalpha():
-                        proSS.append(stmp)
-                        stmp = ''
-                else:
-                    if stmp.isdigit():
-                        proSS.append(int(stmp))
-                        stmp = ''
-                stmp += c
-            if stmp.isdigit():
-                proSS.append(int(stmp))
+    log, counts, M = func_pro_formula(S)
+    return log, M
+
+
+
+def func_batch_formulas(formulas):
+    """
+    Convert many molecules structures/symbols to an atom-count matrix and molecular weights
+
+    Parameter:
+        formulas : 1D list of str, same format as func_calc_M
+
+    Note: every distinct formula is only parsed once
+
+    Return:
+        counts : 2D numpy array, shape (molecules, elements), columns follow DATA_ELEMENTS
+        M      : 1D numpy array, molecular weight for each molecule (g/mol)
+    """
+    if func_numpy() is None:
+        raise ImportError('Error: numpy is required for batch calculation')
+    columns = dict([(i[0],n) for n,i in enumerate(DATA_ELEMENTS)])
+    weights = np.array([i[1] for i in DATA_ELEMENTS], dtype=float)
+
+    uniq = {}
+    ndx = np.empty(len(formulas), dtype=np.intp)
+    for i,S in enumerate(formulas):
+        n = uniq.get(S)
+        if n is None:
+            n = uniq[S] = len(uniq)
+        ndx[i] = n
+
+    # sparse entries, filled in one assignment
+    rows = []
+    cols = []
+    vals = []
+    for S,n in uniq.items():
+        log, counts, M = func_pro_formula(S)
+        if not log['nice']:
+            raise ValueError('{:}, for < {:} >'.format(log['info'],S))
+        for k,v in counts:
+            rows.append(n)
+            cols.append(columns[k])
+            vals.append(v)
+    ucounts = np.zeros((len(uniq),len(DATA_ELEMENTS)))
+    ucounts[rows,cols] = vals
+
+    counts = ucounts[ndx]
+    return counts, counts @ weights
+
+
+
+# SMILES, dependency-free, organic subset & bracket atoms, branches, ring closures (%nn), bonds - = # $ : / \
+# token : bracket atom, organic subset atom, branch, bond, ring closure %nn, ring closure digit, dot, anything else
+_SMILES_TOKENS = re.compile(r'\[([^\]]*)\]|(Cl|Br|[BCNOPSFI]|[bcnops])|([()])|([-=#$:/\\])|%(\d\d)|(\d)|(\.)|(.)',
+                            re.DOTALL)
+# bracket atom : isotope, symbol, chirality, hydrogens, charge, atom class
+_SMILES_BRACKET = re.compile(r'(\d*)(se|as|[bcnops]|[A-Z][a-z]?)'
+                             r'(@(?:@|TH[12]|AL[12]|SP[1-3]|TB\d{1,2}|OH\d{1,2})?)?(?:H(\d*))?([+-]+\d*)?(?::\d+)?$')
+_SMILES_BONDS = {'-':1, '=':2, '#':3, '$':4, ':':1.5, '/':1, '\\':1}
+# normal valences of organic subset, for implicit hydrogens
+_SMILES_VALENCES = {'B':(3,), 'C':(4,), 'N':(3,5), 'O':(2,), 'P':(3,5), 'S':(2,4,6),
+                    'F':(1,), 'Cl':(1,), 'Br':(1,), 'I':(1,)}
+
+def func_pro_smiles_graph(smiles):
+    """
+    Parse SMILES into a hydrogen-suppressed molecular graph, explicit [H] atoms are merged into
+    hydrogen counts of their neighbors
+
+    Raise:
+        ValueError
+
+    Return:
+        atoms, nbrs
+
+        atoms : 1D list, [ [ element, aromatic, charge, hydrogens, ring ], ... ]
+        nbrs  : 2D list, [ [ (neighbor, bond order, ring bond), ... ], ... ], aromatic bond order is 1.5
+    """
+    atoms = []
+    bonds = []
+    pairs = set()
+    prev = None
+    bond = None
+    stack = []
+    rings = {}
+    def fbond(i, j, b):
+        if i == j or (min(i,j),max(i,j)) in pairs:
+            raise ValueError('atoms are bonded twice')
+        pairs.add((min(i,j),max(i,j)))
+        if b is None: b = 1.5 if atoms[i][1] and atoms[j][1] else 1
+        else: b = _SMILES_BONDS[b]
+        bonds.append((i, j, b))
+
+    for m in _SMILES_TOKENS.finditer(smiles):
+        bracket, organic, branch, b, ring2, ring1, dot, other = m.groups()
+        if other is not None:
+            raise ValueError('wrong character < {:} > at position {:}'.format(other, m.start()+1))
+        if bracket is not None or organic is not None:
+            if bracket is not None:
+                a = _SMILES_BRACKET.match(bracket)
+                if a is None: raise ValueError('wrong atom < [{:}] >'.format(bracket))
+                sym = a.group(2)
+                h = 0 if a.group(4) is None else int(a.group(4) or 1)
+                q = a.group(5) or ''
+                n = q.lstrip('+-')
+                charge = (1 if q[:1] == '+' else -1) * (int(n) if n else len(q))
             else:
-                proSS.append(stmp)
-        else:
-            log['nice'] = False
-            log['info'] = 'Error: input < {:} > is not correctly defined'.format(t)
-            return log, 0.0
-
-    proSSS = []
-    # 1D: split to [  atomtype   number   atomtype   number  ]
-    for t in proSS:
-        if isinstance(t,int):
-            proSSS.append(t)
+                sym, h, charge = organic, None, 0
+            element = sym[0].upper() + sym[1:]
+            if element not in PERIODIC_TABLE:
+                raise ValueError('element < {:} > is not defined'.format(sym))
+            atoms.append([element, sym.islower(), charge, h, False])
+            if prev is not None: fbond(prev, len(atoms)-1, bond)
+            prev = len(atoms) - 1
+            bond = None
+        elif prev is None:
+            raise ValueError('< {:} > at position {:} does not follow an atom'.format(m.group(), m.start()+1))
+        elif branch == '(':
+            stack.append(prev)
+        elif branch == ')':
+            if not stack or bond is not None: raise ValueError('wrong branch at position {:}'.format(m.start()+1))
+            prev = stack.pop()
+        elif b is not None:
+            if bond is not None: raise ValueError('two bonds at position {:}'.format(m.start()+1))
+            bond = b
+        elif dot is not None:
+            if bond is not None or stack: raise ValueError('wrong < . > at position {:}'.format(m.start()+1))
+            prev = None
         else:
-            # for character, it may have special cases like Br, Cl
-            while True:
-                if 'br' in t or 'cl' in t:
-                    ndx = t.find('br') if 'br' in t else t.find('cl')
-                    if ndx > 0: proSSS += [ c for c in t[:ndx] ]
-                    proSSS.append(t[ndx:ndx+2])
-                    if len(t) >= ndx + 2:
-                        t = t[ndx+2:]
-                    else:
-                        proSSS += [ c for c in t ]
-                        break
-                else:
-                    proSSS += [ c for c in t ]
+            n = ring2 or ring1
+            if n in rings:
+                j, b = rings.pop(n)
+                if b is not None and bond is not None and b != bond:
+                    raise ValueError('ring closure < {:} > has two different bonds'.format(n))
+                fbond(j, prev, bond or b)
+            else:
+                rings[n] = (prev, bond)
+            bond = None
+    if rings or stack or bond is not None or not atoms:
+        raise ValueError('unclosed ring, branch or bond')
+
+    nbrs = [[] for i in atoms]
+    for n,(i,j,b) in enumerate(bonds):
+        nbrs[i].append((j,b,n))
+        nbrs[j].append((i,b,n))
+
+    # implicit hydrogens of organic subset, aromatic atoms only take their lowest valences, e.g. pyrrole-type n
+    for i,a in enumerate(atoms):
+        if a[3] is not None: continue
+        s = int(round(sum([1 if b == 1.5 else b for j,b,n in nbrs[i]]))) + (1 if a[1] else 0)
+        valences = _SMILES_VALENCES.get(a[0],(s,))
+        if a[1]: valences = valences[:1]
+        a[3] = max(0, min([v for v in valences if v >= s] or [s]) - s)
+
+    # ring bonds are bonds which are not bridges, by depth-first search
+    disc = [-1] * len(atoms)
+    low = [0] * len(atoms)
+    bridges = set()
+    cnt = 0
+    for root in range(len(atoms)):
+        if disc[root] != -1: continue
+        disc[root] = low[root] = cnt
+        cnt += 1
+        todo = [(root, -1, iter(nbrs[root]))]
+        while todo:
+            u, edge, it = todo[-1]
+            for v,b,n in it:
+                if n == edge: continue
+                if disc[v] == -1:
+                    disc[v] = low[v] = cnt
+                    cnt += 1
+                    todo.append((v, n, iter(nbrs[v])))
                     break
-    # No adjacent numbers is allowed
-    # However the number of each adjacent character is defined at 1
-    # Consider cases like:
-    #   C 1 2 H <bad> 
-    #   C C C 3 <good>
-    #   C 1 H 3 <good>
-    if not isinstance(proSSS[0],str):
-        log['nice'] = False
-        log['info'] = 'Error: the atomtype has to be in the first input along with its numbers\n' + \
-                      '     : < {:} > is not correctly defined'.format(proSSS[0])
-        return log, 0.0
-    bo = False
-    for t in proSSS:
-        if isinstance(t,int):
-            if bo:
-                log['nice'] = False
-                stmp = t
-                break
-            bo = True
-        else:
-            bo = False
-    if not log['nice']:
-        log['info'] = 'Error: no adjacent number inputs is allowd\n' + \
-                      '     : < {:} > is not correctly defined'.format(stmp)
-        return log, 0.0
-
-    i = 0
-    proSSSS = []
-    # 2D: [ [atomtype, number],  [atomtype, number], ... ]
-    while i < len(proSSS):
-        j = i + 1
-        if j < len(proSSS) and isinstance(proSSS[j],int):
-            proSSSS.append([proSSS[i],proSSS[j]])
-            i = j
-        else:
-            proSSSS.append([proSSS[i],1])
-        i += 1
-    
-    # time to check for Periodic Table
-    M = 0.0
-    for t in proSSSS:
-        tmp = t[0].capitalize()
-        if tmp in PT:
-            M += PT[tmp] * t[1]
+                low[u] = min(low[u], disc[v])
+            else:
+                todo.pop()
+                if todo:
+                    p = todo[-1][0]
+                    low[p] = min(low[p], low[u])
+                    if low[u] > disc[p]: bridges.add(edge)
+
+    # merge explicit hydrogens, hydrogen-suppressed graph
+    keep = [not (a[0] == 'H' and len(nbrs[i]) == 1 and atoms[nbrs[i][0][0]][0] != 'H') for i,a in enumerate(atoms)]
+    for i,a in enumerate(atoms):
+        if not keep[i]: atoms[nbrs[i][0][0]][3] += 1 + a[3]
+    ndx = dict([(i,n) for n,i in enumerate([i for i in range(len(atoms)) if keep[i]])])
+    graph = []
+    for i in ndx:
+        graph.append([(ndx[j], b, n not in bridges) for j,b,n in nbrs[i] if keep[j]])
+        atoms[i][4] = any([r for j,b,r in graph[-1]])
+    return [atoms[i] for i in ndx], graph
+
+
+
+def func_pro_smiles_key(atoms, nbrs, rounds=3):
+    """
+    Key of a molecular graph, atom invariants (element, aromatic, charge, hydrogens, ring, degree,
+    smallest ring size) are refined along bonds until the partition of atoms is stable, at least
+    < rounds > times, independent of atom order, ring-closure numbers and branches
+
+    Note: it is not a canonical SMILES, besides refined atoms, the key also has the Hill formula,
+          total charge, sorted multisets of degrees and of bonds, numbers of fragments and rings,
+          two graphs share a key only when refinement and all of them cannot tell them apart,
+          their formulas and all atom neighborhoods are then the same, same as group assignments
+
+    Note: atom labels are sha1 digests, the key is a sha256 digest, instead of hash(),
+          thus the key is the same in every process
+
+    Return:
+        str, sha256 hex digest
+    """
+    import hashlib
+    def fdigest(txt):
+        return hashlib.sha1(txt.encode('utf-8')).hexdigest()
+
+    # smallest ring through each ring bond, shortest path between its atoms without that bond
+    sizes = [0] * len(atoms)
+    for i,nb in enumerate(nbrs):
+        for j,b,ring in nb:
+            if not ring or j < i: continue
+            dist = {i:0}
+            todo = collections.deque([i])
+            while todo and j not in dist:
+                u = todo.popleft()
+                for v,c,r in nbrs[u]:
+                    if v in dist or (u == i and v == j): continue
+                    dist[v] = dist[u] + 1
+                    todo.append(v)
+            if j in dist:
+                for k in [i,j]: sizes[k] = min(sizes[k] or dist[j]+1, dist[j]+1)
+
+    labels = [fdigest(repr((a[0], a[1], a[2], a[3], a[4], len(nb), sizes[i])))
+              for i,(a,nb) in enumerate(zip(atoms,nbrs))]
+    n = len(set(labels))
+    for r in range(len(atoms)):
+        labels = [fdigest(labels[i] + repr(sorted([(b,labels[j]) for j,b,ring in nb]))) for i,nb in enumerate(nbrs)]
+        if r+1 >= rounds:
+            # refinement only splits classes, the partition is stable once their number is kept
+            m = len(set(labels))
+            if m == n: break
+            n = m
+
+    # fragments by union-find, rings = bonds - atoms + fragments
+    parent = list(range(len(atoms)))
+    def froot(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for i,nb in enumerate(nbrs):
+        for j,b,ring in nb: parent[froot(i)] = froot(j)
+    fragments = len(set([froot(i) for i in range(len(atoms))]))
+    nbond = sum([len(nb) for nb in nbrs]) // 2
+
+    formula = collections.Counter()
+    for a in atoms:
+        formula[a[0]] += 1
+        formula['H'] += a[3]
+    hill = ['C','H'] if 'C' in formula else []
+    hill = [(k,formula[k]) for k in hill + sorted([k for k in formula if k not in hill]) if formula[k]]
+    bonds = sorted([(min(atoms[i][0],atoms[j][0]), max(atoms[i][0],atoms[j][0]), b)
+                    for i,nb in enumerate(nbrs) for j,b,ring in nb if i < j])
+    invariants = [hill, sum([a[2] for a in atoms]), sorted([len(nb) for nb in nbrs]), bonds,
+                  fragments, nbond - len(atoms) + fragments, sorted(labels)]
+    return hashlib.sha256(repr(invariants).encode('utf-8')).hexdigest()
+
+
+
+def func_pro_smiles_groups(atoms, nbrs):
+    """
+    Assign atoms of a hydrogen-suppressed graph to DATA_LJR_NO_RING & DATA_LJR_RING groups
+
+    Note: carbonyl, carboxyl, ester, nitrile, nitro and sulfone groups are assigned first,
+          charged nitrogen with single bonds is ammonium < >N- >, alias < [>N<]+ >,
+          halide ions are < -Cl > etc, alias < [Cl-] >, < -OH > on aromatic atom is ring < -OH > (phenol),
+          oxygen anions are only defined in carboxylate and nitro groups, e.g. alkoxide has no group
+
+    Raise:
+        ValueError, no group for an atom
+
+    Return:
+        dict, { 'no-ring' : { symbol : number, ... },  'ring' : { symbol : number, ... } }
+    """
+    groups = {'no-ring':{}, 'ring':{}}
+    used = [False] * len(atoms)
+    def fadd(key, sym, *claims):
+        groups[key][sym] = groups[key].get(sym,0) + 1
+        for i in claims: used[i] = True
+    def ferr(i):
+        a = atoms[i]
+        raise ValueError('no group is defined for atom < {:}{:} > with {:} hydrogen(s)'.format(
+                         a[0].lower() if a[1] else a[0], '' if not a[2] else '{:+}'.format(a[2]), a[3]))
+    def fterminal(i, elem, order):
+        # free terminal atoms bonded to i
+        return [j for j,b,r in nbrs[i] if b == order and atoms[j][0] == elem and len(nbrs[j]) == 1 and not used[j]]
+
+    # carbonyl & nitrile carbons, they claim their oxygens & nitrogens
+    for i,a in enumerate(atoms):
+        if a[0] != 'C': continue
+        oxo = fterminal(i, 'O', 2)
+        if oxo and a[4]:
+            if a[3] != 0: ferr(i)
+            fadd('ring', '>C=O', i, oxo[0])
+        elif oxo:
+            single = fterminal(i, 'O', 1)
+            oh = [j for j in single if atoms[j][3] == 1 and atoms[j][2] == 0]
+            om = [j for j in single if atoms[j][2] == -1]
+            oe = [j for j,b,r in nbrs[i] if b == 1 and atoms[j][0] == 'O' and len(nbrs[j]) == 2 \
+                  and not atoms[j][4] and not used[j]]
+            # formic acid is -COOH as well
+            if a[3] <= 1 and oh: fadd('no-ring', '-COOH', i, oxo[0], oh[0])
+            elif a[3] == 0 and (om or oe): fadd('no-ring', '-COO-', i, oxo[0], (om or oe)[0])
+            elif a[3] == 0: fadd('no-ring', '>C=O', i, oxo[0])
+            elif a[3] == 1 and (om or oe): fadd('no-ring', 'HCOO-', i, oxo[0], (om or oe)[0])
+            elif a[3] == 1: fadd('no-ring', '-CHO', i, oxo[0])
+            else: ferr(i)
         else:
-            log['nice'] = False
-            log['info'] = 'Error: atomtype < {:} > is not defined in Periodic Table'.format(tmp)
-            break
+            cn = fterminal(i, 'N', 3)
+            if cn and not a[4] and a[3] == 0: fadd('no-ring', '-CN', i, cn[0])
+
+    # nitro & sulfone, they claim their oxygens
+    for i,a in enumerate(atoms):
+        if used[i] or a[4]: continue
+        oxo = fterminal(i, 'O', 2)
+        if a[0] == 'N' and oxo:
+            o = (oxo + [j for j in fterminal(i, 'O', 1) if atoms[j][2] == -1])[:2]
+            if len(o) == 2: fadd('no-ring', '-NO2', i, *o)
+        elif a[0] == 'S' and len(oxo) >= 2:
+            fadd('no-ring', '-SO2', i, *oxo[:2])
+
+    for i,a in enumerate(atoms):
+        if used[i]: continue
+        element, aromatic, charge, h, ring = a
+        orders = [b for j,b,r in nbrs[i]]
+        key = 'ring' if ring else 'no-ring'
+        sym = None
+        if element == 'C':
+            if ring:
+                if 2 in orders or 1.5 in orders: sym = {1:'=CH-', 0:'=C<'}.get(h)
+                elif 3 not in orders: sym = {2:'-CH2-', 1:'>CH-', 0:'>C<'}.get(h)
+            elif 3 in orders: sym = {1:'@CH', 0:'@C-'}.get(h)
+            elif orders.count(2) == 2: sym = {0:'=C='}.get(h)
+            elif 2 in orders: sym = {2:'=CH2', 1:'=CH-', 0:'=C<'}.get(h)
+            else: sym = {3:'-CH3', 2:'-CH2-', 1:'>CH-', 0:'>C<'}.get(h)
+        elif element == 'O':
+            if len(orders) == 1 and orders[0] == 2:
+                key, sym = 'no-ring', '=O'
+            elif len(orders) == 1 and h == 1 and charge == 0:
+                key, sym = 'ring' if atoms[nbrs[i][0][0]][1] else 'no-ring', '-OH'
+            elif len(orders) == 2 and h == 0 and 2 not in orders:
+                sym = '-O-'
+        elif element == 'N':
+            if ring and aromatic:
+                sym = '>NH' if h == 1 else '>N-' if len(orders) == 3 else '-N=' if h == 0 else None
+            elif 2 in orders:
+                sym = '-N=' if h == 0 else None
+            elif ring and 3 not in orders:
+                sym = {1:'>NH', 0:'>N-'}.get(h) if charge == 0 else '>N-'
+            elif 3 not in orders:
+                # ammonium, e.g. [NH3+], [N+]
+                sym = '>N-' if charge == 1 else {2:'-NH2', 1:'>NH', 0:'>N-'}.get(h) if len(orders) else None
+        elif element in ['F','Cl','Br','I'] and len(orders) <= 1 and h == 0:
+            key, sym = 'no-ring', '-' + element
+        elif element in ['B','P']:
+            key, sym = 'no-ring', '-' + element
+        if sym is None: ferr(i)
+        fadd(key, sym, i)
+
+    return dict([(k,v) for k,v in groups.items() if v])
+
+
+
+@func_staged('groups')
+def func_pro_smiles(smiles):
+    """
+    Fragment one molecule defined in SMILES into groups, and calculate its molecular weight
 
-    return log, M
+    Example:
+        'C[N+](C)(C)CCO.[Cl-]'   ->  { 'no-ring' : { '-CH3':3, '>N-':1, '-CH2-':2, '-OH':1, '-Cl':1 } }, 139.62
 
+    Note: results are memoized in _SMILES_CACHE, keyed on SMILES and on canonical key of its graph,
+          thus the same molecule written in different SMILES is only fragmented once
 
+    Return:
+        log, groups, M
 
-def func_profile(file,fsize=5):
-    """This function is used to process input file
+        groups : dict, { 'no-ring' : { symbol : number, ... },  'ring' : { symbol : number, ... } },
+                 same as func_pro_counts, keys without groups are omitted
+        M      : molecular weight (g/mol)
+    """
+    if not isinstance(smiles,str):
+        return {'nice':False, 'info':'Error: SMILES has to be a string'}, {}, 0.0
+    smiles = smiles.strip()
+    rst = _SMILES_CACHE.get(smiles)
+    if rst is None:
+        try:
+            atoms, nbrs = func_pro_smiles_graph(smiles)
+            # graph keys are tuples, never the same as SMILES strings
+            key = ('graph', func_pro_smiles_key(atoms, nbrs))
+            rst = _SMILES_CACHE.get(key)
+            if rst is None:
+                groups = func_pro_smiles_groups(atoms, nbrs)
+                M = sum([PERIODIC_TABLE[a[0]] + a[3]*PERIODIC_TABLE['H'] for a in atoms])
+                rst = ({'nice':True, }, tuple([(k,tuple(v.items())) for k,v in groups.items()]), M)
+                _SMILES_CACHE.put(key, rst)
+        except ValueError as e:
+            rst = ({'nice':False, 'info':'Error: for SMILES < {:} >, {:}'.format(smiles,e)}, (), 0.0)
+        _SMILES_CACHE.put(smiles, rst)
+    return dict(rst[0]), dict([(k,dict(v)) for k,v in rst[1]]), rst[2]
+
+_SMILES_CACHE = LRUCache(maxsize=262144)
+
+
+
+def func_profile(file,fsize=None):
+    """This function is used to process input file, which has to define only one system
+       For many systems in one file, use func_profile_records
+
+       fsize: optional file size limit in MB, no limit by default
        Return:
             log, fdict"""
     log = {'nice':True,}
     try:
         sizetmp = os.stat(file).st_size
-        if sizetmp/1024/1024 > fsize:
+        if fsize is not None and sizetmp/1024/1024 > fsize:
             log['nice'] = False
             log['info'] = 'Error: the file size is far larger than {:} MB'.format(fsize)
-    except IOError:
+    except (IOError, OSError):
         log['nice'] = False
         log['info'] = 'Error : cannot open the file < {:} >!\n'.format(file)
-    
-    fdict = {}
-    if log['nice']:
-        profile = []
-        # format 2D: [  [ keyword-lower()-strip(), value-strip() ],  ]
-        with open(file,'rt') as f:
-            while True:
-                line = f.readline()
-                if len(line) == 0: break
-                
-                line = line.replace('\n', '')
-
-                proline = line
-                if proline.find('#') != -1: proline = proline[:proline.find('#')]
-                proline = proline.replace('\t',' ').strip()
-                if len(proline) == 0: continue
-                
-                if proline.find(':') == -1: log['nice'] = False
-                if log['nice']:
-                    proline = proline.replace('"','').replace("'",'')
-                    ltmp = proline.split(':',maxsplit=1)
-                    if len(ltmp[0].split()) == 0:
-                        log['nice'] = False
-                    else:
-                        profile.append([ltmp[0].lower().strip(), ltmp[1].strip()])
+    if not log['nice']: return log, {}
 
-                if not log['nice']:
-                    log['info'] = 'Error in line: < {:} >'.format(line)
-                    break
+    records = func_profile_records(file)
+    rst = next(records, None)
+    if rst is None: return func_pro_profile([])
+    if next(records, None) is not None:
+        log['nice'] = False
+        log['info'] = 'Error: more than one system is defined, separated by < {:} >'.format(RECORD_SEPARATOR)
+        return log, {}
+    return rst[1], rst[2]
 
-    if log['nice']:
-        # get 'mark' indices
-        ndxlist = []
-        for i,j in enumerate(profile):
+
+
+# separator line between systems in one input file
+RECORD_SEPARATOR = '---'
+
+# keyword < smiles > OR < smiles1 >, ...
+_SMILES_LINE = re.compile(r'\s*smiles\d*\s*:', re.IGNORECASE)
+
+@func_staged('file')
+def func_profile_records(file):
+    """
+    Process input file record by record, systems are separated by a line of RECORD_SEPARATOR
+
+    Memory is only for one record at a time, no limit for file size,
+    an error in one record does not abort the rest
+
+    Yield:
+        lineno, log, fdict
+
+        lineno : line number where the record begins, also set as log['line']
+    """
+    try:
+        f = open(file,'rt')
+    except (IOError, OSError):
+        yield 0, {'nice':False, 'line':0, 'info':'Error : cannot open the file < {:} >!\n'.format(file)}, {}
+        return
+
+    def fout(beg, log, profile):
+        if log['nice']: log, fdict = func_pro_profile(profile)
+        else: fdict = {}
+        log['line'] = beg
+        return beg, log, fdict
+
+    with f:
+        beg = None
+        log = {'nice':True,}
+        # format 2D: [  [ keyword-lower()-strip(), value-strip() ],  ]
+        profile = []
+        for cnt, line in enumerate(f, 1):
+            line = line.replace('\n', '')
+
+            proline = line
+            # for SMILES, '#' is triple bond, comments have to be separated by a blank space
+            if _SMILES_LINE.match(proline):
+                if re.search(r'\s#',proline): proline = proline[:re.search(r'\s#',proline).start()]
+            elif proline.find('#') != -1: proline = proline[:proline.find('#')]
+            proline = proline.replace('\t',' ').strip()
+            if len(proline) == 0: continue
+
+            if proline == RECORD_SEPARATOR:
+                if beg is not None: yield fout(beg, log, profile)
+                beg = None
+                log = {'nice':True,}
+                profile = []
+                continue
+
+            if beg is None: beg = cnt
+            # the rest of a wrong record is skipped
+            if not log['nice']: continue
+
+            if proline.find(':') == -1: log['nice'] = False
+            if log['nice']:
+                proline = proline.replace('"','').replace("'",'')
+                ltmp = proline.split(':',maxsplit=1)
+                if len(ltmp[0].split()) == 0:
+                    log['nice'] = False
+                else:
+                    profile.append([ltmp[0].lower().strip(), ltmp[1].strip()])
+
+            if not log['nice']:
+                log['info'] = 'Error in line {:}: < {:} >'.format(cnt,line)
+
+        if beg is not None: yield fout(beg, log, profile)
+
+
+
+def func_pro_index(key, prefix):
+    """
+    Get component number of keyword in mixture, e.g. ('m2','m') -> 2, ('no-ring-3','no-ring-') -> 3
+
+    Return:
+        int, None if key is not in that format
+    """
+    if key.startswith(prefix) and key[len(prefix):].isdigit():
+        n = int(key[len(prefix):])
+        if n > 0: return n
+    return None
+
+
+
+def func_mixture_size(fdict):
+    """
+    Number of components defined in mixture, the largest number of keywords
+    < m* > < s* > < smiles* > < ring-* > < no-ring-* >, return 0 if none is defined
+    """
+    n = 0
+    for k in fdict:
+        for prefix in ['m','s','smiles','ring-','no-ring-']:
+            i = func_pro_index(k,prefix)
+            if i is not None and i > n: n = i
+    return n
+
+
+
+def func_pro_ratio(y):
+    """
+    Normalize molar ratios, for all components except the last one, they are rounded to 3 decimals,
+    the last one is the rest
+
+    Parameter:
+        y : 1D list, float, e.g. [1, 1, 2]
+
+    Return:
+        dict, keys: ratio, y1, y2, ...
+    """
+    total = sum(y)
+    ys = [round(v/total,3) for v in y[:-1]]
+    ys.append(1.0 - sum(ys))
+    rdict = {'ratio':' : '.join(['{:}'.format(v) for v in ys])}
+    for i,v in enumerate(ys): rdict['y{:}'.format(i+1)] = v
+    return rdict
+
+
+
+def func_pro_profile(profile):
+    """
+    Process keyword entries of one system
+
+    Parameter:
+        profile : 2D list, [  [ keyword-lower()-strip(), value-strip() ],  ]
+
+    Return:
+        log, fdict
+    """
+    log = {'nice':True,}
+    fdict = {}
+    if log['nice']:
+        # get 'mark' indices
+        ndxlist = []
+        for i,j in enumerate(profile):
             if j[0] == 'mark': ndxlist.append(i)
         if len(ndxlist) > 0 and ndxlist[-1] >= len(profile) - 1:
             log['nice'] = False
@@ -472,35 +1543,28 @@ def func_profile(file,fsize=5):
                                 log['info'] = 'Error: wrong defined < type > entry < {:} >'.format(t)
                                 break
                     elif t[0] == 'ratio':
+                        # empty ratio means equal ratios, processed after all components are known
                         if t[1].find(':') == -1:
-                            if len(t[1].split()) == 0:
-                                y1 = 1.0
-                                y2 = 1.0
-                            else:
+                            if len(t[1].split()) != 0:
                                 log['nice'] = False
                         else:
-                            y = t[1].replace(' ','').split(':',maxsplit=1)
+                            y = t[1].replace(' ','').split(':')
                             try:
-                                y1 = float(y[0])
-                                y2 = float(y[1])
-                                if round(y1,5) == 0 or round(y2,5) == 0: raise ValueError
+                                y = [float(i) for i in y]
+                                if min([round(i,5) for i in y]) <= 0: raise ValueError
                             except ValueError:
                                 log['nice'] = False
                         if not log['nice']:
                             log['info'] = 'Error: wrong defined < ratio > entry < {:} >'.format(t)
                             break
-                        y1 = round(y1/(y1+y2),3)
-                        y2 = 1.0 - y1
-                        fdict['ratio'] = '{:} : {:}'.format(y1,y2)
-                        fdict['y1'] = y1
-                        fdict['y2'] = y2
+                        if t[1].find(':') != -1: fdict.update(func_pro_ratio(y))
                     elif t[0] == 'name':
                         if len(t[1].split()) != 0:
                             name = ''
                             for s in t[1].split(): name += ' ' + s
                             # remember to strip out of blank spaces!!!
                             fdict['name'] = name.strip()
-                    elif t[0] in ['m','m1','m2','t-ref','q-ref','t']:
+                    elif t[0] in ['m','t-ref','q-ref','t'] or func_pro_index(t[0],'m') is not None:
                         if len(t[1]) != 0:
                             try:
                                 mw = float(t[1])
@@ -510,7 +1574,8 @@ def func_profile(file,fsize=5):
                                 log['info'] = 'Error: wrong defined entry < {:} >'.format(t[1])
                                 break
                             fdict[t[0]] = mw
-                    elif t[0] in ['s','s1','s2']:
+                    elif t[0] in ['s','smiles'] or func_pro_index(t[0],'s') is not None or \
+                         func_pro_index(t[0],'smiles') is not None:
                         if len(t[1]) != 0: fdict[t[0]] = t[1]
                     elif t[0] in tmpdict:
                         log['nice'] = False
@@ -540,31 +1605,42 @@ def func_profile(file,fsize=5):
                             log['info'] = 'Error: no defined groups under < mark > entry'
                         break
 
-    # precendent: type > ring*, no-ring* > m* > s*
+    # precendent: type > ring*, no-ring* > m* > s* > smiles*
     if log['nice']:
         if 'type' not in fdict:
-            if 'ring' in fdict or 'no-ring' in fdict:
+            if 'ring' in fdict or 'no-ring' in fdict or 'smiles' in fdict:
                 fdict['type'] = 'purity'
-            elif 'ring-1' in fdict or 'ring-2' in fdict or 'no-ring-1' in fdict or 'no-ring-2' in fdict:
+            elif func_mixture_size(fdict) > 0:
                 fdict['type'] = 'mixture'
             else:
                 log['nice'] = False
                 log['info'] = 'Error: cannot define calculation < type >'
 
+    nm = 0
     if log['nice']:
         if fdict['type'] == 'purity':
-            if 'm' not in fdict and 's' not in fdict: log['nice'] = False
+            if all([k not in fdict for k in ['m','s','smiles']]): log['nice'] = False
         if fdict['type'] == 'mixture':
-            if 'm1' not in fdict and 's1' not in fdict: log['nice'] = False
-            if 'm2' not in fdict and 's2' not in fdict: log['nice'] = False
+            nm = max(func_mixture_size(fdict),2)
+            for i in range(1,nm+1):
+                if all([k.format(i) not in fdict for k in ['m{:}','s{:}','smiles{:}']]): log['nice'] = False
         if not log['nice']:
             log['info'] = 'Error: the molecular weight is not correctly defined'
 
+    if log['nice'] and fdict['type'] == 'mixture':
+        if 'y1' not in fdict:
+            fdict.update(func_pro_ratio([1.0 for i in range(nm)]))
+        elif 'y{:}'.format(nm) not in fdict or 'y{:}'.format(nm+1) in fdict:
+            log['nice'] = False
+            log['info'] = 'Error: < ratio > entry has to have < {:} > values for < {:} > components'.format(nm,nm)
+
     if log['nice']:
         # For future update
         namespace_both = ['name','type','t-ref','q-ref','t']
-        namespace_purity = ['ring', 'no-ring', 's', 'm']
-        namespace_mixture = ['ring-1','ring-2','no-ring-1','no-ring-2','y1','y2','ratio','s1','s2','m1','m2']
+        namespace_purity = ['ring', 'no-ring', 's', 'm', 'smiles']
+        namespace_mixture = ['ratio']
+        for i in range(1,nm+1):
+            namespace_mixture += [k.format(i) for k in ['ring-{:}','no-ring-{:}','y{:}','s{:}','m{:}','smiles{:}']]
         namespace_purity += namespace_both
         namespace_mixture += namespace_both
         if fdict['type'] == 'purity':
@@ -582,166 +1658,21 @@ def func_profile(file,fsize=5):
 
 
 
-class MLJR(object):
-    """
-    Modified Lydersen-Joback-Reid method
-
-    Works only for pure solvent or binary mixture 
+class Equations(object):
     """
-    # define constant values
-    CONST_AM = 0.5703
-    CONST_BM = 1.0121
-    CONST_CM = 0.2573
-    CONST_EM = 6.75
-
-    def __init__(self, *args, **kwargs):
-        self.log = {'nice':True, }
-        if 'type' in kwargs:
-            self.type = kwargs['type'] 
-        else:
-            self.log['nice'] = False
-            self.log['info'] = 'Error: calculation type is not defined'
-            return
-
-        if self.type == 'purity':
-            # self.table: 2D: [ [deltaTbM    deltaTM    deltaPM   deltaVM  Number], ... ]
-            if 'table' in kwargs:
-                self.table = kwargs['table'] 
-            else:
-                self.log['nice'] = False
-                self.log['info'] = 'Error: for < purity >, no input data'
-                return
-            if 'm' in kwargs:
-                self.m = kwargs['m'] 
-            else:
-                self.log['nice'] = False
-                self.log['info'] = 'Error: molecular weight is not defined'
-                return
-        elif self.type == 'mixture':
-            # self.table: 2D: [ [deltaTbM    deltaTM    deltaPM   deltaVM  Number], ... ]
-            if 'table1' in kwargs and 'table2' in kwargs:
-                self.table1 = kwargs['table1']
-                self.table2 = kwargs['table2'] 
-            else:
-                self.log['nice'] = False
-                self.log['info'] = 'Error: for < mixture >, input data is not correctly defined'
-                return
-            if 'm1' in kwargs and 'm2' in kwargs:
-                self.m1 = kwargs['m1'] 
-                self.m2 = kwargs['m2'] 
-            else:
-                self.log['nice'] = False
-                self.log['info'] = 'Error: molecular weight is not correctly defined'
-                return
-
-            self.y1 = kwargs['y1'] if 'y1' in kwargs else None
-            self.y2 = kwargs['y2'] if 'y2' in kwargs else None
-            if self.y1 is None and self.y2 is None:
-                self.y1 = self.y2 = 0.5
-            elif self.y1 is None or self.y2 is None:
-                self.log['nice'] = False
-                self.log['info'] = 'Error: molecular ratio is not correctly defined'
-                return
-        else:
-            self.log['nice'] = False
-            self.log['info'] = 'Error: the input calculation type is wrong'
-            return
-
-
-    def func_calc_critical(self, vTbM, nTbM, vTM, nTM, vPM, nPM, vVM, nVM, M):
-        """Return critical properties: Tc, Pc, Vc, Tb"""
-        Tb = self.func_calc_Tb(vTbM, nTbM)
-        Tc = self.func_calc_Tc(Tb, vTM, nTM)
-        Pc = self.func_calc_Pc(M, vPM, nPM)
-        Vc = self.func_calc_Vc(vVM, nVM)
-
-        return Tc, Pc, Vc, Tb
-
-
-    def run(self):
-        if self.type == 'purity':
-            self.purity()
-            self.w = self.func_calc_w(self.Tb, self.Tc, self.Pc)
-        else:
-            self.mixture()
-
-
-    def purity(self):
-        """
-        For pure solvent
-
-        Note: No self-check, if any errors happen, return ValueError Exception
-
-        Return:
-            Tc, Pc, Vc, Tb
-        """
-        # self.table: 2D: [ [deltaTbM    deltaTM    deltaPM   deltaVM   Number], ... ]
-        TbM_vlist = [i[0] for i in self.table]
-        TbM_nlist = [i[4] for i in self.table]
-        TM_vlist = [i[1] for i in self.table]
-        TM_nlist = [i[4] for i in self.table]
-        PM_vlist = [i[2] for i in self.table]
-        PM_nlist = [i[4] for i in self.table]
-        VM_vlist = [i[3] for i in self.table]
-        VM_nlist = [i[4] for i in self.table]
-        self.Tc, self.Pc, self.Vc, self.Tb =  self.func_calc_critical(TbM_vlist, TbM_nlist, TM_vlist, TM_nlist,
-                                                                      PM_vlist, PM_nlist, VM_vlist, VM_nlist, self.m)
-
-
-    def mixture(self):
-        """
-        For binary mixture solvent
+    Equations of Modified Lydersen-Joback-Reid method, defined by constants only
 
-        Note: No self-check, if any errors happen, return ValueError Exception
+    Results of MLJR keep an Equations instead of the MLJR that created them,
+    constants can also be numpy arrays or Dual, see func_run_samples, func_calc_gradients
 
-        Return:
-            Tcm, Pcm, Vcm, wm
-        """
-        # self.table: 2D: [ [deltaTbM    deltaTM    deltaPM   deltaVM   Number], ... ]
-        m1_TbM_vlist = [i[0] for i in self.table1]
-        m1_TbM_nlist = [i[4] for i in self.table1]
-        m1_TM_vlist = [i[1] for i in self.table1]
-        m1_TM_nlist = [i[4] for i in self.table1]
-        m1_PM_vlist = [i[2] for i in self.table1]
-        m1_PM_nlist = [i[4] for i in self.table1]
-        m1_VM_vlist = [i[3] for i in self.table1]
-        m1_VM_nlist = [i[4] for i in self.table1]
-
-        # get total M
-        self.m = self.y1*self.m1 + self.y2*self.m2
-
-        self.Tc1, self.Pc1, self.Vc1, self.Tb1 = self.func_calc_critical(m1_TbM_vlist, m1_TbM_nlist, m1_TM_vlist, m1_TM_nlist,
-                                                                         m1_PM_vlist, m1_PM_nlist, m1_VM_vlist, m1_VM_nlist,self.m1)
-        self.w1 = self.func_calc_w(self.Tb1, self.Tc1, self.Pc1)
-
-        Pc1_tmp = self.func_calc_Pc(self.m, m1_PM_vlist, m1_PM_nlist)
-        w1_tmp = self.func_calc_w(self.Tb1, self.Tc1, Pc1_tmp)
-
-        m2_TbM_vlist = [i[0] for i in self.table2]
-        m2_TbM_nlist = [i[4] for i in self.table2]
-        m2_TM_vlist = [i[1] for i in self.table2]
-        m2_TM_nlist = [i[4] for i in self.table2]
-        m2_PM_vlist = [i[2] for i in self.table2]
-        m2_PM_nlist = [i[4] for i in self.table2]
-        m2_VM_vlist = [i[3] for i in self.table2]
-        m2_VM_nlist = [i[4] for i in self.table2]
-        self.Tc2, self.Pc2, self.Vc2, self.Tb2 = self.func_calc_critical(m2_TbM_vlist, m2_TbM_nlist, m2_TM_vlist, m2_TM_nlist,
-                                                                         m2_PM_vlist, m2_PM_nlist, m2_VM_vlist, m2_VM_nlist,self.m2)
-        self.w2 = self.func_calc_w(self.Tb2, self.Tc2, self.Pc2)
-
-        Pc2_tmp = self.func_calc_Pc(self.m, m2_PM_vlist, m2_PM_nlist)
-        w2_tmp = self.func_calc_w(self.Tb2, self.Tc2, Pc2_tmp)
-
-        # workaround
-        Vcij = self.func_calc_Vcij(self.Vc1,self.Vc2)
-        Tcij = self.func_calc_Tcij(self.Tc1,self.Tc2)
-
-        self.Vcm = self.func_calc_Vcm(self.y1,self.y2,Vcij)
-        self.Tcm = self.func_calc_Tcm(self.Vcm,self.y1,self.y2,Vcij,Tcij)
-
-        self.wm = self.func_calc_wm(w1_tmp, self.y1, w2_tmp, self.y2)
-        self.Pcm = self.func_calc_Pcm(self.Tcm, self.Vcm, self.wm)
-        self.Tbm = self.Tb1 * self.y1 + self.Tb2 * self.y2
+    Attributes:
+        CONST_AM, CONST_BM, CONST_CM, CONST_EM
+    """
+    def __init__(self, AM, BM, CM, EM):
+        self.CONST_AM = AM
+        self.CONST_BM = BM
+        self.CONST_CM = CM
+        self.CONST_EM = EM
 
 
     def func_calc_sum(self, vlist, nlist=None):
@@ -819,79 +1750,78 @@ class MLJR(object):
         return self.CONST_EM + self.func_calc_sum(vlist,nlist)
 
 
-    def func_calc_Vcm(self, yi, yj, Vcij):
+    def func_calc_quad(self, y, Xij):
         """
         Parameters:
-            yi   : float, ratio for component i  
-            yj   : float, ratio for component j
-            Vcij : 2D matrix, in C-type, [ [Vcii, Vcij], [ Vcji, Vcjj] ]
+            y    : 1D list, ratios of all components,
+                   OR 2D numpy array in shape (ratios, components)
+            Xij  : 2D matrix, in C-type, [ [X11, X12, ...], [ X21, X22, ...], ... ]
 
             Note: they have to correspond to each other
         Return:
-            Vcm = SUM{SUM{yi*yj*Vcij}}
+            y.X.y = SUM{SUM{yi*yj*Xij}}
         """
-        yii = yi*yi*Vcij[0][0]
-        yij = yi*yj*Vcij[0][1]
-        yji = yj*yi*Vcij[1][0]
-        yjj = yj*yj*Vcij[1][1]
+        if func_is_array(y):
+            return np.einsum('...i,ij,...j->...', y, np.asarray(Xij,dtype=float), y)
+        return sum([sum([yi*yj*Xij[i][j] for j,yj in enumerate(y)]) for i,yi in enumerate(y)])
 
-        return yii + yij + yji + yjj
 
-
-    def func_calc_Vcij(self, Vci, Vcj):
+    def func_calc_Vcm(self, y, Vcij):
         """
         Parameters:
-            Vci : float, for component i
-            Vcj : float, for component j
+            y    : 1D list, ratios of all components, see func_calc_quad
+            Vcij : 2D matrix, in C-type, [ [Vc11, Vc12, ...], [ Vc21, Vc22, ...], ... ]
 
             Note: they have to correspond to each other
         Return:
-            Vcij : 2D matrix, in C-type, [ [Vcii, Vcij], [ Vcji, Vcjj] ]
+            Vcm = SUM{SUM{yi*yj*Vcij}}
+        """
+        return self.func_calc_quad(y, Vcij)
+
+
+    def func_calc_Vcij(self, Vc):
+        """
+        Parameters:
+            Vc : 1D list, float, for all components
+
+        Return:
+            Vcij : 2D matrix, in C-type, [ [Vc11, Vc12, ...], [ Vc21, Vc22, ...], ... ]
         """
         def func_calc_cube(i,j):
             return pow(pow(i,1/3)+pow(j,1/3),3)
-        
-        return [[1/8*func_calc_cube(Vci,Vci), 1/8*func_calc_cube(Vci,Vcj)],
-                [1/8*func_calc_cube(Vcj,Vci), 1/8*func_calc_cube(Vcj,Vcj)]]
 
+        return [[1/8*func_calc_cube(i,j) for j in Vc] for i in Vc]
 
-    def func_calc_Tcij(self, Tci, Tcj):
+
+    def func_calc_Tcij(self, Tc):
         """
         Parameters:
-            Tci : float, for component i
-            Tcj : float, for component j
+            Tc : 1D list, float, for all components
 
             Note: kij is assumed to be 1 due to lack of literature values
-            Note: they have to correspond to each other
         Return:
-            Tcij : 2D matrix, in C-type, [ [Tcii, Tcij], [ Tcji, Tcjj] ]
+            Tcij : 2D matrix, in C-type, [ [Tc11, Tc12, ...], [ Tc21, Tc22, ...], ... ]
         """
         def func_calc_power(i,j):
             return pow(i*j,1/2)
-        
-        return [[func_calc_power(Tci,Tci), func_calc_power(Tci,Tcj)],
-                [func_calc_power(Tcj,Tci), func_calc_power(Tcj,Tcj)]]
+
+        return [[func_calc_power(i,j) for j in Tc] for i in Tc]
 
 
-    def func_calc_Tcm(self, Vcm, yi, yj, Vcij, Tcij):
+    def func_calc_Tcm(self, Vcm, y, Vcij, Tcij):
         """
         Parameters:
-            Vcm  : float, for binary mixture, critical Volume
-            yi   : float, ratio for component i  
-            yj   : float, ratio for component j
-            Vcij : 2D matrix, in C-type, [ [Vcii, Vcij], [ Vcji, Vcjj] ]
-            Tcij : 2D matrix, in C-type, [ [Tcii, Tcij], [ Tcji, Tcjj] ]
+            Vcm  : float, for mixture, critical Volume
+            y    : 1D list, ratios of all components, see func_calc_quad
+            Vcij : 2D matrix, in C-type, [ [Vc11, Vc12, ...], [ Vc21, Vc22, ...], ... ]
+            Tcij : 2D matrix, in C-type, [ [Tc11, Tc12, ...], [ Tc21, Tc22, ...], ... ]
 
             Note: they have to correspond to each other
         Return:
             Tcm = 1 / pow(Vcm,1/4) * SUM{SUM{yi*yj*pow(Vij,1/4)*Tcij}}
         """
-        tii = yi * yi * pow(Vcij[0][0],1/4) * Tcij[0][0]
-        tij = yi * yj * pow(Vcij[0][1],1/4) * Tcij[0][1]
-        tji = yj * yi * pow(Vcij[1][0],1/4) * Tcij[1][0]
-        tjj = yj * yj * pow(Vcij[1][1],1/4) * Tcij[1][1]
-
-        return (tii + tij + tji + tjj) / pow(Vcm,1/4)
+        Xij = [[pow(v,1/4)*t for v,t in zip(vi,ti)] for vi,ti in zip(Vcij,Tcij)]
+        return self.func_calc_quad(y, Xij) / pow(Vcm,1/4)
 
 
     def func_calc_w(self, Tb, Tc, Pc, Pb=1.0):
@@ -906,32 +1836,35 @@ class MLJR(object):
             w: arentric factor for pure solvent
         """
         t = (Tb-43)*(Tc-43) / ((Tc-Tb)*(0.7*Tc-43))
-        l = math.log10(Pc/Pb)
+        # arrays are used by batch calculations, Dual by gradients
+        if isinstance(Pc,Dual):
+            l = (Pc/Pb).log10()
+        else:
+            l = np.log10(Pc/Pb) if func_is_array(Pc) else math.log10(Pc/Pb)
         s = (Tc-43) / (Tc-Tb)
 
         return t*l - s*l + l - 1
 
 
-    def func_calc_wm(self, wi, yi, wj, yj):
+    def func_calc_wm(self, w, y):
         """
         Parameters:
-            wi  : float, for binary mixture, arentric factor for i
-            yi  : float, ratio for component i
+            w   : 1D list, for mixture, arentric factors for all components
+            y   : 1D list, ratios for all components
 
-            wj  : float, for binary mixture, arentric factor for j
-            yj  : float, ratio for component j
+            Note: they have to correspond to each other
         Return:
-            wm: arentric factor for binary mixture
+            wm: arentric factor for mixture
         """
-        return wi*yi + wj*yj
+        return sum([wi*yi for wi,yi in zip(w,y)])
 
 
     def func_calc_Pcm(self, Tcm, Vcm, wm, R=8.314):
         """
         Parameters:
-            Tcm  : float, for binary mixture, critical Temperature
-            Vcm  : float, for binary mixture, critical Volume
-            wm   : float, for binary mixture, acentric factor
+            Tcm  : float, for mixture, critical Temperature
+            Vcm  : float, for mixture, critical Volume
+            wm   : float, for mixture, acentric factor
 
             R    : Gas constant, 8.314 J/mol K
         Return:
@@ -942,90 +1875,3126 @@ class MLJR(object):
 
 
 
-def func_calc_st(T,Qref,Tref,Tc):
-    """
-    Calculate Elevated Temperature Surface Tension
-    Parameters:
-        Qref  :  Reference Surface Tension at temperature T, (mN/m)
-        Tref  :  Reference temperature (K)
-        Tc    :  Critical temperature (K)
-    Return:
-        Surface Tension at temperature T
+class MLJR(Equations):
     """
-    tmp = (Tc-T)/(Tc-Tref)
-    return pow(tmp,11/9)*Qref
+    Modified Lydersen-Joback-Reid method
 
+    Works for pure solvent or mixture of any number of components,
+    components are defined by keywords < table1 > < m1 > < y1 >, < table2 > < m2 > < y2 >, ...
 
-def func_calc_density(M,T,Tc,Pc,Vc,Tb):
+    Each table is a Component, or a 2D list, see MLJR.component,
+    molecular weight < m > can be omitted for Component
     """
-    Function to calculate density
+    # define constant values
+    CONST_AM = 0.5703
+    CONST_BM = 1.0121
+    CONST_CM = 0.2573
+    CONST_EM = 6.75
 
-    Parameters:
-        Tc  :  Critical temperature (K)
-        Pc  :  Critical pressure (bar)
-        Vc  :  Critical molar volume (cm^3/mol)
-        Tb  :  Normal boiling temperature (K)
-        M   :  Molecular weight (g/mol)
-        
-    Return:
-        Be extremely careful about the unit: 1 bar = 100000 Pa
-        D   :  density (g/mL)
-    """
-    Tr = T / Tc
-    Tbr = Tb / Tc
-    beta = (-1.0 - pow(1-Tr,2/7)) / (1 + pow(1-Tbr, 2/7))
-    tmp = pow(0.3445*Pc*pow(Vc,1.0135)/Tc/8.314/10, beta)
-    D = M * Pc / 8.314 / Tc * tmp / 10
-    return D
+    # component results shared by purity and mixture, set to None to disable
+    cache = LRUCache(maxsize=4096)
 
+    def __init__(self, *args, **kwargs):
+        self.log = {'nice':True, }
+        if 'type' in kwargs:
+            self.type = kwargs['type'] 
+        else:
+            self.log['nice'] = False
+            self.log['info'] = 'Error: calculation type is not defined'
+            return
 
+        if self.type == 'purity':
+            # self.table: Component, OR 2D: [ [deltaTbM    deltaTM    deltaPM   deltaVM  Number], ... ]
+            if 'table' in kwargs:
+                self.table = kwargs['table'] 
+            else:
+                self.log['nice'] = False
+                self.log['info'] = 'Error: for < purity >, no input data'
+                return
+            if 'm' in kwargs:
+                self.m = kwargs['m'] 
+            elif isinstance(self.table,Component):
+                self.m = self.table.M
+            else:
+                self.log['nice'] = False
+                self.log['info'] = 'Error: molecular weight is not defined'
+                return
+        elif self.type == 'mixture':
+            # self.tables: 3D: [ table1, table2, ... ], same format as purity
+            self.n = 0
+            while 'table{:}'.format(self.n+1) in kwargs: self.n += 1
+            if self.n >= 2:
+                self.tables = [kwargs['table{:}'.format(i)] for i in range(1,self.n+1)]
+            else:
+                self.log['nice'] = False
+                self.log['info'] = 'Error: for < mixture >, input data is not correctly defined'
+                return
+            ms = [kwargs.get('m{:}'.format(i+1), getattr(t,'M',None)) for i,t in enumerate(self.tables)]
+            if all([m is not None for m in ms]):
+                self.ms = ms
+            else:
+                self.log['nice'] = False
+                self.log['info'] = 'Error: molecular weight is not correctly defined'
+                return
 
-def func_pro_argparse():
-    """
-    Process input arguments
-    Return:
-       Namespace(file=None, sample=False, template=False, CCG=False, CCl=False, avail_group_name=False, output=False)
-    """
-    parser = argparse.ArgumentParser(description='Critical Properties Calculation using Modified Lydersen-Joback-Reid method',allow_abbrev=False)
-    parser.add_argument('-v','--version',action='version',version='mLJR {:}'.format(__version__))
-    parser.add_argument('-f','--file',help='Input file path')
-    parser.add_argument('-s','--sample',help='Template shows on screen (default)',action='store_true')
-    parser.add_argument('-t','--template',help='Template writes into a file',action='store_true')
-    parser.add_argument('--CCl',help='Template molecule, Choline Chloride <purity> (default)',action='store_true')
-    parser.add_argument('--CCG',help='Template molecule, Choline Chloride Glycerol <mixture>',action='store_true')
-    parser.add_argument('-g','--avail-group-name',help='Available Group Names <include nick names>',action='store_true')
-    parser.add_argument('-o','--output',help='Append results to input file (default False)',action='store_true')
-    parser.add_argument('-e','--examples',help='Show command line examples',action='store_true')
-    parser.add_argument('-x','--calc',help='If only one input, it will be thought as T, the density value will be \
-                            calculated, if it has three inputs, which has to be input in a sequence (T-ref, Q-ref, T), \
-                            then both density and surface tension will be calculated, if else, wrong',
-                            nargs='+',type=float)
+            self.ys = [kwargs.get('y{:}'.format(i)) for i in range(1,self.n+1)]
+            if all([y is None for y in self.ys]):
+                self.ys = [1.0/self.n for i in range(self.n)]
+            elif any([y is None for y in self.ys]):
+                self.log['nice'] = False
+                self.log['info'] = 'Error: molecular ratio is not correctly defined'
+                return
 
-    return parser
+            # per component attributes, table1, m1, y1, ...
+            for i in range(self.n):
+                setattr(self, 'table{:}'.format(i+1), self.tables[i])
+                setattr(self, 'm{:}'.format(i+1), self.ms[i])
+                setattr(self, 'y{:}'.format(i+1), self.ys[i])
+        else:
+            self.log['nice'] = False
+            self.log['info'] = 'Error: the input calculation type is wrong'
+            return
 
 
+    def func_calc_critical(self, vTbM, nTbM, vTM, nTM, vPM, nPM, vVM, nVM, M):
+        """Return critical properties: Tc, Pc, Vc, Tb"""
+        Tb = self.func_calc_Tb(vTbM, nTbM)
+        Tc = self.func_calc_Tc(Tb, vTM, nTM)
+        Pc = self.func_calc_Pc(M, vPM, nPM)
+        Vc = self.func_calc_Vc(vVM, nVM)
 
-def main():
-    """main!"""
+        return Tc, Pc, Vc, Tb
 
-    # process arguments
-    parser = func_pro_argparse()
-    args = parser.parse_args()
-    #Namespace(file=None, sample=False, template=False, CCG=False, CCl=False, avail_group_name=False, output=False)
-    # avoid no inputs, print help message instead
-    bo = True
-    for i in args.__dict__:
-        if not ( args.__dict__[i] is False or args.__dict__[i] is None ):
-            bo = False
-            break
-    if bo:
-        parser.print_help()
-        exit()
-    
-    # particular check density and surface tension inputs
-    if args.calc is not None and len(args.calc) not in [1,3]:
-        print('Error: the input parameter(s) in -x/--calc is not correctly defined')
+
+    @func_staged('run')
+    def run(self, t=None, t_ref=None, q_ref=None):
+        """
+        Parameters:
+            t     : temperature (K), optional, density (and surface tension) is calculated at t
+            t_ref : reference temperature, optional
+            q_ref : reference Surface Tension at t_ref, optional
+
+        Note: Nothing is calculated here, properties are calculated on their first access,
+              they are also attributes of MLJR, e.g. rst.Tc, rst.Tcm, rst.Tc1, rst.d
+
+        Return:
+            Purity or Mixture
+        """
+        if self.type == 'purity':
+            self.result = self.purity(t, t_ref, q_ref)
+            keys = ['Tc', 'Pc', 'Vc', 'Tb', 'w']
+        else:
+            self.result = self.mixture(t, t_ref, q_ref)
+            keys = ['Tcm', 'Pcm', 'Vcm', 'Tbm', 'wm']
+        # when profiling, critical properties are calculated here to be timed as < run >,
+        # errors are raised again on their access
+        if _PROFILE_HOOKS:
+            try:
+                for k in keys: getattr(self.result, k)
+            except (ValueError, TypeError, ArithmeticError):
+                pass
+        return self.result
+
+
+    def __getattr__(self, name):
+        # results of run, calculated on first access
+        result = self.__dict__.get('result')
+        if result is None:
+            raise AttributeError('{:} object has no attribute {:}'.format(repr(type(self).__name__),repr(name)))
+        return getattr(result, name)
+
+
+    def equations(self):
+        """Return Equations with current constants, results never keep a reference to MLJR"""
+        return Equations(self.CONST_AM, self.CONST_BM, self.CONST_CM, self.CONST_EM)
+
+
+    def component(self, table, M):
+        """
+        Critical properties of one molecule, memoized in MLJR.cache
+
+        Parameters:
+            table : Component, its contribution sums are used,
+                    OR 2D: [ [deltaTbM    deltaTM    deltaPM   deltaVM   Number], ... ]
+            M     : molecular weight
+
+        Note: No self-check, if any errors happen, return ValueError Exception
+
+        Return:
+            Critical
+        """
+        if isinstance(table,Component):
+            sums = table.sums
+        else:
+            nlist = [i[4] for i in table]
+            sums = tuple([self.func_calc_sum([i[k] for i in table], nlist) for k in range(4)])
+
+        # contribution sums reflect the contribution-table version, constants are included as well
+        key = None
+        if self.cache is not None:
+            key = (sums, M, (self.CONST_AM, self.CONST_BM, self.CONST_CM, self.CONST_EM))
+            rst = self.cache.get(key)
+            if rst is not None: return rst
+
+        rst = Critical(self.equations(), sums, M)
+
+        if key is not None: self.cache.put(key, rst)
+        return rst
+
+
+    def purity(self, t=None, t_ref=None, q_ref=None):
+        """
+        For pure solvent
+
+        Note: No self-check, if any errors happen, return ValueError Exception
+
+        Return:
+            Purity, Tc, Pc, Vc, Tb, w
+        """
+        # self.table: Component, OR 2D: [ [deltaTbM    deltaTM    deltaPM   deltaVM   Number], ... ]
+        return Purity(self.component(self.table, self.m), t, t_ref, q_ref)
+
+
+    def mixture(self, t=None, t_ref=None, q_ref=None):
+        """
+        For mixture solvent
+
+        Note: No self-check, if any errors happen, return ValueError Exception
+
+        Return:
+            Mixture, Tcm, Pcm, Vcm, wm
+        """
+        # self.tables: 3D: [ table1, table2, ... ]
+        comps = [self.component(t,m) for t,m in zip(self.tables,self.ms)]
+        return Mixture(self.equations(), comps, self.ys, t, t_ref, q_ref)
+
+
+    def sweep(self, y1):
+        """
+        For mixture solvent, evaluate over a whole array of molar ratios
+
+        Note: properties of all components, Vcij & Tcij are only calculated once
+
+        Parameter:
+            y1 : 1D array-like, for binary mixture, molar ratio of component 1, (y2 = 1 - y1)
+                 OR 2D array-like, in shape (ratios, components), each row sums to 1
+
+        Return:
+            dict of 1D numpy arrays, keys: y1, y2, ..., m, Vcm, Tcm, wm, Pcm, Tbm
+        """
+        if func_numpy() is None:
+            raise ImportError('Error: numpy is required for ratio sweep')
+        y = np.asarray(y1,dtype=float)
+        if y.ndim == 1:
+            if self.n != 2:
+                raise ValueError('Error: molar ratio of component 1 only works for binary mixture')
+            y = np.stack([y,1.0-y],axis=-1)
+        if y.ndim != 2 or y.shape[1] != self.n:
+            raise ValueError('Error: molar ratios have to be in shape (ratios, {:})'.format(self.n))
+
+        # components, run only once
+        comps = [self.component(t,m) for t,m in zip(self.tables,self.ms)]
+        mix = Mixture(self.equations(), comps, y)
+
+        sweep = dict([('y{:}'.format(i+1),y[:,i]) for i in range(self.n)])
+        for k in ['m', 'Vcm', 'Tcm', 'wm', 'Pcm', 'Tbm']: sweep[k] = getattr(mix,k)
+        return sweep
+
+
+    def gradients(self, t=None, t_ref=None, q_ref=None):
+        """
+        Exact derivatives of all outputs with respect to group counts, molar ratios,
+        temperature and constants, calculated along with the values in one evaluation
+
+        Note: tables have to be Component, see func_calc_gradients
+
+        Parameters:
+            t, t_ref, q_ref : same as MLJR.run, t can also be a 1D array
+
+        Return:
+            names, values, jac, see func_calc_gradients
+        """
+        if self.type == 'purity':
+            tables, ms, ys = [self.table], [self.m], None
+        else:
+            tables, ms, ys = self.tables, self.ms, self.ys
+        if not all([isinstance(c,Component) for c in tables]):
+            raise TypeError('Error: gradients require Component tables')
+        comps = [Component(c.counts,m,c.name) for c,m in zip(tables,ms)]
+        return func_calc_gradients(comps, ys, t, t_ref, q_ref)
+
+
+    def solve(self, targets, t, prop='d', t_ref=None, q_ref=None, ngrid=101, tol=1e-10, maxiter=100):
+        """
+        For binary mixture solvent, inverse solver, find molar ratio y1 that hits target property
+
+        All targets are solved at once: a grid of y1 in (0, 1) brackets the first sign change
+        for each target, then a vectorized bisection runs over the equations of MLJR.sweep
+
+        Parameters:
+            targets : 1D array-like, target density (g/mL) or surface tension (mN/m)
+            t       : temperature (K)
+            prop    : 'd' for density, 'st' for surface tension
+            t_ref   : reference temperature, required by < st >
+            q_ref   : reference Surface Tension at t_ref, required by < st >
+            ngrid   : number of grid points to bracket roots
+            tol     : tolerance of y1
+
+        Return:
+            1D numpy array, y1 for each target, numpy.nan if the target is not reachable
+        """
+        if func_numpy() is None:
+            raise ImportError('Error: numpy is required for inverse solver')
+        if prop not in ['d','st']:
+            raise ValueError('Error: property has to be < d > or < st >')
+        if prop == 'st' and (t_ref is None or q_ref is None):
+            raise ValueError('Error: reference temperature and surface tension are required for < st >')
+
+        def fprop(y1):
+            sweep = self.sweep(y1)
+            if prop == 'd':
+                return func_calc_density(sweep['m'],t,sweep['Tcm'],sweep['Pcm'],sweep['Vcm'],sweep['Tbm'])
+            return func_calc_st(t,q_ref,t_ref,sweep['Tcm'])
+
+        targets = np.atleast_1d(np.asarray(targets,dtype=float))
+        grid = np.linspace(0.0,1.0,ngrid+2)[1:-1]
+        # shape (targets, grid)
+        diff = fprop(grid)[np.newaxis,:] - targets[:,np.newaxis]
+        cross = np.sign(diff[:,:-1]) * np.sign(diff[:,1:]) <= 0
+        found = cross.any(axis=1)
+        ndx = np.argmax(cross,axis=1)
+
+        lo = grid[ndx]
+        hi = grid[np.minimum(ndx+1,len(grid)-1)]
+        flo = diff[np.arange(len(targets)),ndx]
+        for i in range(maxiter):
+            if np.all(hi - lo < tol): break
+            mid = (lo + hi) / 2
+            fmid = fprop(mid) - targets
+            left = np.sign(fmid) * np.sign(flo) <= 0
+            hi = np.where(left, mid, hi)
+            lo = np.where(left, lo, mid)
+            flo = np.where(left, flo, fmid)
+
+        return np.where(found, (lo + hi) / 2, np.nan)
+
+
+
+class Critical(object):
+    """
+    Critical properties of one molecule, returned by MLJR.component, shared through MLJR.cache
+
+    Every property is calculated on its first access, then cached
+
+    Attributes:
+        M                 : molecular weight (g/mol)
+        sums              : same as Component.sums
+        Tb, Tc, Pc, Vc, w : by MLJR equations
+        SP                : SUM{ n*deltaPM }
+    """
+    __slots__ = ('equations', 'M', 'sums', '_Tb', '_Tc', '_Pc', '_Vc', '_w')
+
+    def __init__(self, equations, sums, M):
+        # sums can also be numpy arrays, see func_run_samples
+        if any([v is None for v in sums]):
+            raise TypeError('group contributions are not defined')
+        # Equations, constants are the same as in the key of MLJR.cache
+        self.equations = equations
+        self.sums = sums
+        self.M = M
+
+    @property
+    def SP(self):
+        return self.sums[2]
+
+    @func_lazy
+    def Tb(self):
+        return self.equations.func_calc_Tb([self.sums[0]])
+
+    @func_lazy
+    def Tc(self):
+        return self.equations.func_calc_Tc(self.Tb, [self.sums[1]])
+
+    @func_lazy
+    def Pc(self):
+        return self.equations.func_calc_Pc(self.M, [self.sums[2]])
+
+    @func_lazy
+    def Vc(self):
+        return self.equations.func_calc_Vc([self.sums[3]])
+
+    @func_lazy
+    def w(self):
+        return self.equations.func_calc_w(self.Tb, self.Tc, self.Pc)
+
+
+
+class Purity(object):
+    """
+    Result of MLJR.run for pure solvent, every property is calculated on its first access
+
+    Attributes:
+        comp                 : Critical
+        m, Tc, Pc, Vc, Tb, w : same as Critical
+        t, t_ref, q_ref      : same as MLJR.run
+        d                    : density at t (g/mL), None if t is not defined
+        st                   : surface tension at t (mN/m), None if t, t_ref or q_ref is not defined
+    """
+    __slots__ = ('comp', 't', 't_ref', 'q_ref', '_d', '_st')
+
+    def __init__(self, comp, t=None, t_ref=None, q_ref=None):
+        self.comp = comp
+        self.t = t
+        self.t_ref = t_ref
+        self.q_ref = q_ref
+
+    m = property(lambda self: self.comp.M)
+    Tc = property(lambda self: self.comp.Tc)
+    Pc = property(lambda self: self.comp.Pc)
+    Vc = property(lambda self: self.comp.Vc)
+    Tb = property(lambda self: self.comp.Tb)
+    w = property(lambda self: self.comp.w)
+
+    @func_lazy
+    def d(self):
+        if self.t is None: return None
+        return func_calc_density(self.m, self.t, self.Tc, self.Pc, self.Vc, self.Tb)
+
+    @func_lazy
+    def st(self):
+        if self.t is None or self.t_ref is None or self.q_ref is None: return None
+        return func_calc_st(self.t, self.q_ref, self.t_ref, self.Tc)
+
+
+
+class Mixture(object):
+    """
+    Result of MLJR.run for mixture solvent, mixing rules are also used by MLJR.sweep
+
+    Every property is calculated on its first access, e.g. Tcm does not need any acentric factor,
+    properties of components are attributes as Tc1, Pc1, Vc1, Tb1, w1, Tc2, ...
+
+    Attributes:
+        comps                   : 1D list of Critical
+        ys                      : 1D list, molar ratios of all components,
+                                  OR 2D numpy array in shape (ratios, components), evaluate all ratios at once
+        m, Vcm, Tcm, wm, Pcm, Tbm
+        t, t_ref, q_ref, d, st  : same as Purity
+    """
+    __slots__ = ('equations', 'comps', 'ys', 't', 't_ref', 'q_ref',
+                 '_yk', '_Vcij', '_Tcij', '_m', '_Vcm', '_Tcm', '_wm', '_Pcm', '_Tbm', '_d', '_st')
+
+    def __init__(self, equations, comps, ys, t=None, t_ref=None, q_ref=None):
+        # Equations, same as for comps
+        self.equations = equations
+        self.comps = comps
+        self.ys = ys
+        self.t = t
+        self.t_ref = t_ref
+        self.q_ref = q_ref
+
+
+    def __getattr__(self, name):
+        # Tc1, Pc1, Vc1, Tb1, w1, ...
+        for k in ['Tc','Pc','Vc','Tb','w']:
+            n = func_pro_index(name, k)
+            if n is not None and n <= len(self.comps): return getattr(self.comps[n-1], k)
+        raise AttributeError('{:} object has no attribute {:}'.format(repr(type(self).__name__),repr(name)))
+
+    @func_lazy
+    def yk(self):
+        # molar ratio of each component, components are in last axis
+        if func_is_array(self.ys): return [self.ys[...,i] for i in range(len(self.comps))]
+        return self.ys
+
+    @func_lazy
+    def Vcij(self):
+        return self.equations.func_calc_Vcij([c.Vc for c in self.comps])
+
+    @func_lazy
+    def Tcij(self):
+        return self.equations.func_calc_Tcij([c.Tc for c in self.comps])
+
+    @func_lazy
+    def m(self):
+        return sum([yi*c.M for yi,c in zip(self.yk,self.comps)])
+
+    @func_lazy
+    def Vcm(self):
+        return self.equations.func_calc_Vcm(self.ys, self.Vcij)
+
+    @func_lazy
+    def Tcm(self):
+        return self.equations.func_calc_Tcm(self.Vcm, self.ys, self.Vcij, self.Tcij)
+
+    @func_lazy
+    def wm(self):
+        # same as func_calc_Pc, with total M
+        CM = self.equations.CONST_CM
+        wk = [self.equations.func_calc_w(c.Tb, c.Tc, self.m / (CM + c.SP) / (CM + c.SP)) for c in self.comps]
+        return self.equations.func_calc_wm(wk, self.yk)
+
+    @func_lazy
+    def Pcm(self):
+        return self.equations.func_calc_Pcm(self.Tcm, self.Vcm, self.wm)
+
+    @func_lazy
+    def Tbm(self):
+        return sum([c.Tb*yi for c,yi in zip(self.comps,self.yk)])
+
+    @func_lazy
+    def d(self):
+        if self.t is None: return None
+        return func_calc_density(self.m, self.t, self.Tcm, self.Pcm, self.Vcm, self.Tbm)
+
+    @func_lazy
+    def st(self):
+        if self.t is None or self.t_ref is None or self.q_ref is None: return None
+        return func_calc_st(self.t, self.q_ref, self.t_ref, self.Tcm)
+
+
+
+@func_staged('property')
+def func_calc_st(T,Qref,Tref,Tc):
+    """
+    Calculate Elevated Temperature Surface Tension
+    Parameters:
+        T     :  float or 1D array-like, temperature (K)
+        Qref  :  Reference Surface Tension at temperature T, (mN/m)
+        Tref  :  Reference temperature (K)
+        Tc    :  Critical temperature (K)
+    Return:
+        Surface Tension at temperature T, numpy array if T is array-like
+    """
+    if isinstance(T,(list,tuple)) or func_is_array(T): T = func_numpy().asarray(T,dtype=float)
+    # independent of T
+    tmp = Qref / pow(Tc-Tref,11/9)
+    return pow(Tc-T,11/9)*tmp
+
+
+@func_staged('property')
+def func_calc_density(M,T,Tc,Pc,Vc,Tb):
+    """
+    Function to calculate density
+
+    Parameters:
+        T   :  float or 1D array-like, temperature (K)
+        Tc  :  Critical temperature (K)
+        Pc  :  Critical pressure (bar)
+        Vc  :  Critical molar volume (cm^3/mol)
+        Tb  :  Normal boiling temperature (K)
+        M   :  Molecular weight (g/mol)
+        
+    Return:
+        Be extremely careful about the unit: 1 bar = 100000 Pa
+        D   :  density (g/mL), numpy array if T is array-like
+    """
+    if isinstance(T,(list,tuple)) or func_is_array(T): T = func_numpy().asarray(T,dtype=float)
+    # independent of T, only calculated once for all temperatures
+    Tbr = Tb / Tc
+    beta_b = 1 + pow(1-Tbr, 2/7)
+    base = 0.3445*Pc*pow(Vc,1.0135)/Tc/8.314/10
+    Dc = M * Pc / 8.314 / Tc / 10
+
+    Tr = T / Tc
+    beta = (-1.0 - pow(1-Tr,2/7)) / beta_b
+    D = Dc * pow(base, beta)
+    return D
+
+
+
+def func_pro_batch_data():
+    """
+    Pre-process DATA_LJR_NO_RING and DATA_LJR_RING into a contribution matrix
+
+    Return:
+        names : 1D list, [ [ allNames ], ... ], one entry for each group
+        data  : 2D numpy array, shape (groups, 4), [ deltaTbM    deltaTM    deltaPM   deltaVM ]
+
+        rows are in sequence of DATA_LJR_NO_RING then DATA_LJR_RING,
+        undefined contributions (None) are set to numpy.nan
+    """
+    if func_numpy() is None:
+        raise ImportError('Error: numpy is required for batch calculation')
+    tables = func_group_tables()
+    offsets, values = func_group_columns()
+    names = [i[0] for i in tables['no-ring'] + tables['ring']]
+    data = np.array([[np.nan if v is None else v for v in i] for i in values], dtype=float)
+    return names, data
+
+
+
+def func_batch_counts(complist):
+    """
+    Convert group definitions of many molecules to a group-count matrix
+
+    Parameter:
+        complist : 1D list of dict, for each molecule, in a format,
+                   { 'no-ring' : { symbol : number, ... },  'ring' : { symbol : number, ... } }
+
+    Return:
+        2D numpy array, shape (molecules, groups), columns follow func_pro_batch_data
+    """
+    names, data = func_pro_batch_data()
+    counts = np.zeros((len(complist),len(names)))
+    for i,comp in enumerate(complist):
+        counts[i] = func_pro_counts(comp)
+    return counts
+
+
+
+def func_calc_batch(counts, M, Pb=1.0):
+    """
+    Vectorized critical properties for many pure molecules at once
+
+    Parameters:
+        counts : 2D array-like, shape (molecules, groups), number of each group,
+                 columns follow DATA_LJR_NO_RING + DATA_LJR_RING, see func_batch_counts
+        M      : 1D array-like, molecular weight for each molecule (g/mol)
+
+        Pb     : 1 bar, same as MLJR.func_calc_w
+
+    Note: molecules using groups whose contributions are undefined get numpy.nan
+
+    Return:
+        Tc, Pc, Vc, Tb, w : 1D numpy arrays
+    """
+    names, data = func_pro_batch_data()
+    counts = np.atleast_2d(np.asarray(counts,dtype=float))
+    M = np.asarray(M,dtype=float)
+    if counts.shape[1] != len(names):
+        raise ValueError('Error: group-count matrix has to have {:} columns'.format(len(names)))
+
+    # SUM{ ni * vi } for deltaTbM, deltaTM, deltaPM, deltaVM in one matrix product
+    missing = np.isnan(data)
+    S = counts @ np.where(missing, 0.0, data)
+    S[(counts != 0).astype(float) @ missing.astype(float) > 0] = np.nan
+
+    Tb = 198.2 + S[:,0]
+    STM = S[:,1]
+    Tc = Tb / (MLJR.CONST_AM + MLJR.CONST_BM * STM - STM * STM)
+    Pc = M / (MLJR.CONST_CM + S[:,2]) / (MLJR.CONST_CM + S[:,2])
+    Vc = MLJR.CONST_EM + S[:,3]
+
+    # acentric factor, same as MLJR.func_calc_w
+    t = (Tb-43)*(Tc-43) / ((Tc-Tb)*(0.7*Tc-43))
+    l = np.log10(Pc/Pb)
+    s = (Tc-43) / (Tc-Tb)
+    w = t*l - s*l + l - 1
+
+    return Tc, Pc, Vc, Tb, w
+
+
+
+def func_pro_sigma(sigma):
+    """
+    Process standard deviations of group contributions and MLJR constants
+
+    Parameter:
+        sigma : dict, in a format, all keys are optional, not listed values are 0,
+
+                {
+                    "no-ring" : { symbol : [ deltaTbM, deltaTM, deltaPM, deltaVM ], ... },
+                    "ring"    : { symbol : [ deltaTbM, deltaTM, deltaPM, deltaVM ], ... },
+                    "default" : [ deltaTbM, deltaTM, deltaPM, deltaVM ],
+                    "const"   : { "AM" : float, "BM" : float, "CM" : float, "EM" : float }
+                }
+
+                < default > is used by all groups which are not listed
+                OR str, path of a JSON file in that format
+
+    Return:
+        log, S, C
+
+        S : 2D list, shape (groups, 4), columns follow func_group_columns
+        C : 1D list, [ CONST_AM, CONST_BM, CONST_CM, CONST_EM ]
+    """
+    log = {'nice':True, }
+    if isinstance(sigma,str):
+        try:
+            with open(sigma,'rt') as f: sigma = json.load(f)
+        except (OSError, ValueError) as e:
+            log['nice'] = False
+            log['info'] = 'Error: cannot read standard deviations < {:} >: {:}'.format(sigma,e)
+            return log, None, None
+    if not isinstance(sigma,dict):
+        log['nice'] = False
+        log['info'] = 'Error: standard deviations have to be defined in a dict'
+        return log, None, None
+
+    def fsig(v, n):
+        if not isinstance(v,list) or len(v) != n or \
+           not all([isinstance(i,(int,float)) and not isinstance(i,bool) and i >= 0 for i in v]):
+            raise ValueError('Error: standard deviations have to be {:} non-negative numbers: {:}'.format(n,v))
+        return [float(i) for i in v]
+
+    tables = func_group_tables()
+    offsets, values = func_group_columns()
+    try:
+        unknown = [k for k in sigma if k not in ['no-ring','ring','default','const']]
+        if unknown:
+            raise ValueError('Error: unknown keyword(s) for standard deviations: {:}'.format(unknown))
+        default = fsig(sigma.get('default',[0,0,0,0]), 4)
+        S = [default[:] for i in values]
+        for key in ['no-ring','ring']:
+            for sym, v in sigma.get(key,{}).items():
+                ndx = tables[key].lookup(sym)
+                if ndx is None:
+                    raise ValueError('Error: for {:}, symbol < {:} > is not defined'.format(key,sym))
+                S[offsets[key]+ndx] = fsig(v, 4)
+        const = sigma.get('const',{})
+        if not isinstance(const,dict) or any([k not in ['AM','BM','CM','EM'] for k in const]):
+            raise ValueError('Error: standard deviations of constants have to be in keys AM, BM, CM, EM')
+        C = fsig([const.get(k,0) for k in ['AM','BM','CM','EM']], 4)
+    except (ValueError, AttributeError) as e:
+        log['nice'] = False
+        log['info'] = str(e)
+        return log, None, None
+    return log, S, C
+
+
+
+def func_run_samples(comps, ys, S, C, samples=10000, seed=None, t=None, t_ref=None, q_ref=None):
+    """
+    Monte Carlo samples of one system
+
+    Group contributions and MLJR constants are drawn from normal distributions as one array,
+    then all samples run through the same equations of MLJR, Purity and Mixture in one vectorized pass,
+    a group used by many components shares the same draw
+
+    Parameters:
+        comps   : 1D list of Component, one for purity
+        ys      : 1D list, molar ratios of all components, None for purity
+        S, C    : standard deviations, see func_pro_sigma
+        samples : number of samples
+        seed    : anything accepted by numpy.random.default_rng, None for fresh randomness
+        t, t_ref, q_ref : same as MLJR.run
+
+    Return:
+        dict of 1D numpy arrays, one value for each sample, keys: Tc Pc Vc Tb w (purity)
+        OR Tcm Pcm Vcm Tbm wm (mixture), and d, st when they are calculated
+    """
+    if func_numpy() is None:
+        raise ImportError('Error: numpy is required for uncertainty propagation')
+    if any([any([v is None for v in c.sums]) for c in comps]):
+        raise TypeError('group contributions are not defined')
+    offsets, values = func_group_columns()
+    rng = np.random.default_rng(seed)
+
+    # only columns of used groups are drawn, shape (samples, groups, 4)
+    used = sorted(set([col for c in comps for col,n in enumerate(c.counts) if n]))
+    V = np.array([values[col] for col in used], dtype=float)
+    draws = V + rng.standard_normal((samples,len(used),4)) * np.array([S[col] for col in used], dtype=float)
+
+    # constants are arrays, one value per sample
+    method = Equations(*[getattr(MLJR,k) + rng.standard_normal(samples) * s
+                         for k,s in zip(['CONST_AM','CONST_BM','CONST_CM','CONST_EM'], C)])
+
+    crits = []
+    for c in comps:
+        n = np.array([c.counts[col] for col in used], dtype=float)
+        crits.append(Critical(method, tuple(np.einsum('sgk,g->ks', draws, n)), c.M))
+    if ys is None:
+        result = Purity(crits[0], t, t_ref, q_ref)
+        keys = ['Tc', 'Pc', 'Vc', 'Tb', 'w']
+    else:
+        result = Mixture(method, crits, ys, t, t_ref, q_ref)
+        keys = ['Tcm', 'Pcm', 'Vcm', 'Tbm', 'wm']
+    if t is not None: keys.append('d')
+    if t is not None and t_ref is not None and q_ref is not None: keys.append('st')
+
+    with np.errstate(all='ignore'):
+        return dict([(k,np.broadcast_to(getattr(result,k),(samples,))) for k in keys])
+
+
+
+def func_calc_interval(values, level=0.95):
+    """
+    Parameters:
+        values : dict of 1D numpy arrays, return of func_run_samples
+        level  : confidence level of the central interval
+
+    Return:
+        dict, { key : { 'mean', 'std', 'low', 'high', 'n' } }, not-a-number samples are excluded,
+        n is the number of valid samples
+    """
+    stats = {}
+    for k,v in values.items():
+        v = v[np.isfinite(v)]
+        if len(v) == 0:
+            stats[k] = {'mean':None, 'std':None, 'low':None, 'high':None, 'n':0}
+            continue
+        low, high = np.percentile(v, [50*(1-level), 50*(1+level)])
+        stats[k] = {'mean':float(v.mean()), 'std':float(v.std(ddof=1)) if len(v) > 1 else 0.0,
+                    'low':float(low), 'high':float(high), 'n':len(v)}
+    return stats
+
+
+
+def func_calc_uncertainty(comps, ys, S, C, samples=10000, seed=None, t=None, t_ref=None, q_ref=None,
+                          workers=1, level=0.95):
+    """
+    Confidence intervals by Monte Carlo uncertainty propagation, see func_run_samples
+
+    Parameters:
+        workers : number of worker processes, samples are split evenly,
+                  each one has its own random stream spawned from seed, 0 means number of CPUs
+        level   : confidence level
+
+        others are the same as func_run_samples
+
+    Note: for the same seed, results depend on the number of workers
+
+    Return:
+        dict, return of func_calc_interval
+    """
+    if func_numpy() is None:
+        raise ImportError('Error: numpy is required for uncertainty propagation')
+    if not workers: workers = os.cpu_count() or 1
+    workers = max(1, min(workers, samples))
+    if workers == 1:
+        values = func_run_samples(comps, ys, S, C, samples, seed, t, t_ref, q_ref)
+    else:
+        import concurrent.futures
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        sizes = [samples // workers + (1 if i < samples % workers else 0) for i in range(workers)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(func_run_samples, comps, ys, S, C, n, sd, t, t_ref, q_ref)
+                       for n,sd in zip(sizes,seeds)]
+            chunks = [f.result() for f in futures]
+        values = dict([(k,np.concatenate([c[k] for c in chunks])) for k in chunks[0]])
+    return func_calc_interval(values, level)
+
+
+
+class Dual(object):
+    """
+    Value along with its exact gradient, forward-mode differentiation through MLJR equations
+
+    Every operation carries derivatives by chain rule in closed form, thus one evaluation
+    gives derivatives with respect to all parameters at once
+
+    Attributes:
+        v : float or numpy array, value
+        g : numpy array, gradient, in shape v.shape + (parameters,)
+    """
+    __slots__ = ('v', 'g')
+    # numpy arrays defer to reflected operators of Dual, e.g. array / Dual
+    __array_ufunc__ = None
+
+    def __init__(self, v, g):
+        self.v = v
+        self.g = g
+
+    def __repr__(self):
+        return 'Dual({:}, {:})'.format(self.v, self.g)
+
+    @staticmethod
+    def func_pro(x):
+        """Return value and gradient, gradient is None for constants"""
+        if isinstance(x,Dual): return x.v, x.g
+        return x, None
+
+    @staticmethod
+    def func_scale(g, x):
+        """Gradient times a value, value axes are broadcast in front of parameter axis"""
+        return g * np.asarray(x)[...,np.newaxis]
+
+    def __neg__(self):
+        return Dual(-self.v, -self.g)
+
+    def __add__(self, other):
+        v, g = self.func_pro(other)
+        return Dual(self.v + v, self.g if g is None else self.g + g)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        v, g = self.func_pro(other)
+        return Dual(self.v - v, self.g if g is None else self.g - g)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        v, g = self.func_pro(other)
+        grad = self.func_scale(self.g, v)
+        if g is not None: grad = grad + self.func_scale(g, self.v)
+        return Dual(self.v * v, grad)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        v, g = self.func_pro(other)
+        grad = self.func_scale(self.g, 1/v)
+        if g is not None: grad = grad - self.func_scale(g, self.v/v/v)
+        return Dual(self.v / v, grad)
+
+    def __rtruediv__(self, other):
+        # other / self, other is a constant
+        return Dual(other / self.v, self.func_scale(self.g, -other/self.v/self.v))
+
+    def __pow__(self, other):
+        v, g = self.func_pro(other)
+        value = self.v ** v
+        grad = self.func_scale(self.g, v * self.v ** (v-1))
+        if g is not None: grad = grad + self.func_scale(g, value * np.log(self.v))
+        return Dual(value, grad)
+
+    def __rpow__(self, other):
+        # other ** self, other is a constant
+        value = other ** self.v
+        return Dual(value, self.func_scale(self.g, value * np.log(other)))
+
+    def log10(self):
+        return Dual(np.log10(self.v), self.func_scale(self.g, 1/(self.v*np.log(10))))
+
+
+
+def func_calc_gradients(comps, ys=None, t=None, t_ref=None, q_ref=None):
+    """
+    Values and exact derivatives of all outputs of one system, in one evaluation
+
+    Parameters are:
+        group counts : 'no-ring:symbol', 'ring:symbol' for purity, OR 'no-ring-1:symbol', ... for mixture,
+                       every group of func_group_columns for every component, named by its symbol
+        molar ratios : 'y1', ..., 'y(n-1)', the last component takes the remainder, y(n) = 1 - SUM{ others },
+                       for binary mixture, y2 = 1 - y1
+        temperature  : 'T', only when t is defined
+        constants    : 'CONST_AM', 'CONST_BM', 'CONST_CM', 'CONST_EM'
+
+    Note: molecular weights are held fixed, derivative with respect to a group whose contribution
+          is not defined is numpy.nan
+
+    Parameters:
+        comps : 1D list of Component, one for purity
+        ys    : 1D list, molar ratios of all components, None for purity
+        t, t_ref, q_ref : same as MLJR.run, t can also be a 1D array, evaluated at once
+
+    Return:
+        names, values, jac
+
+        names  : 1D list, parameter names, see above
+        values : dict, { output : value }, outputs: Tc Pc Vc Tb w (purity) OR Tcm Pcm Vcm Tbm wm (mixture),
+                 and d, st when they are calculated
+        jac    : dict, { output : numpy array }, in shape value.shape + (parameters,)
+    """
+    if func_numpy() is None:
+        raise ImportError('Error: numpy is required for gradients')
+    if any([any([v is None for v in c.sums]) for c in comps]):
+        raise TypeError('group contributions are not defined')
+    tables = func_group_tables()
+    offsets, values = func_group_columns()
+    V = np.array([[np.nan if v is None else v for v in i] for i in values], dtype=float)
+    symbols = [i[0][0] for i in tables['no-ring'] + tables['ring']]
+    tags = ['no-ring']*len(tables['no-ring']) + ['ring']*len(tables['ring'])
+
+    # parameter names, along with their positions
+    names = []
+    for i in range(len(comps)):
+        suffix = '' if ys is None else '-{:}'.format(i+1)
+        names += ['{:}{:}:{:}'.format(k,suffix,sym) for k,sym in zip(tags,symbols)]
+    nratio = 0 if ys is None else len(ys) - 1
+    names += ['y{:}'.format(i+1) for i in range(nratio)]
+    if t is not None: names.append('T')
+    names += ['CONST_AM', 'CONST_BM', 'CONST_CM', 'CONST_EM']
+    size = len(names)
+    def fseed(n, v):
+        """Dual of a parameter in position n"""
+        g = np.zeros(np.shape(v) + (size,))
+        g[...,n] = 1.0
+        return Dual(v, g)
+
+    # constants are Dual
+    method = Equations(*[fseed(size-4+n, getattr(MLJR,k))
+                         for n,k in enumerate(['CONST_AM','CONST_BM','CONST_CM','CONST_EM'])])
+
+    # SUM{ n*v }, derivative with respect to the count of group g is v of g
+    crits = []
+    for i,c in enumerate(comps):
+        sums = []
+        for k in range(4):
+            g = np.zeros(size)
+            g[i*len(V):(i+1)*len(V)] = V[:,k]
+            sums.append(Dual(c.sums[k], g))
+        crits.append(Critical(method, tuple(sums), c.M))
+
+    if t is not None: t = fseed(names.index('T'), np.asarray(t,dtype=float) if np.ndim(t) else t)
+    if ys is None:
+        result = Purity(crits[0], t, t_ref, q_ref)
+        keys = ['Tc', 'Pc', 'Vc', 'Tb', 'w']
+    else:
+        n0 = len(comps) * len(V)
+        yd = [fseed(n0+i, ys[i]) for i in range(nratio)]
+        yd.append(Dual(ys[-1], -sum([y.g for y in yd])))
+        result = Mixture(method, crits, yd, t, t_ref, q_ref)
+        keys = ['Tcm', 'Pcm', 'Vcm', 'Tbm', 'wm']
+    if t is not None: keys.append('d')
+    if t is not None and t_ref is not None and q_ref is not None: keys.append('st')
+
+    values = {}
+    jac = {}
+    with np.errstate(all='ignore'):
+        for k in keys:
+            v = getattr(result,k)
+            values[k] = v.v
+            jac[k] = v.g
+    return names, values, jac
+
+
+
+# group contributions, in sequence of DATA_LJR_* columns
+CONTRIBUTIONS = ['Tb', 'T', 'P', 'V']
+
+def func_pro_fit_params(groups, contributions=None):
+    """
+    Resolve groups to refit into positions of group contributions
+
+    Parameters:
+        groups        : 1D list of str, symbol or nickName, can be prefixed by table, e.g. 'ring:-CH2-',
+                        without prefix, no-ring is looked up first
+        contributions : 1D list, subset of CONTRIBUTIONS, deltaTbM deltaTM deltaPM deltaVM, default all
+
+    Note: undefined contributions (None) are not fitted
+
+    Return:
+        log, params, names
+
+        params : 1D list, [ (column, contribution index), ... ], columns follow func_group_columns
+        names  : 1D list, e.g. 'no-ring:-Cl:T'
+    """
+    log = {'nice':True, }
+    tables = func_group_tables()
+    offsets, values = func_group_columns()
+    if contributions is None: contributions = CONTRIBUTIONS
+    if any([k not in CONTRIBUTIONS for k in contributions]):
+        log['nice'] = False
+        log['info'] = 'Error: contributions have to be in {:}'.format(CONTRIBUTIONS)
+        return log, None, None
+    params = []
+    names = []
+    for sym in groups:
+        keys = ['no-ring','ring']
+        for k in keys:
+            if sym.startswith(k+':'):
+                keys = [k]
+                sym = sym[len(k)+1:]
+                break
+        key = ndx = None
+        for k in keys:
+            ndx = tables[k].lookup(sym)
+            if ndx is not None:
+                key = k
+                break
+        if ndx is None:
+            log['nice'] = False
+            log['info'] = 'Error: group < {:} > is not defined'.format(sym)
+            return log, None, None
+        col = offsets[key] + ndx
+        for k in contributions:
+            n = CONTRIBUTIONS.index(k)
+            # nickNames of the same group are only fitted once
+            if values[col][n] is None or (col,n) in params: continue
+            params.append((col,n))
+            names.append('{:}:{:}:{:}'.format(key,tables[key][ndx][0][0],k))
+    if not params:
+        log['nice'] = False
+        log['info'] = 'Error: no defined group contribution is selected'
+    return log, params, names
+
+
+
+def func_calc_fit(systems, params, consts=None, maxiter=100, tol=1e-10):
+    """
+    Refit group contributions and MLJR constants by least squares (Levenberg-Marquardt)
+    against measured properties, residuals are relative errors, (calculated - measured) / measured
+
+    In every iteration, the whole dataset runs through the equations of Critical, Purity and Mixture
+    as one batched evaluation, a batch for each number of components, Dual carries the exact Jacobian
+    along with the values
+
+    Parameters:
+        systems : 1D list of dict, see func_pro_dataset
+        params  : return of func_pro_fit_params
+        consts  : 1D list, subset of [ 'AM', 'BM', 'CM', 'EM' ]
+        maxiter : maximum number of iterations
+        tol     : stops when relative decrease of sum of squares is under tol
+
+    Note: parameters which do not change any residual (e.g. group is not used) are kept
+
+    Return:
+        dict, keys:
+            initial, fitted : 1D list, values of params then consts
+            determined      : 1D list of bool, whether the parameter is changed by the dataset
+            rms0, rms       : root mean square of relative errors, before & after
+            props           : dict, { prop : { 'n', 'rms0', 'rms' } }
+            iterations      : number of iterations
+            fit             : dict, refitted values, same format as func_pro_sigma, see func_apply_fit
+    """
+    if func_numpy() is None:
+        raise ImportError('Error: numpy is required for fitting')
+    consts = consts or []
+    tables = func_group_tables()
+    offsets, values = func_group_columns()
+    V = np.array([[np.nan if v is None else v for v in i] for i in values], dtype=float)
+    npar = len(params)
+    size = npar + len(consts)
+    cols = [p[0] for p in params]
+    # integer indices, also when only constants are refitted
+    ks = np.array([p[1] for p in params], dtype=int)
+
+    # batches, one for each number of components, all arrays are along systems
+    batches = {}
+    for sy in systems:
+        n = len(sy['comps'])
+        b = batches.setdefault(n, {'systems':[]})
+        b['systems'].append(sy)
+    for n,b in batches.items():
+        sys_ = b.pop('systems')
+        b['counts'] = [np.array([s['comps'][i].counts for s in sys_], dtype=float) for i in range(n)]
+        b['M'] = [np.array([s['comps'][i].M for s in sys_], dtype=float) for i in range(n)]
+        b['ys'] = None if n == 1 else [np.array([s['ys'][i] for s in sys_], dtype=float) for i in range(n)]
+        for k in ['t','t_ref','q_ref']:
+            b[k] = np.array([np.nan if s[k] is None else s[k] for s in sys_], dtype=float)
+        b['exp'] = {}
+        for prop in FIT_PROPERTIES:
+            ndx = [i for i,s in enumerate(sys_) if prop in s['exp']]
+            if ndx: b['exp'][prop] = (np.array(ndx), np.array([sys_[i]['exp'][prop] for i in ndx], dtype=float))
+
+    def fmodel(x):
+        """Return relative residuals, Jacobian and property of each residual"""
+        data = np.where(np.isnan(V), 0.0, V)
+        data[cols,ks] = x[:npar]
+        # constants to refit are Dual, others are the same as MLJR
+        const = []
+        for k in ['AM','BM','CM','EM']:
+            if k in consts:
+                g = np.zeros(size)
+                g[npar+consts.index(k)] = 1.0
+                const.append(Dual(x[npar+consts.index(k)], g))
+            else:
+                const.append(getattr(MLJR,'CONST_'+k))
+        method = Equations(*const)
+        rs = []
+        js = []
+        tags = []
+        for n,b in batches.items():
+            crits = []
+            for C,M in zip(b['counts'],b['M']):
+                S = C @ data
+                sums = []
+                for k in range(4):
+                    g = np.zeros((len(C),size))
+                    g[:,:npar] = C[:,cols] * (ks == k)
+                    sums.append(Dual(S[:,k], g))
+                crits.append(Critical(method, tuple(sums), M))
+            if n == 1:
+                result = Purity(crits[0], b['t'], b['t_ref'], b['q_ref'])
+            else:
+                result = Mixture(method, crits, b['ys'], b['t'], b['t_ref'], b['q_ref'])
+            for prop,(ndx,exp) in b['exp'].items():
+                v = getattr(result, prop if n == 1 or prop in ['d','st'] else prop+'m')
+                rs.append((v.v[ndx] - exp) / exp)
+                js.append(v.g[ndx] / exp[:,np.newaxis])
+                tags += [prop] * len(ndx)
+        return np.concatenate(rs), np.concatenate(js), np.array(tags)
+
+    x0 = np.array([V[c,k] for c,k in params] + [getattr(MLJR,'CONST_'+k) for k in consts], dtype=float)
+    x = x0.copy()
+    with np.errstate(all='ignore'):
+        r0, J, tags = fmodel(x)
+        if not np.all(np.isfinite(r0)) or not np.all(np.isfinite(J)):
+            raise ValueError('Error: calculation failed for some systems with initial parameters')
+        r = r0
+        cost = r @ r
+        determined = np.any(J != 0, axis=0)
+        lam = 1e-3
+        it = 0
+        while it < maxiter and cost > 0:
+            it += 1
+            A = J.T @ J
+            D = np.where(determined, np.diag(A), 1.0)
+            try:
+                dx = np.linalg.solve(A + lam*np.diag(D), -(J.T @ r))
+            except np.linalg.LinAlgError:
+                dx = None
+            if dx is not None:
+                r2, J2, tags = fmodel(x + dx)
+                cost2 = r2 @ r2 if np.all(np.isfinite(r2)) and np.all(np.isfinite(J2)) else np.inf
+            if dx is None or not cost2 < cost:
+                # step rejected
+                lam *= 10
+                if lam > 1e12: break
+                continue
+            x = x + dx
+            r, J = r2, J2
+            lam = max(lam/10, 1e-12)
+            bo = cost - cost2 <= tol * cost
+            cost = cost2
+            if bo: break
+
+    fit = {}
+    for (c,k),v in zip(params,x):
+        key = 'no-ring' if c < offsets['ring'] else 'ring'
+        sym = tables[key][c-offsets[key]][0][0]
+        fit.setdefault(key,{}).setdefault(sym, list(values[c]))[k] = float(v)
+    if consts: fit['const'] = dict([(k,float(v)) for k,v in zip(consts,x[npar:])])
+
+    frms = lambda v: float(np.sqrt(np.mean(v*v)))
+    return {
+        'initial'    : [float(v) for v in x0],
+        'fitted'     : [float(v) for v in x],
+        'determined' : [bool(v) for v in determined],
+        'rms0'       : frms(r0),
+        'rms'        : frms(r),
+        'props'      : dict([(p,{'n':int(np.sum(tags==p)), 'rms0':frms(r0[tags==p]), 'rms':frms(r[tags==p])})
+                             for p in FIT_PROPERTIES if p in tags]),
+        'iterations' : it,
+        'fit'        : fit,
+    }
+
+
+
+def func_apply_fit(fit):
+    """
+    Apply refitted values into DATA_LJR_NO_RING, DATA_LJR_RING and MLJR.CONST_*, tables are rebuilt
+    and MLJR.cache is cleared
+
+    Note: Component created before keeps its contribution sums
+
+    Note: ValueError is raised for undefined symbols or non-finite values, nothing is applied then
+
+    Parameter:
+        fit : dict, same format as func_pro_sigma, values instead of standard deviations,
+              OR str, path of a JSON file, e.g. written by < mljr fit -o >
+    """
+    if isinstance(fit,str):
+        with open(fit,'rt') as f: fit = json.load(f)
+    # everything is checked before any value is changed
+    tables = func_group_tables()
+    data = {'no-ring':DATA_LJR_NO_RING, 'ring':DATA_LJR_RING}
+    rows = []
+    for key in ['no-ring','ring']:
+        for sym, v in fit.get(key,{}).items():
+            ndx = tables[key].lookup(sym)
+            if ndx is None:
+                raise ValueError('Error: for {:}, symbol < {:} > is not defined'.format(key,sym))
+            if not isinstance(v,list) or len(v) != 4:
+                raise ValueError('Error: group contributions have to be 4 values: {:}'.format(v))
+            for i in v:
+                if i is not None and not (isinstance(i,(int,float)) and math.isfinite(i)):
+                    raise ValueError('Error: for {:}, contributions of < {:} > have to be finite numbers: {:}'.format(
+                                     key,sym,v))
+            rows.append((data[key][ndx], v))
+    consts = []
+    for k,v in fit.get('const',{}).items():
+        if k not in ['AM','BM','CM','EM']:
+            raise ValueError('Error: constants have to be in keys AM, BM, CM, EM')
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            v = float('nan')
+        if not math.isfinite(v):
+            raise ValueError('Error: constant < {:} > has to be a finite number'.format(k))
+        consts.append((k,v))
+
+    for row, v in rows: row[1:5] = v
+    for k,v in consts: setattr(MLJR, 'CONST_'+k, v)
+    func_group_tables(rebuild=True)
+    if MLJR.cache is not None: MLJR.cache.clear()
+
+
+
+def func_pro_range(spec):
+    """
+    Process range input in a format:  START:STOP:STEP, both START and STOP are included
+
+    Example:
+        0.05:0.95:0.01
+
+    Return:
+        log, values (1D list)
+    """
+    log = {'nice':True, }
+    try:
+        beg, end, step = [float(i) for i in spec.replace(' ','').split(':')]
+        if step <= 0 or end < beg: raise ValueError
+    except ValueError:
+        log['nice'] = False
+        log['info'] = 'Error: wrong defined range < {:} >, it has to be START:STOP:STEP'.format(spec)
+        return log, []
+    # avoid float accumulation errors
+    num = int(round((end-beg)/step,8)) + 1
+    values = [round(beg+i*step,10) for i in range(num)]
+    return log, values
+
+
+
+@func_staged('output')
+def func_format_sweep(sweep, t=None, q_ref=None, t_ref=None):
+    """
+    Format results of MLJR.sweep into a table
+
+    Parameters:
+        sweep : dict, return of MLJR.sweep
+        t     : temperature to calculate density, optional
+        q_ref : reference Surface Tension at t_ref, optional
+        t_ref : reference temperature, optional
+
+    Return:
+        info : str
+    """
+    keys = ['y1', 'y2', 'm', 'Tcm', 'Pcm', 'Vcm', 'Tbm', 'wm']
+    cols = [sweep[k] for k in keys]
+    if t is not None:
+        keys.append('d')
+        cols.append(func_calc_density(sweep['m'],t,sweep['Tcm'],sweep['Pcm'],sweep['Vcm'],sweep['Tbm']))
+        if q_ref is not None and t_ref is not None:
+            keys.append('st')
+            cols.append(func_calc_st(t,q_ref,t_ref,sweep['Tcm']))
+
+    info = '\n\n# For calculation type < mixture >, ratio sweep\n'
+    if t is not None:
+        info += '# Density (g/mL) d at {:} K\n'.format(round(t,2))
+        if len(keys) == 10:
+            info += '# Surf. Ten. (mN/m) st at {:} K, Reference: Temp. < {:} >, Surface Tension: < {:} >\n'.format(
+                    round(t,2),round(t_ref,4),round(q_ref,4))
+    info += '#' + ''.join(['{:>12}'.format(k) for k in keys])[1:] + '\n'
+    for row in zip(*cols):
+        info += ''.join(['{:>12}'.format(round(float(v),4)) for v in row]) + '\n'
+    return info
+
+
+
+def func_format_temperature(T, d, st=None, q_ref=None, t_ref=None):
+    """
+    Format density and surface tension over temperatures into a table
+
+    Parameters:
+        T     : 1D list, temperatures (K)
+        d     : 1D array, density (g/mL)
+        st    : 1D array, surface tension (mN/m), optional
+        q_ref : reference Surface Tension at t_ref, optional
+        t_ref : reference temperature, optional
+
+    Return:
+        info : str
+    """
+    info = '# Density (g/mL) d over temperature T (K)\n'
+    keys = ['T', 'd']
+    cols = [T, d]
+    if st is not None:
+        info += '# Surf. Ten. (mN/m) st, Reference: Temp. < {:} >, Surface Tension: < {:} >\n'.format(
+                round(t_ref,4),round(q_ref,4))
+        keys.append('st')
+        cols.append(st)
+    info += '#' + ''.join(['{:>12}'.format(k) for k in keys])[1:] + '\n'
+    for row in zip(*cols):
+        info += ''.join(['{:>12}'.format(round(float(v),4)) for v in row]) + '\n'
+    return info + '\n'
+
+
+
+def func_data_version():
+    """
+    Note: calculated once per process, again when tables are rebuilt or MLJR.CONST_* change,
+          it follows the group contributions in use, e.g. after func_apply_fit, edits of
+          DATA_LJR_* take effect only after func_group_tables(rebuild=True)
+
+    Return:
+        str, hash of group tables, DATA_ELEMENTS, MLJR.CONST_* and program version,
+        it changes whenever any of them changes
+    """
+    tables = func_group_tables()
+    offsets, values = func_group_columns()
+    consts = [MLJR.CONST_AM, MLJR.CONST_BM, MLJR.CONST_CM, MLJR.CONST_EM]
+    if _DATA_VERSION.get('values') is not values or _DATA_VERSION.get('consts') != consts:
+        import hashlib
+        names = [i[0] for i in tables['no-ring'] + tables['ring']]
+        txt = json.dumps([names, values, DATA_ELEMENTS, consts, __version__])
+        _DATA_VERSION['values'] = values
+        _DATA_VERSION['consts'] = consts
+        _DATA_VERSION['hash'] = hashlib.sha256(txt.encode('utf-8')).hexdigest()
+    return _DATA_VERSION['hash']
+
+_DATA_VERSION = {}
+
+
+
+class ResultCache(object):
+    """
+    Persistent result cache, stored in a local SQLite file
+
+    Key is the content hash of the normalized system (keyword < name > is ignored), along with
+    calculation parameters and func_data_version. When contribution tables or constants change,
+    all stored results are invalidated automatically.
+
+    Attributes:
+        path    : file path
+        version : func_data_version when it is opened
+        hits    : int, number of successful lookups
+        misses  : int, number of failed lookups
+    """
+    def __init__(self, path):
+        import sqlite3
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.version = func_data_version()
+        # mljr serve shares one connection among handler threads, calls are serialized by _SERVE_LOCK
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT)')
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                self.conn.execute('DELETE FROM results')
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+
+
+    def key(self, fdict, *args):
+        """Return content hash of the system and other calculation parameters"""
+        import hashlib
+        data = dict([(k,v) for k,v in fdict.items() if k != 'name'])
+        txt = json.dumps([data, args, self.version], sort_keys=True)
+        return hashlib.sha256(txt.encode('utf-8')).hexdigest()
+
+
+    def get(self, key):
+        """Return stored value, None if not found"""
+        row = self.conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+
+    def put(self, key, value):
+        """value has to be JSON serializable"""
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?)', (key, json.dumps(value)))
+
+
+    def close(self):
+        self.conn.close()
+
+
+
+def func_open_cache(cache):
+    """
+    Parameter:
+        cache : None, ResultCache, or its file path, for file path, it is opened once per process
+
+    Return:
+        None or ResultCache
+    """
+    if cache is None or isinstance(cache,ResultCache): return cache
+    if cache not in _RESULT_CACHES or _RESULT_CACHES[cache].version != func_data_version():
+        if cache in _RESULT_CACHES: _RESULT_CACHES[cache].close()
+        _RESULT_CACHES[cache] = ResultCache(cache)
+    return _RESULT_CACHES[cache]
+
+_RESULT_CACHES = {}
+
+
+
+def func_pro_component(fdict, n=None):
+    """
+    Get molecular weight and group table of one component, molecular weight is calculated
+    by keyword < s > when < m > is not defined, then by keyword < smiles >,
+    groups are fragmented from < smiles > when no < ring > & < no-ring > is defined
+
+    Parameters:
+        fdict : dict, return of func_profile
+        n     : None for purity, keywords < m > < s > < smiles > < ring > < no-ring > are used,
+                OR number of component in mixture, e.g. 1, keywords < m1 > < s1 > < smiles1 > < ring-1 > < no-ring-1 >
+
+    Return:
+        log, m, comp
+
+        comp : Component
+    """
+    suffix = '' if n is None else '-{:}'.format(n)
+    mkey = 'm' if n is None else 'm{:}'.format(n)
+    skey = 's' if n is None else 's{:}'.format(n)
+    smkey = 'smiles' if n is None else 'smiles{:}'.format(n)
+
+    log = {'nice':True, }
+    groups = dict([(k,fdict[k+suffix]) for k in ['ring','no-ring'] if k+suffix in fdict])
+    if smkey in fdict and (not groups or (mkey not in fdict and skey not in fdict)):
+        log, smgroups, smM = func_pro_smiles(fdict[smkey])
+        if not log['nice']: return log, None, None
+        if not groups: groups = smgroups
+
+    if mkey in fdict:
+        m = fdict[mkey]
+    elif skey in fdict:
+        log, m = func_calc_M(fdict[skey])
+        if not log['nice']: return log, None, None
+    elif smkey in fdict:
+        m = smM
+    else:
+        log['nice'] = False
+        log['info'] = 'Error: the molecular weight is not correctly defined'
+        return log, None, None
+
+    try:
+        counts = func_pro_counts(groups)
+    except ValueError as e:
+        log['nice'] = False
+        log['info'] = str(e)
+        return log, None, None
+    return log, m, Component(counts, m)
+
+
+
+def func_pro_temperature(fdict, calc=None):
+    """
+    Decide which properties are calculated, -x/--calc is precedent of keywords < t-ref > < q-ref > < t >
+
+    Return:
+        bo_calc_dy, bo_calc_st, t, t_ref, q_ref
+
+        bo_calc_dy : bool, density is calculated at t
+        bo_calc_st : bool, surface tension is calculated at t, by t_ref & q_ref
+    """
+    bo_calc_st = True
+    bo_calc_dy = True
+    t = t_ref = q_ref = None
+    if calc is not None:
+        if len(calc) == 1:
+            t = calc[0]
+            bo_calc_st = False
+        else:
+            t_ref = calc[0]
+            q_ref = calc[1]
+            t = calc[2]
+    elif 't-ref' in fdict:
+        t_ref = fdict['t-ref']
+        if 'q-ref' in fdict and 't' in fdict:
+            q_ref = fdict['q-ref']
+            t = fdict['t']
+        elif 't' in fdict:
+            t = fdict['t']
+            bo_calc_st = False
+        else:
+            bo_calc_st = False
+            bo_calc_dy = False
+    else:
+        bo_calc_st = False
+        bo_calc_dy = False
+    return bo_calc_dy, bo_calc_st, t, t_ref, q_ref
+
+
+
+def func_run_fdict(fdict, calc=None):
+    """
+    Run one system processed by func_profile
+
+    Parameters:
+        fdict    : dict, return of func_profile
+        calc     : 1D list, same as -x/--calc, [T] or [T-ref, Q-ref, T],
+                   T can be a range string START:STOP:STEP
+
+    Return:
+        log, rst, prop
+
+        rst  : MLJR, after run
+        prop : dict, may have keys < t >, < d > for density, and < t-ref >, < q-ref >, < st >
+               for surface tension, < t > is a list for temperature range
+    """
+    log = {'nice':True, }
+    fdict = dict(fdict)
+
+    if fdict['type'] == 'purity':
+        log, fdict['m'], fdict['table'] = func_pro_component(fdict)
+        if not log['nice']: return log, None, {}
+    else:
+        for i in range(1,max(func_mixture_size(fdict),2)+1):
+            log, fdict['m{:}'.format(i)], fdict['table{:}'.format(i)] = func_pro_component(fdict, i)
+            if not log['nice']: return log, None, {}
+
+    rst = MLJR(**fdict)
+
+    if rst.log['nice']:
+        rst.run()
+    else:
+        return rst.log, None, {}
+
+    bo_calc_dy, bo_calc_st, t, t_ref, q_ref = func_pro_temperature(fdict, calc)
+
+    # temperature range, up to critical temperature
+    if bo_calc_dy and isinstance(t,str):
+        Tc = rst.Tc if rst.type == 'purity' else rst.Tcm
+        log, t = func_pro_range(t.lower().replace('tc',str(Tc)))
+        if log['nice']:
+            t = [i for i in t if i < Tc]
+            if len(t) == 0:
+                log['nice'] = False
+                log['info'] = 'Error: temperature range has to be lower than critical temperature < {:} >'.format(round(Tc,4))
+        if log['nice'] and func_numpy() is None:
+            log['nice'] = False
+            log['info'] = 'Error: numpy is required for temperature range'
+        if not log['nice']:
+            return log, None, {}
+
+    prop = {}
+    if bo_calc_dy:
+        prop['t'] = t
+        if rst.type == 'purity':
+            prop['d'] = func_calc_density(rst.m,t,rst.Tc,rst.Pc,rst.Vc,rst.Tb)
+        else:
+            prop['d'] = func_calc_density(rst.m,t,rst.Tcm,rst.Pcm,rst.Vcm,rst.Tbm)
+    if bo_calc_st:
+        prop['t-ref'] = t_ref
+        prop['q-ref'] = q_ref
+        prop['st'] = func_calc_st(t,q_ref,t_ref,rst.Tc if rst.type == 'purity' else rst.Tcm)
+
+    return log, rst, prop
+
+
+
+def func_run_solve(rst, prop, solve):
+    """
+    Run inverse solver MLJR.solve for func_run_fdict results
+
+    Parameters:
+        solve : [ prop, target, target, ... ], prop is 'd' or 'st'
+
+    Return:
+        log, y1
+    """
+    log = {'nice':True, }
+    if rst.type != 'mixture' or rst.n != 2:
+        log['nice'] = False
+        log['info'] = 'Error: inverse solver only works for calculation type < mixture > of two components'
+    elif solve[0] not in prop or isinstance(prop['t'],list):
+        log['nice'] = False
+        if solve[0] == 'd':
+            log['info'] = 'Error: inverse solver for density needs one temperature < t >'
+        else:
+            log['info'] = 'Error: inverse solver for surface tension needs < t-ref >, < q-ref > and one < t >'
+    if not log['nice']: return log, None
+    return log, rst.solve(solve[1:], prop['t'], solve[0], prop.get('t-ref'), prop.get('q-ref'))
+
+
+
+def func_run_uncertainty(rst, prop, uncertainty):
+    """
+    Run func_calc_uncertainty for func_run_fdict results
+
+    Parameters:
+        uncertainty : dict, { 'S', 'C', 'samples', 'seed', 'workers' }, S & C are from func_pro_sigma
+
+    Return:
+        log, stats
+    """
+    log = {'nice':True, }
+    if isinstance(prop.get('t'),list):
+        log['nice'] = False
+        log['info'] = 'Error: uncertainty propagation needs one temperature < t >, not a range'
+        return log, None
+    if rst.type == 'purity':
+        comps, ys = [rst.table], None
+    else:
+        comps, ys = rst.tables, rst.ys
+    stats = func_calc_uncertainty(comps, ys, uncertainty['S'], uncertainty['C'], uncertainty.get('samples',10000),
+                                  uncertainty.get('seed'), prop.get('t'), prop.get('t-ref'), prop.get('q-ref'),
+                                  uncertainty.get('workers',1))
+    return log, stats
+
+
+
+@func_staged('output')
+def func_format_solve(solve, y1, prop):
+    """Format results of inverse solver into a table"""
+    if solve[0] == 'd':
+        info = '\n\n# For calculation type < mixture >, molar ratio for target density (g/mL) at {:} K\n'.format(
+                round(prop['t'],2))
+    else:
+        info = '\n\n# For calculation type < mixture >, molar ratio for target surface tension (mN/m) at {:} K\n'.format(
+                round(prop['t'],2))
+        info += '# Reference: Temp. < {:} >, Surface Tension: < {:} >\n'.format(round(prop['t-ref'],4),round(prop['q-ref'],4))
+    info += '# Note: nan means the target cannot be reached in molar ratio range (0, 1)\n'
+    info += '#' + ''.join(['{:>12}'.format(k) for k in ['target','y1','y2']])[1:] + '\n'
+    for v, y in zip(solve[1:], y1):
+        info += ''.join(['{:>12}'.format(round(float(i),6)) for i in [v, y, 1-y]]) + '\n'
+    return info
+
+
+
+@func_staged('output')
+def func_format_uncertainty(stats, samples, level=0.95):
+    """Format confidence intervals of func_calc_uncertainty into a table"""
+    info = '\n# Monte Carlo uncertainty, < {:} > samples, {:g}% confidence interval\n'.format(samples, level*100)
+    info += '#' + ''.join(['{:>12}'.format(k) for k in ['property','mean','std','low','high','valid']])[1:] + '\n'
+    for k,v in stats.items():
+        nums = ['nan' if v[i] is None else round(v[i],4) for i in ['mean','std','low','high']]
+        info += ''.join(['{:>12}'.format(i) for i in [k] + nums + [v['n']]]) + '\n'
+    return info
+
+
+
+@func_staged('output')
+def func_format_result(rst, prop):
+    """
+    Format results of func_run_fdict, for purity or mixture
+
+    Return:
+        info : str
+    """
+    bo_calc_dy = 'd' in prop
+    bo_calc_st = 'st' in prop
+    if bo_calc_dy: t = prop['t']
+    if bo_calc_st:
+        t_ref = prop['t-ref']
+        q_ref = prop['q-ref']
+
+    if rst.type == 'purity':
+        info = '\n\n'
+        info += '# For calculation type < purity >\n'
+        info += '# Molecular weight                   m = < {:} >\n\n'.format(round(rst.m,4))
+        info += '# Critical temperature (K):          Tc = < {:} >\n'.format(round(rst.Tc,4))
+        info += '# Critical pressure (bar):           Pc = < {:} >\n'.format(round(rst.Pc,4))
+        info += '# Critical molar volume (cm^3/mol):  Vc = < {:} >\n'.format(round(rst.Vc,4))
+        info += '# Boiling temperature (K):           Tb = < {:} >\n'.format(round(rst.Tb,4))
+        info += '# Acentric factor:                   w  = < {:} >\n\n'.format(round(rst.w,4))
+        if bo_calc_dy and isinstance(t,list):
+            den = prop['d']
+            if bo_calc_st:
+                st = prop['st']
+                info += func_format_temperature(t,den,st,q_ref,t_ref)
+            else:
+                info += func_format_temperature(t,den)
+        elif bo_calc_dy:
+            den = prop['d']
+            info += '# Density at ({:}):           d  = < {:} >\n\n'.format(round(t,2),round(den,4))
+        if bo_calc_st and not isinstance(t,list):
+            st = prop['st']
+            info += '# Surf. Ten. at ({:}):       st  = < {:} >\n\n'.format(round(t,2),round(st,4))
+    else:
+        info = '\n\n'
+        info += '# For calculation type < mixture >\n'
+        info += '# Molar ratio: ( {:} ) = < {:} >\n'.format(' : '.join(['m{:}'.format(i+1) for i in range(rst.n)]),
+                                                        ' : '.join([str(round(y,4)) for y in rst.ys]))
+        info += '# Total Molecular weight:   m = < {:} >\n\n'.format(round(rst.m,4))
+
+        for i in range(1,rst.n+1):
+            info += '\n# Molecular weight                 m{:}  = < {:} >\n'.format(i,round(getattr(rst,'m{:}'.format(i)),4))
+            info += '# Molar ratio:                     y{:}  = < {:} >\n'.format(i,round(getattr(rst,'y{:}'.format(i)),4))
+            info += '# Critical temperature (K):        Tc{:} = < {:} >\n'.format(i,round(getattr(rst,'Tc{:}'.format(i)),4))
+            info += '# Critical pressure (bar):         Pc{:} = < {:} >\n'.format(i,round(getattr(rst,'Pc{:}'.format(i)),4))
+            info += '# Critical molar volume (mL/mol):  Vc{:} = < {:} >\n'.format(i,round(getattr(rst,'Vc{:}'.format(i)),4))
+            info += '# Boiling temperature (K):         Tb{:} = < {:} >\n'.format(i,round(getattr(rst,'Tb{:}'.format(i)),4))
+            info += '# Acentric factor:                 w{:}  = < {:} >\n'.format(i,round(getattr(rst,'w{:}'.format(i)),4))
+        info += '\n\n'
+
+        info += '# Mixing Critical temperature (K):        Tcm = < {:} >\n'.format(round(rst.Tcm,4))
+        info += '# Mixing Critical pressure (bar):         Pcm = < {:} >\n'.format(round(rst.Pcm,4))
+        info += '# Mixing Critical molar volume (mL/mol):  Vcm = < {:} >\n'.format(round(rst.Vcm,4))
+        info += '# Mixing Boiling temperature (K):         Tbm = < {:} >\n'.format(round(rst.Tbm,4))
+        info += '# Mixing Acentric factor:                 wm  = < {:} >\n\n'.format(round(rst.wm,4))
+
+        if bo_calc_dy and isinstance(t,list):
+            den = prop['d']
+            if bo_calc_st:
+                st = prop['st']
+                info += func_format_temperature(t,den,st,q_ref,t_ref)
+            else:
+                info += func_format_temperature(t,den)
+        elif bo_calc_dy:
+            den = prop['d']
+            info += '# Density   at  {:} K (g/mL):    d = < {:} >\n'.format(round(t,2),round(den,4))
+        if bo_calc_st and not isinstance(t,list):
+            st = prop['st']
+            info += '# Surf. Ten. at {:} K (mN/m):   st = < {:} >\n'.format(round(t,2),round(st,4))
+            info += '# Reference: Temp. < {:} >, Surface Tension: < {:} >\n\n'.format(round(t_ref,4),round(q_ref,4))
+    return info
+
+
+
+def func_calc_fdict(fdict, calc=None, sweep_y1=None, cache=None, solve=None, uncertainty=None):
+    """
+    Calculate one system processed by func_profile, see func_run_fdict
+
+    Parameters:
+        sweep_y1 : 1D list, same as --ratio-sweep, molar ratios of component 1
+        cache    : ResultCache or its file path, optional, stored results are directly returned
+        solve    : same as --solve, [ prop, target, target, ... ], prop is 'd' or 'st',
+                   molar ratio y1 hitting each target is solved
+        uncertainty : same as --uncertainty, see func_run_uncertainty, confidence intervals are added,
+                      results are only cached with a seed
+
+    Return:
+        log, info
+    """
+    cache = func_open_cache(cache)
+    if uncertainty is not None and uncertainty.get('seed') is None: cache = None
+    if cache is not None:
+        key = cache.key(fdict, calc, sweep_y1, solve, 'text', uncertainty)
+        info = cache.get(key)
+        if info is not None: return {'nice':True, }, info
+
+    log, rst, prop = func_run_fdict(fdict, calc)
+    if not log['nice']: return log, ''
+    bo_calc_dy = 'd' in prop
+    bo_calc_st = 'st' in prop
+    if bo_calc_dy: t = prop['t']
+    if bo_calc_st:
+        t_ref = prop['t-ref']
+        q_ref = prop['q-ref']
+
+    if solve is not None:
+        log, y1 = func_run_solve(rst, prop, solve)
+        if not log['nice']: return log, ''
+        info = func_format_solve(solve, y1, prop)
+    elif sweep_y1 is not None:
+        if rst.type != 'mixture' or rst.n != 2:
+            log['nice'] = False
+            log['info'] = 'Error: --ratio-sweep only works for calculation type < mixture > of two components'
+            return log, ''
+        sweep = rst.sweep(sweep_y1)
+        if bo_calc_st:
+            info = func_format_sweep(sweep,t,q_ref,t_ref)
+        elif bo_calc_dy:
+            info = func_format_sweep(sweep,t)
+        else:
+            info = func_format_sweep(sweep)
+    else:
+        info = func_format_result(rst, prop)
+
+    if uncertainty is not None:
+        log, stats = func_run_uncertainty(rst, prop, uncertainty)
+        if not log['nice']: return log, ''
+        info += func_format_uncertainty(stats, uncertainty.get('samples',10000))
+
+    if cache is not None: cache.put(key, info)
+    return log, info
+
+
+
+def func_calc_records(file, calc=None, sweep_y1=None, cache=None, solve=None, uncertainty=None):
+    """
+    Calculate systems in the input file one by one, see func_calc_fdict
+
+    Yield:
+        lineno, log, info
+    """
+    for beg, log, fdict in func_profile_records(file):
+        info = ''
+        if log['nice']:
+            try:
+                log, info = func_calc_fdict(fdict, calc, sweep_y1, cache, solve, uncertainty)
+            except (ValueError, TypeError, ZeroDivisionError, OverflowError) as e:
+                log = {'nice':False, 'info':'Error: calculation failed: {:}'.format(e)}
+            log['line'] = beg
+        yield beg, log, info
+
+
+
+def func_calc_file(file, calc=None, sweep_y1=None, cache=None, solve=None, uncertainty=None, fout=None):
+    """
+    Calculate the input file, see func_calc_fdict
+
+    Systems are calculated and reported one by one, only one record is in memory at a time
+
+    Parameters:
+        fout : writable stream, optional, when given, info of each system is written
+               as soon as it is calculated, and returned info is empty
+
+    Return:
+        log, info
+
+        for many systems in one file, info contains results of all systems, each one is
+        headed by its line number, and log['info'] summarizes failed systems
+    """
+    if not os.path.isfile(file):
+        log = {'nice':False, 'info':'Error: wrong input file < {:} >'.format(file)}
+        return log, ''
+    # process input file, at the same time get their molecular weight
+    infos = []
+    def fwrite(txt):
+        if fout is None: infos.append(txt)
+        else: fout.write(txt)
+
+    def fsystem(beg, log, txt):
+        info = '\n\n## System in line < {:} >\n'.format(beg)
+        if log['nice']:
+            info += txt.lstrip('\n')
+        else:
+            info += '# ' + log['info'].strip().replace('\n',' ') + '\n'
+            errors.append(str(beg))
+        fwrite(info)
+
+    first = None
+    errors = []
+    total = 0
+    for rst in func_calc_records(file, calc, sweep_y1, cache, solve, uncertainty):
+        total += 1
+        # a single system is reported without the header, so the first one waits for the second
+        if total == 1:
+            first = rst
+            continue
+        if first is not None:
+            fsystem(*first)
+            first = None
+        fsystem(*rst)
+
+    if total == 0:
+        log, fdict = func_pro_profile([])
+        return log, ''
+    if total == 1:
+        beg, log, info = first
+        fwrite(info)
+        return log, ''.join(infos)
+
+    log = {'nice':len(errors) == 0, }
+    if errors:
+        log['info'] = 'Error: < {:} > of < {:} > systems failed, in line < {:} >'.format(
+                      len(errors), total, ', '.join(errors))
+    return log, ''.join(infos)
+
+
+
+def func_pro_jdict(jdict):
+    """
+    Process one system defined in a dict (e.g. from JSON), using the same keys as func_profile produces
+
+    Example:
+        { "type": "purity", "m": 139.62, "no-ring": { "-CH3": 3, "-CH2-": 2, "-OH": 1, ">N-": 1, "-Cl": 1 } }
+
+    Return:
+        log, fdict
+    """
+    if not isinstance(jdict,dict):
+        return {'nice':False, 'info':'Error: one system has to be defined as an object'}, {}
+    jdict = dict(jdict)
+    # molar ratio can be defined by y1 & y2 & ...
+    ys = []
+    while 'y{:}'.format(len(ys)+1) in jdict: ys.append(jdict.pop('y{:}'.format(len(ys)+1)))
+    if 'ratio' not in jdict and len(ys) >= 2:
+        jdict['ratio'] = ' : '.join(['{:}'.format(y) for y in ys])
+
+    # same format as input file, groups have to be after keywords
+    profile = []
+    marks = []
+    for key, value in jdict.items():
+        if value is None: continue
+        if isinstance(value,dict):
+            marks.append(['mark', str(key).strip()])
+            for sym, nm in value.items(): marks.append([str(sym).lower().strip(), str(nm).strip()])
+        else:
+            profile.append([str(key).lower().strip(), str(value).strip()])
+    return func_pro_profile(profile + marks)
+
+
+
+@func_staged('output')
+def func_result_dict(rst, prop=None, sweep=None):
+    """
+    Convert results into a dict, which can be directly dumped as JSON
+
+    Parameters:
+        rst   : MLJR, after run
+        prop  : dict, return of func_run_fdict
+        sweep : dict, return of MLJR.sweep
+
+    Return:
+        dict, numbers are float or list of float, not-a-number is None
+    """
+    def fnum(v):
+        if func_is_array(v): return [fnum(i) for i in v.tolist()]
+        if isinstance(v,(list,tuple)): return [fnum(i) for i in v]
+        if isinstance(v,dict): return dict([(i,fnum(j)) for i,j in v.items()])
+        if v is None: return None
+        if isinstance(v,complex) or v != v: return None
+        return float(v)
+
+    if rst.type == 'purity':
+        keys = ['m', 'Tc', 'Pc', 'Vc', 'Tb', 'w']
+    else:
+        keys = ['y{:}'.format(i) for i in range(1,rst.n+1)] + ['m']
+        for i in range(1,rst.n+1): keys += [k+str(i) for k in ['m', 'Tc', 'Pc', 'Vc', 'Tb', 'w']]
+        keys += ['Tcm', 'Pcm', 'Vcm', 'Tbm', 'wm']
+    result = {'type':rst.type}
+    for k in keys: result[k] = fnum(getattr(rst,k))
+    if prop:
+        for k,v in prop.items():
+            if isinstance(v,dict):
+                result[k] = dict([(i,j if isinstance(j,str) else fnum(j)) for i,j in v.items()])
+            else:
+                result[k] = fnum(v)
+    if sweep is not None:
+        result['sweep'] = dict([(k,fnum(v)) for k,v in sweep.items()])
+    return result
+
+
+
+def func_calc_jdict(jdict, calc=None, sweep_y1=None, cache=None, solve=None, uncertainty=None):
+    """
+    Calculate one system defined in a dict (e.g. from JSON), see func_pro_jdict
+
+    Parameters:
+        calc     : same as func_run_fdict
+        sweep_y1 : same as func_calc_fdict
+        cache    : ResultCache, optional
+        solve    : same as func_calc_fdict
+        uncertainty : same as func_calc_fdict, key < uncertainty > is added to result
+
+    Return:
+        log, result
+
+        result : dict, return of func_result_dict, keyword < name > is added,
+                 an input key < id > is echoed back, for error, result is: { "error": info }
+    """
+    sid = None
+    result = None
+    try:
+        if isinstance(jdict,dict):
+            jdict = dict(jdict)
+            sid = jdict.pop('id',None)
+        log, fdict = func_pro_jdict(jdict)
+        if uncertainty is not None and uncertainty.get('seed') is None: cache = None
+        if log['nice'] and cache is not None:
+            key = cache.key(fdict, calc, sweep_y1, solve, 'json', uncertainty)
+            result = cache.get(key)
+        if log['nice'] and result is None:
+            log, rst, prop = func_run_fdict(fdict, calc)
+    except ValueError as e:
+        log = {'nice':False, 'info':'Error: {:}'.format(e)}
+    except (TypeError, ZeroDivisionError, OverflowError) as e:
+        log = {'nice':False, 'info':'Error: calculation failed: {:}'.format(e)}
+
+    if log['nice'] and result is None:
+        sweep = None
+        if solve is not None:
+            log, y1 = func_run_solve(rst, prop, solve)
+            if log['nice']:
+                prop = dict(prop)
+                prop['solve'] = {'prop':solve[0], 'target':solve[1:], 'y1':y1}
+        elif sweep_y1 is not None:
+            if rst.type != 'mixture' or rst.n != 2:
+                log = {'nice':False, 'info':'Error: --ratio-sweep only works for calculation type < mixture > of two components'}
+            else:
+                sweep = rst.sweep(sweep_y1)
+                if 'd' in prop:
+                    sweep['d'] = func_calc_density(sweep['m'],prop['t'],sweep['Tcm'],sweep['Pcm'],sweep['Vcm'],sweep['Tbm'])
+                if 'st' in prop:
+                    sweep['st'] = func_calc_st(prop['t'],prop['q-ref'],prop['t-ref'],sweep['Tcm'])
+        if log['nice'] and uncertainty is not None:
+            try:
+                log, stats = func_run_uncertainty(rst, prop, uncertainty)
+            except (TypeError, ZeroDivisionError, OverflowError) as e:
+                log = {'nice':False, 'info':'Error: calculation failed: {:}'.format(e)}
+            if log['nice']:
+                prop = dict(prop)
+                prop['uncertainty'] = stats
+    if log['nice'] and result is None:
+        result = func_result_dict(rst, prop, sweep)
+        if cache is not None: cache.put(key, result)
+    if log['nice']:
+        if 'name' in fdict: result = dict([('name',fdict['name'])] + list(result.items()))
+    else:
+        result = {'error':log['info'].strip()}
+    if sid is not None: result = dict([('id',sid)] + list(result.items()))
+    return log, result
+
+
+
+def func_calc_jsonl(fin, fout, calc=None, sweep_y1=None, cache=None, solve=None, uncertainty=None, lock=None):
+    """
+    Streaming JSON Lines, one system per line in, one result object per line out
+
+    Each result is written as soon as it is calculated, memory is only for one system at a time.
+    An input key < id > is echoed back, for error, result is: { "line": number, "error": info }.
+    A line can also be an array of systems (batch), answered by one array in one line
+
+    Parameters:
+        fin      : input stream, e.g. sys.stdin
+        fout     : output stream, e.g. sys.stdout
+        calc     : same as func_run_fdict
+        sweep_y1 : same as func_calc_fdict
+        cache    : same as func_calc_fdict
+        solve    : same as func_calc_fdict
+        uncertainty : same as func_calc_fdict
+        lock     : threading.Lock, optional, held only while one line is calculated, never while
+                   reading or writing, e.g. _SERVE_LOCK used by mljr serve
+
+    Return:
+        number of lines, number of errors
+    """
+    def fline(cnt, log, result):
+        if log['nice']: return result
+        # error, line number is put in front of error info
+        result = list(result.items())
+        return dict(result[:-1] + [('line',cnt)] + result[-1:])
+
+    def fcalc(cnt, jdict):
+        """Return result and number of errors of one line"""
+        if isinstance(jdict,list):
+            result = []
+            nerr = 0
+            for i in jdict:
+                log, rst = func_calc_jdict(i, calc, sweep_y1, cache, solve, uncertainty)
+                if not log['nice']: nerr += 1
+                result.append(fline(cnt,log,rst))
+            return result, nerr
+        log, result = func_calc_jdict(jdict, calc, sweep_y1, cache, solve, uncertainty)
+        return fline(cnt,log,result), 0 if log['nice'] else 1
+
+    cache = func_open_cache(cache)
+    cnt = 0
+    nerr = 0
+    for line in fin:
+        if len(line.strip()) == 0: continue
+        cnt += 1
+        try:
+            jdict = json.loads(line)
+        except ValueError as e:
+            n = 1
+            result = {'line':cnt, 'error':'Error: {:}'.format(e)}
+        else:
+            if lock is None:
+                result, n = fcalc(cnt, jdict)
+            else:
+                with lock:
+                    result, n = fcalc(cnt, jdict)
+        nerr += n
+        fout.write(json.dumps(result) + '\n')
+        fout.flush()
+    return cnt, nerr
+
+
+
+def func_pro_calc(calc):
+    """
+    Check inputs of density and surface tension, same as -x/--calc
+
+    Parameter:
+        calc : 1D list, [T] or [T-ref, Q-ref, T], numbers or strings,
+               T can be a range string START:STOP:STEP
+
+    Return:
+        log, calc
+    """
+    log = {'nice':True, }
+    bo = isinstance(calc,(list,tuple)) and len(calc) in [1,3]
+    if bo:
+        try:
+            calc = [float(i) for i in calc[:-1]] + [calc[-1]]
+            # temperature range will be processed after critical temperature is known
+            if not isinstance(calc[-1],str) or calc[-1].find(':') == -1: calc[-1] = float(calc[-1])
+        except (TypeError, ValueError):
+            bo = False
+    if not bo:
+        log['nice'] = False
+        log['info'] = 'Error: the input parameter(s) in -x/--calc is not correctly defined'
+    return log, calc
+
+
+
+class MLJRError(Exception):
+    """Base class of errors raised by compute"""
+
+class InputError(MLJRError, ValueError):
+    """The system or calculation inputs are not correctly defined"""
+
+class CalculationError(MLJRError, ArithmeticError):
+    """The system is defined, but its properties cannot be calculated"""
+
+
+
+class Result(dict):
+    """
+    Results of compute, keys are the same as func_result_dict,
+    they can also be got as attributes, e.g. Result.Tc, Result.d
+
+    Attributes:
+        mljr : MLJR, after run, None for results of batch evaluation in compute_many
+    """
+    def __init__(self, data, rst=None):
+        super(Result, self).__init__(data)
+        self.mljr = rst
+
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+
+
+def func_pro_spec(spec):
+    """
+    Process one system for compute, see compute
+
+    Raise:
+        InputError
+
+    Return:
+        fdict
+    """
+    if isinstance(spec,dict):
+        log, fdict = func_pro_jdict(spec)
+    elif isinstance(spec,str):
+        log, fdict = func_profile(spec)
+    else:
+        raise InputError('Error: system has to be defined as a dict or an input file path')
+    if not log['nice']: raise InputError(log['info'])
+    return fdict
+
+
+
+def func_pro_spec_calc(calc):
+    """Same as func_pro_calc, raise InputError"""
+    if calc is None: return None
+    log, calc = func_pro_calc(calc)
+    if not log['nice']: raise InputError(log['info'])
+    return calc
+
+
+
+def func_run_spec(fdict, calc=None):
+    """Same as func_run_fdict, raise typed exceptions, return Result"""
+    # wrong inputs are reported by log, errors raised here come from the equations,
+    # e.g. math domain error, properties are lazy, so func_result_dict is guarded too
+    try:
+        log, rst, prop = func_run_fdict(fdict, calc)
+        if log['nice']: result = Result(func_result_dict(rst, prop), rst)
+    except (ValueError, TypeError, ZeroDivisionError, OverflowError) as e:
+        raise CalculationError('Error: calculation failed: {:}'.format(e))
+    if not log['nice']: raise InputError(log['info'])
+    return result
+
+
+
+def compute(spec, calc=None):
+    """
+    Calculate one system in process, the library entry of command line < mljr -f >
+
+    Parameters:
+        spec : dict, same keys as JSON Lines, e.g.
+               { "type": "purity", "m": 139.62, "no-ring": { "-CH3": 3, "-CH2-": 2, "-OH": 1, ">N-": 1, "-Cl": 1 } }
+               OR str, input file path which defines only one system
+        calc : 1D list, same as -x/--calc, [T] or [T-ref, Q-ref, T], optional
+
+    Raise:
+        InputError       : inputs are not correctly defined
+        CalculationError : properties cannot be calculated
+
+    Return:
+        Result
+    """
+    fdict = func_pro_spec(spec)
+    return func_run_spec(fdict, func_pro_spec_calc(calc))
+
+
+
+def compute_many(specs, calc=None, return_exceptions=False):
+    """
+    Calculate many systems at once, results are the same as compute for each
+
+    Pure solvents are evaluated together in one vectorized batch (func_calc_batch),
+    along with their densities and surface tensions, the others fall back to compute
+
+    Parameters:
+        specs             : 1D list, systems, same as compute
+        calc              : same as compute, for all systems
+        return_exceptions : bool, False to raise the first error,
+                            True to put errors in place of their results, same as asyncio.gather
+
+    Return:
+        1D list of Result
+    """
+    calc = func_pro_spec_calc(calc)
+    results = [None for i in specs]
+    # [ (index, fdict, Component), ... ]
+    batch = []
+    for i,spec in enumerate(specs):
+        try:
+            fdict = func_pro_spec(spec)
+            bo_calc_dy, bo_calc_st, t, t_ref, q_ref = func_pro_temperature(fdict, calc)
+            if func_numpy() is None or fdict['type'] != 'purity' or isinstance(t,str):
+                results[i] = func_run_spec(fdict, calc)
+            else:
+                log, m, comp = func_pro_component(fdict)
+                if not log['nice']: raise InputError(log['info'])
+                batch.append((i, fdict, comp))
+        except Exception as e:
+            # errors of one system never abort the others
+            if not isinstance(e,MLJRError):
+                e = CalculationError('Error: calculation failed: {:}'.format(e))
+            if not return_exceptions: raise e
+            results[i] = e
+    if len(batch) == 0: return results
+
+    try:
+        # groups are already resolved into Component.counts
+        counts = np.array([b[2].counts for b in batch], dtype=float)
+        M = np.array([b[2].M for b in batch], dtype=float)
+        with np.errstate(all='ignore'):
+            Tc, Pc, Vc, Tb, w = func_calc_batch(counts, M)
+            # temperatures of each system, nan for not calculated
+            temps = np.array([[np.nan if v is None else v for v in func_pro_temperature(b[1], calc)[2:]]
+                              for b in batch], dtype=float).reshape(len(batch),3)
+            d = func_calc_density(M, temps[:,0], Tc, Pc, Vc, Tb)
+            st = func_calc_st(temps[:,0], temps[:,2], temps[:,1], Tc)
+    except Exception as e:
+        # only the vectorized block fails the whole batch
+        if not return_exceptions:
+            raise CalculationError('Error: calculation failed: {:}'.format(e))
+        for i,fdict,comp in batch:
+            results[i] = CalculationError('Error: calculation failed: {:}'.format(e))
+        return results
+
+    for n,(i,fdict,comp) in enumerate(batch):
+        if np.isnan(Tc[n]):
+            e = CalculationError('Error: calculation failed: group contributions are not defined')
+            if not return_exceptions: raise e
+            results[i] = e
+            continue
+        data = [('m',M[n]), ('Tc',Tc[n]), ('Pc',Pc[n]), ('Vc',Vc[n]), ('Tb',Tb[n]), ('w',w[n])]
+        bo_calc_dy, bo_calc_st, t, t_ref, q_ref = func_pro_temperature(fdict, calc)
+        if bo_calc_dy: data += [('t',t), ('d',d[n])]
+        if bo_calc_st: data += [('t-ref',t_ref), ('q-ref',q_ref), ('st',st[n])]
+        # same as func_result_dict, not-a-number is None
+        results[i] = Result([('type','purity')] + [(k,None if v != v else float(v)) for k,v in data])
+    return results
+
+
+
+class Coalescer(object):
+    """
+    Coalesce concurrent acompute calls made within a short window into one compute_many run,
+    which is run in a worker thread, then results are fanned back to each awaiting caller
+
+    Attributes:
+        window  : float, seconds to wait for more calls after the first one
+        maxsize : int, a batch is run immediately when it has so many calls
+    """
+    # batches are run in the default executor of the loop, one by one,
+    # shared caches are never used concurrently
+    lock = threading.Lock()
+
+    def __init__(self, loop, window=0.002, maxsize=1024):
+        self.loop = loop
+        self.window = window
+        self.maxsize = maxsize
+        self.pending = []
+        self.handle = None
+
+
+    def submit(self, spec, calc=None):
+        """Return asyncio.Future of Result"""
+        future = self.loop.create_future()
+        self.pending.append((spec, calc, future))
+        if len(self.pending) >= self.maxsize:
+            self.flush()
+        elif self.handle is None:
+            self.handle = self.loop.call_later(self.window, self.flush)
+        return future
+
+
+    def flush(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        pending, self.pending = self.pending, []
+
+        # compute_many takes one calc for all systems
+        groups = collections.OrderedDict()
+        for spec, calc, future in pending:
+            key = None if calc is None else tuple(calc)
+            if key not in groups: groups[key] = (calc, [], [])
+            groups[key][1].append(spec)
+            groups[key][2].append(future)
+        for calc, specs, futures in groups.values():
+            task = self.loop.run_in_executor(None, self.run, specs, calc)
+            task.add_done_callback(lambda task, futures=futures: self.fanout(task, futures))
+
+
+    def run(self, specs, calc):
+        """Run in worker thread, errors of each system are in place of their results"""
+        with self.lock:
+            return compute_many(specs, calc, True)
+
+
+    def fanout(self, task, futures):
+        if task.cancelled():
+            for f in futures: f.cancel()
+            return
+        e = task.exception()
+        if e is not None:
+            # compute_many itself failed, each caller gets its own exception
+            if isinstance(e,MLJRError):
+                results = [type(e)(str(e)) for f in futures]
+            else:
+                results = [CalculationError('Error: calculation failed: {:}'.format(e)) for f in futures]
+        else:
+            results = task.result()
+        for f,r in zip(futures,results):
+            if f.done(): continue
+            if isinstance(r,Exception):
+                f.set_exception(r)
+            else:
+                f.set_result(r)
+
+_COALESCERS = weakref.WeakKeyDictionary()
+
+
+
+async def acompute(spec, calc=None):
+    """
+    Asyncio version of compute, never blocks the event loop
+
+    Concurrent calls within Coalescer.window are coalesced into one compute_many run
+
+    Return:
+        Result
+    """
+    import asyncio
+    # get_running_loop is new in Python 3.7
+    loop = getattr(asyncio,'get_running_loop',asyncio.get_event_loop)()
+    if loop not in _COALESCERS: _COALESCERS[loop] = Coalescer(loop)
+    return await _COALESCERS[loop].submit(spec, calc)
+
+
+
+def func_pro_files(paths):
+    """
+    Expand input paths into a file list
+
+    Parameter:
+        paths : 1D list, each can be a file, a directory (all *.txt files inside) or a glob pattern
+
+    Return:
+        1D list, files in a deterministic sequence, duplicates are removed
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path,'*.txt')))
+        elif not os.path.exists(path) and any([c in path for c in '*?[']):
+            files += sorted(glob.glob(path))
+        else:
+            files.append(path)
+    prolist = []
+    for f in files:
+        if f not in prolist: prolist.append(f)
+    return prolist
+
+
+
+def func_calc_files(files, calc=None, sweep_y1=None, workers=1, cache=None, solve=None, uncertainty=None):
+    """
+    Calculate many input files, fan out across a process pool when workers > 1
+
+    Parameters:
+        files    : 1D list, input files
+        calc     : same as func_calc_fdict
+        sweep_y1 : same as func_calc_fdict
+        workers  : int, number of processes, 0 or None means number of CPUs
+        cache    : str, file path of ResultCache, optional
+        solve    : same as func_calc_fdict
+        uncertainty : same as func_calc_fdict
+
+    Return:
+        1D list, [ (file, log, info), ... ], in the same sequence as files
+    """
+    if not workers: workers = os.cpu_count() or 1
+    workers = min(workers,len(files))
+    if workers <= 1:
+        rsts = [func_calc_file(f,calc,sweep_y1,cache,solve,uncertainty) for f in files]
+    else:
+        import concurrent.futures
+        chunk = max(1, len(files) // (workers*4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            rsts = list(executor.map(func_calc_file, files, [calc]*len(files), [sweep_y1]*len(files),
+                                     [cache]*len(files), [solve]*len(files), [uncertainty]*len(files),
+                                     chunksize=chunk))
+    return [(f,log,info) for f,(log,info) in zip(files,rsts)]
+
+
+
+def func_pro_library(files):
+    """
+    Read components from library files, every system has to be calculation type < purity >
+
+    Parameter:
+        files : 1D list, input files, each one can have many systems,
+                OR SMILES files (*.smi), one molecule per line: SMILES [name]
+
+    Yield:
+        log, comp
+
+        comp : Component, default name is < file:line >
+    """
+    for file in files:
+        if not os.path.isfile(file):
+            yield {'nice':False, 'info':'Error: wrong input file < {:} >'.format(file)}, None
+            continue
+        if file.endswith('.smi'):
+            for log, comp in func_pro_library_smiles(file): yield log, comp
+            continue
+        for beg, log, fdict in func_profile_records(file):
+            name = '{:}:{:}'.format(file,beg)
+            if log['nice'] and fdict['type'] != 'purity':
+                log = {'nice':False, 'info':'Error: calculation type has to be < purity >'}
+            if log['nice']:
+                log, m, comp = func_pro_component(fdict)
+            if not log['nice']:
+                log['info'] = '{:} : {:}'.format(name, log['info'].strip())
+                yield log, None
+                continue
+            comp.name = fdict.get('name',name)
+            yield log, comp
+
+
+
+def func_pro_library_smiles(file):
+    """
+    Read components from a SMILES file, one molecule per line: SMILES [name], see func_pro_library
+    """
+    with open(file,'rt') as f:
+        for cnt, line in enumerate(f, 1):
+            ltmp = line.split(maxsplit=1)
+            if len(ltmp) == 0 or ltmp[0].startswith('#'): continue
+            name = ltmp[1].strip() if len(ltmp) > 1 else '{:}:{:}'.format(file,cnt)
+            log, groups, M = func_pro_smiles(ltmp[0])
+            if log['nice']:
+                try:
+                    counts = func_pro_counts(groups)
+                except ValueError as e:
+                    log = {'nice':False, 'info':str(e)}
+            if not log['nice']:
+                log['info'] = '{:} : {:}'.format(name, log['info'].strip())
+                yield log, None
+                continue
+            yield log, Component(counts, M, name)
+
+
+
+# objectives for screening, d : density, st : surface tension
+SCREEN_OBJECTIVES = ['d', 'st', 'Tcm', 'Pcm', 'Vcm', 'Tbm', 'wm']
+
+def func_screen(hba, hbd, y1, t=None, objective='d', k=10, order='max', t_ref=None, q_ref=None):
+    """
+    Combinatorial screening of HBA x HBD x molar ratio for binary mixtures
+
+    Results stream through a bounded top-k heap, the full cross product is never materialized.
+    Components are memoized in MLJR.cache, and all ratios of one pair are calculated by MLJR.sweep
+
+    Parameters:
+        hba       : iterable of Component, e.g. from func_pro_library
+        hbd       : list of Component, iterated for every HBA
+        y1        : 1D list, molar ratios of HBA
+        t         : temperature (K), required by objective < d > and < st >
+        objective : one of SCREEN_OBJECTIVES
+        k         : number of best results to keep
+        order     : 'max' or 'min'
+        t_ref     : reference temperature, required by objective < st >
+        q_ref     : reference Surface Tension at t_ref, required by objective < st >
+
+    Return:
+        results, nerr
+
+        results : 1D list of dict, best first, keys: score hba hbd y1 y2 Tcm Pcm Vcm Tbm wm [d] [st]
+        nerr    : number of failed HBA x HBD pairs
+    """
+    if objective not in SCREEN_OBJECTIVES:
+        raise ValueError('Error: objective has to be one of {:}'.format(SCREEN_OBJECTIVES))
+    if objective in ['d','st'] and t is None:
+        raise ValueError('Error: temperature is required for objective < {:} >'.format(objective))
+    if objective == 'st' and (t_ref is None or q_ref is None):
+        raise ValueError('Error: reference temperature and surface tension are required for objective < st >')
+    if order not in ['max','min']:
+        raise ValueError('Error: order has to be < max > or < min >')
+    sign = 1.0 if order == 'max' else -1.0
+
+    heap = []
+    cnt = 0
+    nerr = 0
+    for c1 in hba:
+        for c2 in hbd:
+            try:
+                rst = MLJR(type='mixture', table1=c1, table2=c2)
+                sweep = rst.sweep(y1)
+                if t is not None:
+                    sweep['d'] = func_calc_density(sweep['m'],t,sweep['Tcm'],sweep['Pcm'],sweep['Vcm'],sweep['Tbm'])
+                    if t_ref is not None and q_ref is not None:
+                        sweep['st'] = func_calc_st(t,q_ref,t_ref,sweep['Tcm'])
+            except (ValueError, TypeError, ZeroDivisionError, OverflowError):
+                nerr += 1
+                continue
+            scores = sign * sweep[objective]
+            for i in range(len(scores)):
+                if not np.isfinite(scores[i]): continue
+                cnt += 1
+                if len(heap) >= k and scores[i] <= heap[0][0]: continue
+                item = dict([(key,float(v[i])) for key,v in sweep.items() if key != 'm'])
+                item['score'] = float(sweep[objective][i])
+                item['hba'] = c1.name
+                item['hbd'] = c2.name
+                # counter keeps the sequence deterministic for ties
+                if len(heap) < k:
+                    heapq.heappush(heap, (scores[i], -cnt, item))
+                else:
+                    heapq.heapreplace(heap, (scores[i], -cnt, item))
+
+    return [i[2] for i in sorted(heap, key=lambda x: (-x[0], -x[1]))], nerr
+
+
+
+@func_staged('output')
+def func_format_screen(results, objective):
+    """Format results of func_screen into a table"""
+    keys = ['score', 'y1', 'Tcm', 'Pcm', 'Vcm', 'Tbm', 'wm']
+    if len(results) > 0:
+        keys += [i for i in ['d','st'] if i in results[0]]
+    info = '# Screening, objective < {:} >\n'.format(objective)
+    info += '#rank' + ''.join(['{:>11}'.format(i) for i in keys]) + '    hba  |  hbd\n'
+    for n,r in enumerate(results):
+        info += '{:>5}'.format(n+1) + ''.join(['{:>11}'.format(round(r[i],4)) for i in keys])
+        info += '    {:}  |  {:}\n'.format(r['hba'], r['hbd'])
+    return info
+
+
+
+def func_pro_argparse_screen():
+    """
+    Process input arguments for < mljr screen >
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog='mljr screen',allow_abbrev=False,
+                                     description='Combinatorial screening of HBA x HBD x molar ratio for binary mixtures')
+    parser.add_argument('--hba',help='HBA library file(s), systems are type < purity >',nargs='+',required=True)
+    parser.add_argument('--hbd',help='HBD library file(s), systems are type < purity >',nargs='+',required=True)
+    parser.add_argument('-r','--ratio',help='Molar ratio(s) HBA:HBD, e.g. 1:2, or a range of HBA molar ratio \
+                            in a format START:STOP:STEP, e.g. 0.1:0.9:0.1 (default 1:1)',nargs='+',default=['1:1'])
+    parser.add_argument('-T','--temperature',help='Target temperature (K)',type=float)
+    parser.add_argument('--objective',help='Objective to rank, one of {:} (default d, density)'.format(
+                            ', '.join(SCREEN_OBJECTIVES)),default='d',choices=SCREEN_OBJECTIVES)
+    parser.add_argument('--min',help='Rank by minimum objective (default maximum)',action='store_true')
+    parser.add_argument('-k','--top-k',help='Number of best results (default 10)',type=int,default=10)
+    parser.add_argument('--t-ref',help='Reference temperature for surface tension',type=float)
+    parser.add_argument('--q-ref',help='Reference surface tension at T-ref',type=float)
+    parser.add_argument('--jsonl',help='Write results in JSON Lines',action='store_true')
+    return parser
+
+
+
+def func_main_screen(argv):
+    """mljr screen"""
+    args = func_pro_argparse_screen().parse_args(argv)
+    if func_numpy() is None:
+        print('Error: numpy is required for screening')
+        exit()
+    if args.top_k <= 0:
+        print('Error: the number of best results has to be positive')
+        exit()
+
+    y1 = []
+    for r in args.ratio:
+        if r.count(':') == 2:
+            log, values = func_pro_range(r)
+        else:
+            log = {'nice':True, }
+            try:
+                a, b = [float(i) for i in r.replace(' ','').split(':')]
+                values = [a/(a+b),]
+            except (ValueError, ZeroDivisionError):
+                log = {'nice':False, 'info':'Error: wrong defined ratio < {:} >'.format(r)}
+        if log['nice'] and min(values) > 0 and max(values) < 1:
+            y1 += values
+        else:
+            print(log.get('info','Error: molar ratio has to be in range (0, 1)'))
+            exit()
+
+    # HBD library is iterated for every HBA, HBA library is streamed
+    errors = []
+    hbd = []
+    for log, comp in func_pro_library(func_pro_files(args.hbd)):
+        if log['nice']: hbd.append(comp)
+        else: errors.append(log['info'])
+    def fhba():
+        for log, comp in func_pro_library(func_pro_files(args.hba)):
+            if log['nice']: yield comp
+            else: errors.append(log['info'])
+
+    try:
+        results, nerr = func_screen(fhba(), hbd, y1, args.temperature, args.objective, args.top_k,
+                                    'min' if args.min else 'max', args.t_ref, args.q_ref)
+    except ValueError as e:
+        print(e)
+        exit()
+
+    if args.jsonl:
+        for r in results: print(json.dumps(r))
+    else:
+        print(func_format_screen(results, args.objective),end='')
+        if nerr: print('# Note: < {:} > HBA x HBD pairs failed in calculation'.format(nerr))
+    for e in errors: print('# ' + e, file=sys.stderr)
+
+
+
+# measured properties for fitting, Tc Pc Vc Tb are Tcm Pcm Vcm Tbm for mixture
+FIT_PROPERTIES = ['Tc', 'Pc', 'Vc', 'Tb', 'd', 'st']
+
+def func_pro_dataset(files):
+    """
+    Read datasets for fitting, JSON Lines, one system per line, using the same keys as JSON Lines input,
+    along with measured properties in key < exp >
+
+    Example:
+        { "type": "purity", "m": 139.62, "t-ref": 298.15, "t": 298.15,
+          "no-ring": { "-CH3": 3, "-CH2-": 2, "-OH": 1, ">N-": 1, "-Cl": 1 }, "exp": { "Tc": 650.1, "d": 1.05 } }
+
+    Note: same as input file, < d > needs keywords < t-ref > & < t >, < st > also needs < q-ref >
+
+    Parameter:
+        files : 1D list, JSON Lines files
+
+    Return:
+        systems, errors
+
+        systems : 1D list of dict, keys: comps ys t t_ref q_ref exp name
+        errors  : 1D list of str, systems are skipped
+    """
+    systems = []
+    errors = []
+    for file in files:
+        try:
+            with open(file,'rt') as f: lines = f.readlines()
+        except OSError:
+            errors.append('Error: wrong input file < {:} >'.format(file))
+            continue
+        for cnt,line in enumerate(lines):
+            if len(line.strip()) == 0: continue
+            name = '{:}:{:}'.format(file,cnt+1)
+            try:
+                jdict = json.loads(line)
+            except ValueError as e:
+                errors.append('{:} : Error: {:}'.format(name,e))
+                continue
+            if not isinstance(jdict,dict) or not isinstance(jdict.get('exp'),dict) or not jdict['exp'] or \
+               any([k not in FIT_PROPERTIES for k in jdict['exp']]) or \
+               not all([isinstance(v,(int,float)) and not isinstance(v,bool) and v > 0 for v in jdict['exp'].values()]):
+                errors.append('{:} : Error: measured properties have to be positive numbers in < exp >, '
+                              'keys: {:}'.format(name, ', '.join(FIT_PROPERTIES)))
+                continue
+            jdict = dict(jdict)
+            exp = jdict.pop('exp')
+            log, fdict = func_pro_jdict(jdict)
+            if log['nice']:
+                try:
+                    log, rst, prop = func_run_fdict(fdict)
+                except (ValueError, TypeError, ZeroDivisionError, OverflowError) as e:
+                    log = {'nice':False, 'info':'Error: calculation failed: {:}'.format(e)}
+            if log['nice']:
+                if isinstance(prop.get('t'),str) or isinstance(prop.get('t'),list):
+                    log = {'nice':False, 'info':'Error: fitting needs one temperature < t >, not a range'}
+                elif ('d' in exp and 'd' not in prop) or ('st' in exp and 'st' not in prop):
+                    log = {'nice':False, 'info':'Error: measured < d > needs keywords < t-ref > & < t >, '
+                                                '< st > also needs < q-ref >'}
+            if not log['nice']:
+                errors.append('{:} : {:}'.format(name, log['info'].strip()))
+                continue
+            systems.append({
+                'comps' : [rst.table] if rst.type == 'purity' else rst.tables,
+                'ys'    : None if rst.type == 'purity' else rst.ys,
+                't'     : prop.get('t'),
+                't_ref' : prop.get('t-ref'),
+                'q_ref' : prop.get('q-ref'),
+                'exp'   : exp,
+                'name'  : fdict.get('name',name),
+            })
+    return systems, errors
+
+
+
+@func_staged('output')
+def func_format_fit(fit, names, nsys):
+    """Format results of func_calc_fit into a table"""
+    info = '# Fitting, < {:} > systems, < {:} > iterations\n'.format(nsys,fit['iterations'])
+    info += '# RMS relative error: before < {:.6g} >, after < {:.6g} >\n'.format(fit['rms0'],fit['rms'])
+    for p,v in fit['props'].items():
+        info += '#   {:<3} ({:} measurements): before < {:.6g} >, after < {:.6g} >\n'.format(
+                p, v['n'], v['rms0'], v['rms'])
+    info += '#{:<29}{:>14}{:>14}\n'.format('parameter','initial','fitted')
+    for n,i,f,bo in zip(names,fit['initial'],fit['fitted'],fit['determined']):
+        info += '{:<30}{:>14.6g}{:>14.6g}{:}\n'.format(n, i, f, '' if bo else '    (not determined, kept)')
+    return info
+
+
+
+def func_pro_argparse_fit():
+    """
+    Process input arguments for < mljr fit >
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog='mljr fit',allow_abbrev=False,
+                                     description='Refit group contributions and constants against measured properties')
+    parser.add_argument('dataset',help='JSON Lines file(s), one system per line, same keys as --jsonl, measured \
+                            properties in key < exp >, e.g. "exp": {{"Tc": 650.1, "d": 1.05}}, keys: {:}'.format(
+                            ', '.join(FIT_PROPERTIES)),nargs='+')
+    parser.add_argument('-g','--groups',help='Groups to refit, symbol or nickName, can be prefixed by table, \
+                            e.g. ">N-" "-Cl" "ring:-CH2-", end at the next option or at "--"',nargs='*',
+                            action='append',default=[])
+    parser.add_argument('-c','--contributions',help='Contributions of groups to refit, in {:} \
+                            (default all)'.format(', '.join(CONTRIBUTIONS)),nargs='+',choices=CONTRIBUTIONS)
+    parser.add_argument('--const',help='MLJR constants to refit, in AM, BM, CM, EM',nargs='+',
+                            choices=['AM','BM','CM','EM'],default=[])
+    parser.add_argument('--maxiter',help='Maximum number of iterations (default 100)',type=int,default=100)
+    parser.add_argument('-o','--output',help='Write refitted values to a JSON file, \
+                            same format as --uncertainty SIGMA')
+    return parser
+
+
+
+def func_main_fit(argv):
+    """mljr fit"""
+    # symbols can start with '-', e.g. -Cl, argparse leaves them as unknown options,
+    # they are taken as groups, unknown long options are still errors
+    parser = func_pro_argparse_fit()
+    args, extras = parser.parse_known_args(argv)
+    unknown = [v for v in extras if v.startswith('--') or not v.startswith('-')]
+    if unknown:
+        parser.error('unrecognized arguments: {:}'.format(' '.join(unknown)))
+    args.groups = [g for i in args.groups for g in i] + extras
+    missing = [f for f in args.dataset if not os.path.isfile(f)]
+    if missing:
+        print('Error: dataset file < {:} > is not found'.format(', '.join(missing)))
+        exit()
+    if func_numpy() is None:
+        print('Error: numpy is required for fitting')
+        exit()
+    if not args.groups and not args.const:
+        print('Error: nothing to refit, use -g/--groups or --const')
+        exit()
+
+    params, names = [], []
+    if args.groups:
+        log, params, names = func_pro_fit_params(args.groups, args.contributions)
+        if not log['nice']:
+            print(log['info'])
+            exit()
+    names += ['CONST_'+k for k in args.const]
+
+    systems, errors = func_pro_dataset(args.dataset)
+    for e in errors: print('# ' + e, file=sys.stderr)
+    if not systems:
+        print('Error: no system is available for fitting')
+        exit()
+    try:
+        fit = func_calc_fit(systems, params, args.const, args.maxiter)
+    except ValueError as e:
+        print(e)
+        exit()
+
+    print(func_format_fit(fit, names, len(systems)),end='')
+    if args.output:
+        with open(args.output,'wt') as f: f.write(json.dumps(fit['fit'], indent=4) + '\n')
+
+
+
+def func_pro_argparse_serve():
+    """
+    Process input arguments for < mljr serve >
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog='mljr serve',allow_abbrev=False,
+                                     description='Long-running local daemon, answering JSON requests with warm tables')
+    parser.add_argument('--socket',help='Unix socket path, JSON Lines protocol, one system (or an array of \
+                            systems) per line, one result per line')
+    parser.add_argument('--host',help='HTTP host, POST a system (or an array of systems) in JSON (default 127.0.0.1)',
+                            default='127.0.0.1')
+    parser.add_argument('-p','--port',help='HTTP port (default 8765)',type=int,default=8765)
+    parser.add_argument('--cache',help='Persistent result cache, a local SQLite file path')
+    return parser
+
+
+
+# computations of mljr serve are serialized, group tables and caches are shared by all connections,
+# the lock is never held while reading requests or writing responses
+_SERVE_LOCK = threading.Lock()
+
+
+
+def func_serve_classes():
+    """
+    Request handlers and servers of mljr serve, defined on first use,
+    thus socketserver and http.server are only imported by mljr serve
+
+    Return:
+        JSONLinesHandler, HTTPHandler, ThreadingUnixServer, ThreadingHTTPServer
+    """
+    import socketserver
+    import http.server
+
+    class JSONLinesHandler(socketserver.StreamRequestHandler):
+        """mljr serve --socket, one connection can send as many lines as needed"""
+        def handle(self):
+            fin = io.TextIOWrapper(self.rfile, encoding='utf-8')
+            fout = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+            try:
+                func_calc_jsonl(fin, fout, cache=self.server.cache, lock=_SERVE_LOCK)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    class HTTPHandler(http.server.BaseHTTPRequestHandler):
+        """
+        mljr serve over HTTP
+
+        GET  /       : { "status": "ok", "version": __version__ }
+        POST /       : body is one system, or an array of systems, same keys as JSON Lines,
+                       answered by one result, or an array of results in the same sequence,
+                       Content-Length is required (411), it has to be a non-negative integer (400)
+        """
+        # seconds, a client sending less than its Content-Length is dropped
+        timeout = 30
+
+        def fout(self, code, result):
+            body = json.dumps(result).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type','application/json')
+            self.send_header('Content-Length',str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.fout(200, {'status':'ok', 'version':__version__})
+
+        def do_POST(self):
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self.fout(411, {'error':'Error: Content-Length is required'})
+                return
+            if not length.strip().isdigit():
+                self.fout(400, {'error':'Error: wrong Content-Length < {:} >'.format(length)})
+                return
+            try:
+                jdict = json.loads(self.rfile.read(int(length)).decode('utf-8'))
+            except ValueError as e:
+                self.fout(400, {'error':'Error: {:}'.format(e)})
+                return
+            with _SERVE_LOCK:
+                if isinstance(jdict,list):
+                    result = [func_calc_jdict(i, cache=self.server.cache)[1] for i in jdict]
+                else:
+                    result = func_calc_jdict(jdict, cache=self.server.cache)[1]
+            self.fout(200, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    class ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+        daemon_threads = True
+
+    return JSONLinesHandler, HTTPHandler, ThreadingUnixServer, ThreadingHTTPServer
+
+
+
+def func_main_serve(argv):
+    """mljr serve"""
+    import signal
+    import socketserver
+    args = func_pro_argparse_serve().parse_args(argv)
+    JSONLinesHandler, HTTPHandler, ThreadingUnixServer, ThreadingHTTPServer = func_serve_classes()
+
+    # warm up, contribution tables are only processed once for all requests
+    func_group_tables()
+    cache = func_open_cache(args.cache)
+
+    if args.socket is not None:
+        if not hasattr(socketserver,'UnixStreamServer'):
+            print('Error: Unix socket is not supported on this platform')
+            exit()
+        if os.path.exists(args.socket):
+            print('Error: socket file < {:} > already exists'.format(args.socket))
+            exit()
+        server = ThreadingUnixServer(args.socket, JSONLinesHandler)
+        where = 'Unix socket < {:} >'.format(args.socket)
+    else:
+        try:
+            server = ThreadingHTTPServer((args.host, args.port), HTTPHandler)
+        except OSError as e:
+            print('Error: cannot listen on < {:}:{:} >: {:}'.format(args.host,args.port,e))
+            exit()
+        where = 'http://{:}:{:}'.format(args.host,args.port)
+    server.cache = cache
+
+    print('Note: mljr serve is listening on {:}, press Ctrl-C to stop'.format(where), file=sys.stderr)
+    # clean up socket file also when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket is not None and os.path.exists(args.socket): os.remove(args.socket)
+
+
+
+def func_pro_argparse():
+    """
+    Process input arguments
+    Return:
+       Namespace(file=None, sample=False, template=False, CCG=False, CCl=False, avail_group_name=False, output=False)
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description='Critical Properties Calculation using Modified Lydersen-Joback-Reid method',allow_abbrev=False)
+    parser.add_argument('-v','--version',action='version',version='mLJR {:}'.format(__version__))
+    parser.add_argument('-f','--file',help='Input file path(s), can be many files, directories (all *.txt files \
+                            inside) or glob patterns',nargs='+')
+    parser.add_argument('-j','--jobs',help='Number of worker processes for many input files, \
+                            0 means number of CPUs (default 1)',type=int)
+    parser.add_argument('-s','--sample',help='Template shows on screen (default)',action='store_true')
+    parser.add_argument('-t','--template',help='Template writes into a file',action='store_true')
+    parser.add_argument('--CCl',help='Template molecule, Choline Chloride <purity> (default)',action='store_true')
+    parser.add_argument('--CCG',help='Template molecule, Choline Chloride Glycerol <mixture>',action='store_true')
+    parser.add_argument('-g','--avail-group-name',help='Available Group Names <include nick names>',action='store_true')
+    parser.add_argument('-o','--output',help='Append results to input file (default False)',action='store_true')
+    parser.add_argument('-e','--examples',help='Show command line examples',action='store_true')
+    parser.add_argument('-x','--calc',help='If only one input, it will be thought as T, the density value will be \
+                            calculated, if it has three inputs, which has to be input in a sequence (T-ref, Q-ref, T), \
+                            then both density and surface tension will be calculated, if else, wrong. \
+                            T can also be a range in a format START:STOP:STEP, STOP can be "Tc", \
+                            e.g. 273:Tc:1, then a table will be calculated',
+                            nargs='+')
+    parser.add_argument('--jsonl',help='Streaming JSON Lines, read one system per line from stdin, \
+                            keys are the same as input file, write one result per line to stdout',action='store_true')
+    parser.add_argument('--cache',help='Persistent result cache, a local SQLite file path, stored results \
+                            are returned without recalculation')
+    parser.add_argument('--solve',help='For mixture, solve molar ratio y1 that hits target(s), \
+                            the first input is property, < d > for density or < st > for surface tension, \
+                            e.g. --solve d 1.10 1.15',nargs='+')
+    parser.add_argument('--uncertainty',help='Monte Carlo uncertainty propagation, inputs are SIGMA [SAMPLES [SEED]], \
+                            SIGMA is a JSON file of standard deviations of group contributions and constants, \
+                            SAMPLES is the number of samples (default 10000), confidence intervals are reported, \
+                            for one input file, samples are split across -j processes',nargs='+')
+    parser.add_argument('--ratio-sweep',help='For mixture, evaluate a whole range of molar ratio y1 \
+                            in a format START:STOP:STEP, e.g. 0.05:0.95:0.01')
+    parser.add_argument('--profile',help='Report wall time and call counts of each stage to stderr, \
+                            with -j, stages in worker processes are not counted',action='store_true')
+
+    return parser
+
+
+
+def main():
+    """main!"""
+
+    # subcommands
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        func_main_serve(sys.argv[2:])
+        exit()
+    if len(sys.argv) > 1 and sys.argv[1] == 'screen':
+        func_main_screen(sys.argv[2:])
+        exit()
+    if len(sys.argv) > 1 and sys.argv[1] == 'fit':
+        func_main_fit(sys.argv[2:])
+        exit()
+
+    # fast path, no parser is built only to show version or group names
+    if sys.argv[1:] in [['-v'],['--version']]:
+        print('mLJR {:}'.format(__version__))
+        exit()
+    if sys.argv[1:] in [['-g'],['--avail-group-name']]:
+        func_show_groups()
+        exit()
+
+    # process arguments
+    beg = time.perf_counter()
+    parser = func_pro_argparse()
+    args = parser.parse_args()
+    if args.profile:
+        profiler = Profiler()
+        profiler.beg = beg
+        add_profile_hook(profiler)
+        atexit.register(lambda: print(profiler.format(), end='', file=sys.stderr))
+        func_profile_event('argparse', 'parse_args', beg, time.perf_counter()-beg)
+    #Namespace(file=None, sample=False, template=False, CCG=False, CCl=False, avail_group_name=False, output=False)
+    # avoid no inputs, print help message instead
+    bo = True
+    for i in args.__dict__:
+        if not ( args.__dict__[i] is False or args.__dict__[i] is None ):
+            bo = False
+            break
+    if bo:
+        parser.print_help()
         exit()
+    
+    # particular check density and surface tension inputs
+    if args.calc is not None:
+        log, args.calc = func_pro_calc(args.calc)
+        if not log['nice']:
+            print(log['info'])
+            exit()
+        if isinstance(args.calc[-1],str) and args.ratio_sweep is not None:
+            print('Error: temperature range in -x/--calc cannot be used along with --ratio-sweep')
+            exit()
+
+    if args.solve is not None:
+        bo = len(args.solve) >= 2 and args.solve[0] in ['d','st']
+        if bo:
+            try:
+                args.solve[1:] = [float(i) for i in args.solve[1:]]
+            except ValueError:
+                bo = False
+        if not bo:
+            print('Error: the input parameter(s) in --solve is not correctly defined')
+            exit()
+        if func_numpy() is None:
+            print('Error: numpy is required for --solve')
+            exit()
+        if args.ratio_sweep is not None:
+            print('Error: --solve cannot be used along with --ratio-sweep')
+            exit()
+
+    uncertainty = None
+    if args.uncertainty is not None:
+        bo = len(args.uncertainty) <= 3
+        samples, seed = 10000, None
+        if bo:
+            try:
+                if len(args.uncertainty) > 1: samples = int(args.uncertainty[1])
+                if len(args.uncertainty) > 2: seed = int(args.uncertainty[2])
+            except ValueError:
+                bo = False
+        if not bo or samples <= 0:
+            print('Error: the input parameter(s) in --uncertainty is not correctly defined')
+            exit()
+        if func_numpy() is None:
+            print('Error: numpy is required for --uncertainty')
+            exit()
+        if args.solve is not None or args.ratio_sweep is not None:
+            print('Error: --uncertainty cannot be used along with --solve or --ratio-sweep')
+            exit()
+        log, S, C = func_pro_sigma(args.uncertainty[0])
+        if not log['nice']:
+            print(log['info'])
+            exit()
+        uncertainty = {'S':S, 'C':C, 'samples':samples, 'seed':seed, 'workers':1}
+
+    sweep_y1 = None
+    if args.ratio_sweep is not None:
+        log, sweep_y1 = func_pro_range(args.ratio_sweep)
+        if log['nice'] and (sweep_y1[0] <= 0 or sweep_y1[-1] >= 1):
+            log['nice'] = False
+            log['info'] = 'Error: for --ratio-sweep, molar ratio has to be in range (0, 1)'
+        if log['nice'] and func_numpy() is None:
+            log['nice'] = False
+            log['info'] = 'Error: numpy is required for --ratio-sweep'
+        if not log['nice']:
+            print(log['info'])
+            exit()
 
 
     if args.examples:
@@ -1049,42 +5018,34 @@ def main():
         txt += '#    [python3] mljr  -f [file]\n\n'
         txt += '# For calculation, append results to the input file\n'
         txt += '#    [python3] mljr  -f [file] -o\n\n'
+        txt += '# For many files, directories or glob patterns, use 4 processes, show a combined report\n'
+        txt += '#    [python3] mljr  -f [file1] [file2] [directory] "[pattern*.txt]" -j 4\n\n'
+        txt += '# For components defined in SMILES, groups & molecular weight are derived (keyword < smiles >)\n'
+        txt += '#    echo \'{"smiles": "C[N+](C)(C)CCO.[Cl-]", "t-ref": 298.15, "t": 298.15}\' | [python3] mljr  --jsonl\n\n'
+        txt += '# For screening HBA x HBD x molar ratio, keep the best 20 by density at 298.15 K\n'
+        txt += '#    [python3] mljr  screen --hba [hba-file] --hbd [hbd-file] -r 1:1 1:2 -T 298.15 -k 20\n\n'
+        txt += '# For refitting contributions of >N- & -Cl and constant AM against measured properties\n'
+        txt += '#    [python3] mljr  fit [dataset.jsonl] -g ">N-" "-Cl" --const AM -o [fit.json]\n\n'
+        txt += '# For mixture, solve molar ratio y1 that hits target density(s) 1.10 and 1.15 g/mL\n'
+        txt += '#    [python3] mljr  -f [file] --solve d 1.10 1.15\n\n'
+        txt += '# For 95% confidence intervals by 10000 Monte Carlo samples, split across 4 processes\n'
+        txt += '#    [python3] mljr  -f [file] --uncertainty [sigma.json] 10000 -j 4\n\n'
+        txt += '# For a long-running local daemon, answering JSON requests over HTTP or Unix socket\n'
+        txt += '#    [python3] mljr  serve --port 8765\n'
+        txt += '#    [python3] mljr  serve --socket [socket-file]\n\n'
+        txt += '# For streaming JSON Lines, one system per line from stdin, one result per line to stdout\n'
+        txt += '#    cat [systems.jsonl] | [python3] mljr  --jsonl\n\n'
         print(txt)
         exit()
 
 
-    pro_data_ljr_ring = func_proDATA(DATA_LJR_RING)
-    pro_data_ljr_noring = func_proDATA(DATA_LJR_NO_RING)
+    if args.jsonl:
+        func_calc_jsonl(sys.stdin, sys.stdout, args.calc, sweep_y1, args.cache, args.solve, uncertainty)
+        exit()
+
     # if chosen, print available group names
     if args.file is None:
-        if args.avail_group_name:
-            print('Quoted in brace, may have many names, case-insensitive')
-            print('Symbol @ means three bonds\n')
-            print('For Ring, Available Group Names are:')
-            tot = '--> '
-            for i in pro_data_ljr_ring:
-                line = ''
-                for j in i[0]: line += j + '   '
-                line = '{ ' + line.strip() + ' }'
-
-                tot += line + '    '
-                if len(tot) > 54:
-                    print(tot.strip())
-                    tot = '--> '
-            print(tot)
-
-            print('\nFor No-Ring, Available Group Names are:')
-            tot = '--> '
-            for i in pro_data_ljr_noring:
-                line = ''
-                for j in i[0]: line += j + '   '
-                line = '{ ' + line.strip() + ' }'
-
-                tot += line + '    '
-                if len(tot) > 54:
-                    print(tot.strip())
-                    tot = '--> '
-            print(tot)
+        if args.avail_group_name: func_show_groups()
 
         if args.sample or args.template:
             if not args.CCl and not args.CCG: args.CCl = True
@@ -1101,200 +5062,49 @@ def main():
             if args.CCG: func_show_template(TEMPLATE_CCG,file=True)
         
         exit()
-    elif not os.path.isfile(args.file):
-        print('Error: wrong input file < {:} >'.format(args.file))
-        exit()
-    
-    # process input file, at the same time get their molecular weight
-    log, fdict = func_profile(args.file)
-    if not log['nice']:
-        print(log['info'])
-        exit()
-
-    if fdict['type'] == 'purity':
-        if 'm' not in fdict:
-            log, m = func_calc_M(fdict['s'])
-            if log['nice']:
-                fdict['m'] = m
-            else:
-                print(log['info'])
-                exit()
-        table = []
-        if 'ring' in fdict:
-            for sym, nm in fdict['ring'].items():
-                bo = True
-                for ref in pro_data_ljr_ring:
-                    if sym in [i.lower() for i in ref[0]]:
-                        # Note: make a copy!!
-                        table.append( ref[1][:] + [nm,] )
-                        bo = False
-                        break
-                if bo:
-                    raise ValueError('Error: for ring, symbol < {:} > is not defined'.format(sym))
-        if 'no-ring' in fdict:
-            for sym, nm in fdict['no-ring'].items():
-                bo = True
-                for ref in pro_data_ljr_noring:
-                    if sym in [i.lower() for i in ref[0]]:
-                        # Note: make a copy!!
-                        table.append( ref[1][:] + [nm,] )
-                        bo = False
-                        break
-                if bo:
-                    raise ValueError('Error: for no-ring, symbol < {:} > is not defined'.format(sym))
-        fdict['table'] = table
-
-    else:
-        if 'm1' not in fdict:
-            log, m1 = func_calc_M(fdict['s1'])
-            if log['nice']:
-                fdict['m1'] = m1
-            else:
-                print(log['info'])
-                exit()
-        if 'm2' not in fdict:
-            log, m2 = func_calc_M(fdict['s2'])
-            if log['nice']:
-                fdict['m2'] = m2
-            else:
-                print(log['info'])
-                exit()
-
-        #[    [ [ allNames ], [ deltaTbM    deltaTM    deltaPM   deltaVM ] ],    ]
-        table1 = []
-        if 'ring-1' in fdict:
-            for sym, nm in fdict['ring-1'].items():
-                bo = True
-                for ref in pro_data_ljr_ring:
-                    if sym in [i.lower() for i in ref[0]]:
-                        # Note: make a copy!!
-                        table1.append( ref[1][:] + [nm,] )
-                        bo = False
-                        break
-                if bo:
-                    raise ValueError('Error: for ring, symbol < {:} > is not defined'.format(sym))
-        if 'no-ring-1' in fdict:
-            for sym, nm in fdict['no-ring-1'].items():
-                bo = True
-                for ref in pro_data_ljr_noring:
-                    if sym in [i.lower() for i in ref[0]]:
-                        # Note: make a copy!!
-                        table1.append( ref[1][:] + [nm,] )
-                        bo = False
-                        break
-                if bo:
-                    raise ValueError('Error: for no-ring, symbol < {:} > is not defined'.format(sym))
-        table2 = []
-        if 'ring-2' in fdict:
-            for sym, nm in fdict['ring-2'].items():
-                bo = True
-                for ref in pro_data_ljr_ring:
-                    if sym in [i.lower() for i in ref[0]]:
-                        # Note: make a copy!!
-                        table2.append( ref[1][:] + [nm,] )
-                        bo = False
-                        break
-                if bo:
-                    raise ValueError('Error: for ring, symbol < {:} > is not defined'.format(sym))
-        if 'no-ring-2' in fdict:
-            for sym, nm in fdict['no-ring-2'].items():
-                bo = True
-                for ref in pro_data_ljr_noring:
-                    if sym in [i.lower() for i in ref[0]]:
-                        # Note: make a copy!!
-                        table2.append( ref[1][:] + [nm,] )
-                        bo = False
-                        break
-                if bo:
-                    raise ValueError('Error: for no-ring, symbol < {:} > is not defined'.format(sym))
-        fdict['table1'] = table1
-        fdict['table2'] = table2
-
-
-    rst = MLJR(**fdict)
 
-    if rst.log['nice']:
-        rst.run()
-    else:
-        print(rst.log['info'])
+    files = func_pro_files(args.file)
+    if len(args.file) == 1 and files == args.file:
+        # samples of one file are split across processes
+        if uncertainty is not None and args.jobs is not None: uncertainty['workers'] = args.jobs
+        # results are appended after the whole file is read, otherwise they are printed one by one
+        fout = None if args.output else sys.stdout
+        log, info = func_calc_file(files[0], args.calc, sweep_y1, args.cache, args.solve, uncertainty, fout)
+        with func_timed('output', 'write'):
+            if args.output and info:
+                with open(files[0], 'a+') as f: f.write(info)
+        if not log['nice']: print(log['info'])
         exit()
 
-    bo_calc_st = True
-    bo_calc_dy = True
-    if args.calc is not None:
-        if len(args.calc) == 1:
-            t = args.calc[0]
-            bo_calc_st = False
-        else:
-            t_ref = args.calc[0]
-            q_ref = args.calc[1]
-            t = args.calc[2]
-    elif 't-ref' in fdict:
-        t_ref = fdict['t-ref']
-        if 'q-ref' in fdict and 't' in fdict:
-            q_ref = fdict['q-ref']
-            t = fdict['t']
-        else:
-            bo_calc_st = False
-    else:
-        bo_calc_st = False
-        bo_calc_dy = False
-
-    info = '\n\n'
-    if rst.type == 'purity':
-        info += '# For calculation type < purity >\n'
-        info += '# Molecular weight                   m = < {:} >\n\n'.format(round(rst.m,4))
-        info += '# Critical temperature (K):          Tc = < {:} >\n'.format(round(rst.Tc,4))
-        info += '# Critical pressure (bar):           Pc = < {:} >\n'.format(round(rst.Pc,4))
-        info += '# Critical molar volume (cm^3/mol):  Vc = < {:} >\n'.format(round(rst.Vc,4))
-        info += '# Boiling temperature (K):           Tb = < {:} >\n'.format(round(rst.Tb,4))
-        info += '# Acentric factor:                   w  = < {:} >\n\n'.format(round(rst.w,4))
-        if bo_calc_dy:
-            den = func_calc_density(rst.m,t,rst.Tc,rst.Pc,rst.Vc,rst.Tb)
-            info += '# Density at ({:}):           d  = < {:} >\n\n'.format(round(t,2),round(den,4))
-        if bo_calc_st:
-            st = func_calc_st(t,q_ref,t_ref,rst.Tc)
-            info += '# Surf. Ten. at ({:}):       st  = < {:} >\n\n'.format(round(t,2),round(st,4))
-    else:
-        info += '# For calculation type < mixture >\n'
-        info += '# Molar ratio: ( m1 : m2 ) = < {:} : {:} >\n'.format(round(rst.y1,4),round(rst.y2,4))
-        info += '# Total Molecular weight:   m = < {:} >\n\n\n'.format(round(rst.m,4))
-
-        info += '# Molecular weight                 m1  = < {:} >\n'.format(round(rst.m1,4))
-        info += '# Molar ratio:                     y1  = < {:} >\n'.format(round(rst.y1,4))
-        info += '# Critical temperature (K):        Tc1 = < {:} >\n'.format(round(rst.Tc1,4))
-        info += '# Critical pressure (bar):         Pc1 = < {:} >\n'.format(round(rst.Pc1,4))
-        info += '# Critical molar volume (mL/mol):  Vc1 = < {:} >\n'.format(round(rst.Vc1,4))
-        info += '# Boiling temperature (K):         Tb1 = < {:} >\n'.format(round(rst.Tb1,4))
-        info += '# Acentric factor:                 w1  = < {:} >\n\n'.format(round(rst.w1,4))
-
-        info += '# Molecular weight                 m2  = < {:} >\n'.format(round(rst.m2,4))
-        info += '# Molar ratio:                     y2  = < {:} >\n'.format(round(rst.y2,4))
-        info += '# Critical temperature (K):        Tc2 = < {:} >\n'.format(round(rst.Tc2,4))
-        info += '# Critical pressure (bar):         Pc2 = < {:} >\n'.format(round(rst.Pc2,4))
-        info += '# Critical molar volume (mL/mol):  Vc2 = < {:} >\n'.format(round(rst.Vc2,4))
-        info += '# Boiling temperature (K):         Tb2 = < {:} >\n'.format(round(rst.Tb2,4))
-        info += '# Acentric factor:                 w2  = < {:} >\n\n\n'.format(round(rst.w2,4))
+    if len(files) == 0:
+        print('Error: no input files are found')
+        exit()
+    if args.jobs is None: args.jobs = 1
+    if args.jobs < 0:
+        print('Error: the number of jobs has to be no less than 0')
+        exit()
 
-        info += '# Mixing Critical temperature (K):        Tcm = < {:} >\n'.format(round(rst.Tcm,4))
-        info += '# Mixing Critical pressure (bar):         Pcm = < {:} >\n'.format(round(rst.Pcm,4))
-        info += '# Mixing Critical molar volume (mL/mol):  Vcm = < {:} >\n'.format(round(rst.Vcm,4))
-        info += '# Mixing Boiling temperature (K):         Tbm = < {:} >\n'.format(round(rst.Tbm,4))
-        info += '# Mixing Acentric factor:                 wm  = < {:} >\n\n'.format(round(rst.wm,4))
+    # combined report, in the same sequence as files
+    rsts = func_calc_files(files, args.calc, sweep_y1, args.jobs, args.cache, args.solve, uncertainty)
+    errors = [r for r in rsts if not r[1]['nice']]
+    report = ''
+    with func_timed('output', 'write'):
+        for file, log, info in rsts:
+            report += '\n\n## File < {:} >\n'.format(file)
+            if args.output and info:
+                with open(file, 'a+') as f: f.write(info)
+                report += '# Note: results are appended\n'
+            else:
+                report += info.lstrip('\n')
+            if not log['nice']:
+                report += log['info'].strip() + '\n'
+        report += '\n\n# Total files: < {:} >, succeeded: < {:} >, failed: < {:} >\n'.format(
+                  len(rsts), len(rsts)-len(errors), len(errors))
+        for file, log, info in errors:
+            report += '#    < {:} > : {:}\n'.format(file, log['info'].strip().replace('\n',' '))
+        print(report,end='')
 
-        if bo_calc_dy:
-            den = func_calc_density(rst.m,t,rst.Tcm,rst.Pcm,rst.Vcm,rst.Tbm)
-            info += '# Density   at  {:} K (g/mL):    d = < {:} >\n'.format(round(t,2),round(den,4))
-        if bo_calc_st:
-            st = func_calc_st(t,q_ref,t_ref,rst.Tcm)
-            info += '# Surf. Ten. at {:} K (mN/m):   st = < {:} >\n'.format(round(t,2),round(st,4))
-            info += '# Reference: Temp. < {:} >, Surface Tension: < {:} >\n\n'.format(round(t_ref,4),round(q_ref,4))
-        
 
-    if args.output:
-        with open(args.file, 'a+') as f: f.write(info)
-    else:
-        print(info,end='')
 
 if __name__ == '__main__':
     main()
@@ -3,8 +3,17 @@
 
 import os
 from setuptools import setup
+from setuptools.command.build_py import build_py
 import mljr
-from mljr.mljr import __version__
+from mljr.mljr import __version__, func_write_snapshot
+
+
+class BuildPy(build_py):
+    """Also write the group table snapshot mljr/_tables.bin into the build"""
+    def run(self):
+        build_py.run(self)
+        if not self.dry_run:
+            func_write_snapshot(os.path.join(self.build_lib, 'mljr', '_tables.bin'))
 
 
 def read(*names):
@@ -43,12 +52,16 @@ setup(
     url='https://github.com/orlandoacevedo/mLJR',
     license='MIT',
     packages=['mljr'],
+    cmdclass={'build_py': BuildPy},
     entry_points={
         'console_scripts': [
             'mljr = mljr.mljr:main',
         ]
     },
     python_requires='>=3.5',
+    extras_require={
+        'batch': ['numpy'],
+    },
 )
 
 
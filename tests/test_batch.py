@@ -0,0 +1,73 @@
+import pytest
+
+from mljr import mljr
+
+np = pytest.importorskip('numpy')
+
+
+GROUPS = [
+    ({'no-ring':{'-CH3':3, '-CH2-':2, '-OH':1, '>N-':1, '-Cl':1}}, 139.62),
+    ({'no-ring':{'-OH':3, '-CH2-':2, '>CH-':1}}, 92.09),
+    ({'ring':{'=CH-':5, '=C<':1, '-OH':1}}, 94.11),
+]
+
+
+def fscalar(groups, M):
+    comp = mljr.Component(mljr.func_pro_counts(groups), M)
+    rst = mljr.MLJR(type='purity', table=comp)
+    return rst.run()
+
+
+def test_batch():
+    counts = mljr.func_batch_counts([g for g,M in GROUPS])
+    Tc, Pc, Vc, Tb, w = mljr.func_calc_batch(counts, [M for g,M in GROUPS])
+    for i,(groups,M) in enumerate(GROUPS):
+        rst = fscalar(groups, M)
+        for k,v in zip(['Tc','Pc','Vc','Tb','w'], [Tc,Pc,Vc,Tb,w]):
+            assert v[i] == pytest.approx(getattr(rst,k), rel=1e-12), k
+
+    # one molecule, wrong number of columns
+    assert mljr.func_calc_batch(counts[0], GROUPS[0][1])[0][0] == pytest.approx(Tc[0])
+    with pytest.raises(ValueError):
+        mljr.func_calc_batch(counts[:,:-1], [M for g,M in GROUPS])
+
+
+def test_temperatures():
+    rst = fscalar(*GROUPS[0])
+    ts = [280.0, 298.15, 320.0, 350.5]
+    args = (rst.m, rst.Tc, rst.Pc, rst.Vc, rst.Tb)
+    for T in [ts, tuple(ts), np.array(ts)]:
+        d = mljr.func_calc_density(args[0], T, *args[1:])
+        st = mljr.func_calc_st(T, 50.0, 298.15, rst.Tc)
+        assert isinstance(d, np.ndarray) and isinstance(st, np.ndarray)
+        for i,t in enumerate(ts):
+            assert d[i] == pytest.approx(mljr.func_calc_density(args[0], t, *args[1:]), rel=1e-14)
+            assert st[i] == pytest.approx(mljr.func_calc_st(t, 50.0, 298.15, rst.Tc), rel=1e-14)
+    assert isinstance(mljr.func_calc_density(args[0], 298.15, *args[1:]), float)
+
+
+def test_samples():
+    comps = [mljr.Component(mljr.func_pro_counts(g), M) for g,M in GROUPS[:2]]
+    log, S, C = mljr.func_pro_sigma({'default':[1.0, 0.001, 0.005, 2.0], 'const':{'AM':0.001}})
+    assert log['nice'], log
+    for cs, ys, keys in [(comps[:1], None, ['Tc','d','st']), (comps, [0.25, 0.75], ['Tcm','d','st'])]:
+        args = (cs, ys, S, C, 500)
+        kwargs = {'t':320.0, 't_ref':298.15, 'q_ref':50.0}
+        one = mljr.func_run_samples(*args, seed=7, **kwargs)
+        two = mljr.func_run_samples(*args, seed=7, **kwargs)
+        other = mljr.func_run_samples(*args, seed=8, **kwargs)
+        for k in keys:
+            assert one[k].shape == (500,)
+            assert np.array_equal(one[k], two[k])
+            assert not np.array_equal(one[k], other[k])
+
+        # no deviation, every sample is the plain result
+        log, S0, C0 = mljr.func_pro_sigma({})
+        zero = mljr.func_run_samples(cs, ys, S0, C0, 3, seed=7, **kwargs)
+        if ys is None:
+            rst = mljr.MLJR(type='purity', table=cs[0])
+        else:
+            rst = mljr.MLJR(type='mixture', table1=cs[0], table2=cs[1], y1=ys[0], y2=ys[1])
+        rst.run(**kwargs)
+        for k in keys:
+            assert zero[k] == pytest.approx([getattr(rst,k)]*3, rel=1e-12)
@@ -0,0 +1,85 @@
+import io
+import json
+
+import pytest
+
+from mljr import mljr
+
+
+def test_lru():
+    cache = mljr.LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    # < b > is the least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('c') == 3 and cache.get('a') == 1
+    assert cache.stats() == {'hits':3, 'misses':1, 'size':2, 'maxsize':2}
+    cache.clear()
+    assert cache.stats() == {'hits':0, 'misses':0, 'size':0, 'maxsize':2}
+
+
+@pytest.fixture
+def fcache(monkeypatch):
+    monkeypatch.setattr(mljr.MLJR, 'cache', mljr.LRUCache(maxsize=2))
+    return mljr.MLJR.cache
+
+
+def fcomponent(smiles):
+    log, m, comp = mljr.func_pro_component(mljr.func_pro_spec({'smiles':smiles}))
+    return comp
+
+
+def test_component(fcache, monkeypatch):
+    comps = [fcomponent(s) for s in ['OCC(O)CO', 'CCO', 'NC(N)=O']]
+    rst = mljr.MLJR(type='mixture', table1=comps[0], table2=comps[1])
+    first = rst.run().Tcm
+    # same group signature, e.g. another Component with the same groups
+    same = mljr.Component(comps[0].counts, comps[0].M)
+    assert mljr.MLJR(type='purity', table=same).run().Tc == rst.Tc1
+    assert fcache.stats() == {'hits':1, 'misses':2, 'size':2, 'maxsize':2}
+
+    # least recently used is evicted, it is then calculated again
+    mljr.MLJR(type='purity', table=comps[2]).run().Tc
+    mljr.MLJR(type='purity', table=comps[1]).run().Tc
+    assert fcache.stats() == {'hits':1, 'misses':4, 'size':2, 'maxsize':2}
+
+    # constants are in the key
+    am = mljr.MLJR.CONST_AM
+    monkeypatch.setattr(mljr.MLJR, 'CONST_AM', am + 0.01)
+    assert mljr.MLJR(type='purity', table=comps[1]).run().Tc != rst.Tc2
+    monkeypatch.setattr(mljr.MLJR, 'CONST_AM', am)
+    assert fcache.stats()['misses'] == 5
+    assert mljr.MLJR(type='mixture', table1=comps[0], table2=comps[1]).run().Tcm == first
+
+
+def fjsonl(line, cache):
+    fout = io.StringIO()
+    mljr.func_calc_jsonl(io.StringIO(line), fout, cache=cache)
+    return json.loads(fout.getvalue())
+
+
+def test_result_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'results.sqlite')
+    line = '{"type": "purity", "smiles": "OCC(O)CO", "t": 298.15}\n'
+    first = fjsonl(line, path)
+    cache = mljr._RESULT_CACHES[path]
+    assert fjsonl(line, path) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # results of other constants are dropped, also from the file
+    version = mljr.func_data_version()
+    monkeypatch.setattr(mljr.MLJR, 'CONST_AM', mljr.MLJR.CONST_AM + 0.01)
+    assert mljr.func_data_version() != version
+    other = fjsonl(line, path)
+    assert other['Tc'] != pytest.approx(first['Tc'])
+    reopened = mljr._RESULT_CACHES[path]
+    assert reopened is not cache
+    assert (reopened.hits, reopened.misses) == (0, 1)
+    assert reopened.conn.execute('SELECT COUNT(*) FROM results').fetchone()[0] == 1
+
+    monkeypatch.undo()
+    assert mljr.func_data_version() == version
+    assert fjsonl(line, path) == first
+    mljr._RESULT_CACHES.pop(path).close()
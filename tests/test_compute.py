@@ -0,0 +1,63 @@
+import pytest
+
+from mljr import mljr
+
+
+@pytest.fixture
+def fzero(monkeypatch):
+    """Constants so that Tc of ethylene glycol is divided by zero"""
+    log, m, comp = mljr.func_pro_component(mljr.func_pro_spec({'smiles':'OCCO'}))
+    STM = comp.sums[1]
+    monkeypatch.setattr(mljr.MLJR, 'CONST_AM', STM*STM - mljr.MLJR.CONST_BM*STM)
+
+
+def test_compute():
+    r = mljr.compute(mljr.TEMPLATE_CCL, calc=[298.15])
+    assert r.Tc == pytest.approx(622.9702737841661)
+    assert r['d'] == pytest.approx(1.0362279489164112)
+
+
+def test_input_error():
+    with pytest.raises(mljr.InputError):
+        mljr.compute({'smiles':'CX'})
+
+
+def test_calculation_error(fzero):
+    with pytest.raises(mljr.CalculationError):
+        mljr.compute({'smiles':'OCCO'})
+    with pytest.raises(mljr.CalculationError):
+        mljr.compute({'smiles':'OCCO'}, calc=[298.15])
+
+
+MANY = [{'smiles':'NC(N)=O'}, {'smiles':'CCO'}, {'type':'mixture', 'smiles1':'OCCO', 'smiles2':'CCO'}]
+
+
+def test_compute_many(fzero):
+    results = mljr.compute_many(MANY, return_exceptions=True)
+    assert results[0]['Tc'] == pytest.approx(mljr.compute(MANY[0])['Tc'])
+    assert results[1]['Tc'] == pytest.approx(mljr.compute(MANY[1])['Tc'])
+    assert isinstance(results[2], mljr.CalculationError)
+    with pytest.raises(mljr.CalculationError):
+        mljr.compute_many(MANY)
+
+
+def test_acompute(fzero):
+    asyncio = pytest.importorskip('asyncio')
+    async def fmain():
+        return await asyncio.gather(*[mljr.acompute(s) for s in MANY], return_exceptions=True)
+    results = asyncio.run(fmain())
+    assert results[0]['Tc'] == pytest.approx(mljr.compute(MANY[0])['Tc'])
+    assert results[1]['Tc'] == pytest.approx(mljr.compute(MANY[1])['Tc'])
+    assert isinstance(results[2], mljr.CalculationError)
+
+
+def test_compute_many_unexpected(monkeypatch):
+    # errors which are not MLJRError only fail their own system
+    run = mljr.func_run_spec
+    def frun(fdict, calc=None):
+        if fdict['type'] == 'mixture': raise ZeroDivisionError('float division by zero')
+        return run(fdict, calc)
+    monkeypatch.setattr(mljr, 'func_run_spec', frun)
+    results = mljr.compute_many(MANY, return_exceptions=True)
+    assert results[0]['Tc'] == pytest.approx(mljr.compute(MANY[0])['Tc'])
+    assert isinstance(results[2], mljr.CalculationError)
@@ -0,0 +1,68 @@
+import copy
+import json
+
+import pytest
+
+from mljr import mljr
+
+
+@pytest.fixture
+def fdata(monkeypatch):
+    """Group contributions and constants are restored after the test"""
+    for k in ['DATA_LJR_NO_RING', 'DATA_LJR_RING']:
+        monkeypatch.setattr(mljr, k, copy.deepcopy(getattr(mljr,k)))
+    for k in ['CONST_AM', 'CONST_BM', 'CONST_CM', 'CONST_EM']:
+        monkeypatch.setattr(mljr.MLJR, k, getattr(mljr.MLJR,k))
+    mljr.func_group_tables(rebuild=True)
+    yield
+    monkeypatch.undo()
+    mljr.func_group_tables(rebuild=True)
+    mljr.MLJR.cache.clear()
+
+
+def test_main_fit(tmp_path, capsys):
+    pytest.importorskip('numpy')
+    rows = []
+    for s in ['C[N+](C)(C)CCO.[Cl-]', 'CC[NH3+].[Cl-]', 'OCC(O)CO']:
+        r = mljr.compute({'smiles':s})
+        rows.append({'type':'purity', 'smiles':s, 'exp':{'Tc':r.Tc*1.01}})
+    dataset = tmp_path / 'dataset.jsonl'
+    dataset.write_text('\n'.join([json.dumps(r) for r in rows]) + '\n')
+    output = tmp_path / 'fit.json'
+
+    # symbols starting with '-' and options in the form of --key=value
+    mljr.func_main_fit([str(dataset), '-g', '-Cl', '-OH', '--maxiter=5', '-c', 'T', '-o', str(output)])
+    fit = json.loads(output.read_text())
+    assert sorted(fit['no-ring']) == ['-Cl', '-OH']
+    mljr.func_main_fit(['--groups=-Cl', '-c', 'T', '-o', str(output), '--', str(dataset)])
+    assert sorted(json.loads(output.read_text())['no-ring']) == ['-Cl']
+
+    # unknown options and missing dataset are errors, instead of being taken as groups
+    with pytest.raises(SystemExit):
+        mljr.func_main_fit([str(dataset), '-g', '-Cl', '--maxiters=5'])
+    capsys.readouterr()
+    with pytest.raises(SystemExit):
+        mljr.func_main_fit([str(dataset), str(tmp_path / 'missing.jsonl'), '-g', '-Cl'])
+    assert 'missing.jsonl' in capsys.readouterr().out
+
+
+def test_apply_fit(fdata):
+    version = mljr.func_data_version()
+    r = mljr.compute({'smiles':'CCO'})
+    assert mljr.MLJR.cache.stats()['size'] > 0
+    row = list(mljr.DATA_LJR_NO_RING[0])
+
+    # nothing is applied when any value is wrong
+    for fit in [{'no-ring':{'-CH3':[1.0, float('nan'), 0.3, 66.0]}},
+                {'no-ring':{'-CH3':[1.0, 0.02, 0.3, 66.0]}, 'const':{'AM':float('inf')}},
+                {'no-ring':{'-CH3':[1.0, 0.02, 0.3, 66.0]}, 'const':{'BM':'abc'}}]:
+        with pytest.raises(ValueError):
+            mljr.func_apply_fit(fit)
+        assert mljr.DATA_LJR_NO_RING[0] == row
+        assert mljr.func_data_version() == version
+    assert mljr.compute({'smiles':'CCO'}).Tc == r.Tc
+
+    mljr.func_apply_fit({'no-ring':{'-CH3':[row[1], row[2]*1.1, row[3], row[4]]}})
+    assert mljr.MLJR.cache.stats()['size'] == 0
+    assert mljr.func_data_version() != version
+    assert mljr.compute({'smiles':'CCO'}).Tc != pytest.approx(r.Tc)
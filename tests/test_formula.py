@@ -0,0 +1,41 @@
+import warnings
+
+import pytest
+
+from mljr import mljr
+
+
+# molecular weights of the case-insensitive notation before standard notation was added
+@pytest.mark.parametrize('S, M', [
+    ('Co2', 44.01),
+    ('Sn', 46.07),
+    ('SiO2', 190.96),
+    ('Cs2', 76.13),
+    ('CCl', 47.46),
+    ('C5H14NO Cl', 139.622),
+    ('C2 - H3 - O4 - N5', 161.094),
+])
+def test_legacy(S, M):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        log, m = mljr.func_calc_M(S)
+    assert log['nice'], log
+    assert m == pytest.approx(M)
+
+
+def test_standard():
+    # only used when case-insensitive notation fails
+    log, m = mljr.func_calc_M('NaCl')
+    assert log['nice'], log
+    assert m == pytest.approx(58.44)
+    assert not mljr.func_calc_M('Xy')[0]['nice']
+
+
+def test_warning():
+    mljr._FORMULA_CACHE.clear()
+    with pytest.warns(UserWarning, match='Co2'):
+        mljr.func_calc_M('Co2')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        mljr.func_calc_M('CO2')
+        mljr.func_calc_M('C5H14NO Cl')
@@ -0,0 +1,59 @@
+import warnings
+
+import pytest
+
+from mljr import mljr
+
+
+def test_index():
+    # same entry as the first one found by a linear scan, case-insensitive
+    for key, data in [('no-ring',mljr.DATA_LJR_NO_RING), ('ring',mljr.DATA_LJR_RING)]:
+        table = mljr.func_group_tables()[key]
+        for entry in table:
+            for name in entry[0]:
+                first = [i for i,e in enumerate(table) if name.lower() in [n.lower() for n in e[0]]][0]
+                assert table.lookup(name) == first
+                assert table.lookup(name.upper()) == first
+        assert table.lookup('not-a-group') is None
+    assert mljr.func_group_tables()['no-ring'].lookup('METHYL') == 0
+
+
+def test_duplicates():
+    data = [['-CH3', 23.58, 0.0275, 0.3031, 66.81, 'methyl'], ['-CH2-', 22.88, 0.0159, 0.2165, 57.11, 'Methyl']]
+    with pytest.warns(UserWarning, match='Methyl'):
+        table = mljr.func_proDATA(data)
+    assert table.duplicates == [('Methyl', 0, 1)]
+    assert table.lookup('methyl') == 0
+    assert table.get_table({'methyl':2}, 'no-ring') == [[23.58, 0.0275, 0.3031, 66.81, 2]]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        mljr.func_proDATA(data[:1])
+    with pytest.raises(ValueError):
+        mljr.func_proDATA([['-CH3', 23.58, 'x', 0.3031, 66.81]])
+
+
+@pytest.mark.parametrize('groups', [
+    {'no-ring':{'-CH3':3, '-CH2-':2, '-OH':1, '>N-':1, '-Cl':1}},
+    {'ring':{'=CH-':5, '=C<':1}, 'no-ring':{'-OH':1}},
+    {'no-ring':{'HCOO-':1, '-CH3':1}},
+])
+def test_component(groups):
+    counts = mljr.func_pro_counts(groups)
+    comp = mljr.Component(list(counts), 100.0)
+    assert comp.counts.typecode == 'i' and comp.counts == counts
+
+    # same sums as the 2D tables of each group
+    tables = mljr.func_group_tables()
+    rows = [r for k,v in groups.items() for r in tables[k].get_table(v, k)]
+    for k in range(4):
+        if any([r[k] is None for r in rows]):
+            assert comp.sums[k] is None
+        else:
+            assert comp.sums[k] == pytest.approx(sum([r[k]*r[4] for r in rows]), rel=1e-14)
+    if None not in comp.sums:
+        rst = mljr.MLJR(type='purity', table=rows, m=100.0).run()
+        assert mljr.MLJR(type='purity', table=comp).run().Tc == pytest.approx(rst.Tc, rel=1e-14)
+
+    with pytest.raises(ValueError):
+        mljr.Component(list(counts)[:-1], 100.0)
@@ -0,0 +1,58 @@
+import math
+
+import pytest
+
+from mljr import mljr
+
+
+def fcomponent(smiles):
+    log, m, comp = mljr.func_pro_component(mljr.func_pro_spec({'smiles':smiles}))
+    assert log['nice'], log
+    return comp
+
+
+def fexplicit(crits, ys, t):
+    """Mixing rules written out term by term"""
+    n = len(crits)
+    Vcm = Tcm = 0.0
+    for i in range(n):
+        for j in range(n):
+            Vcij = pow(pow(crits[i].Vc,1/3) + pow(crits[j].Vc,1/3), 3) / 8
+            Vcm += ys[i]*ys[j]*Vcij
+            Tcm += ys[i]*ys[j]*pow(Vcij,1/4)*math.sqrt(crits[i].Tc*crits[j].Tc)
+    Tcm /= pow(Vcm,1/4)
+    m = sum([y*c.m for y,c in zip(ys,crits)])
+    # acentric factors use critical pressures with molecular weight of the mixture
+    wm = sum([y*c.func_calc_w(c.Tb, c.Tc, c.Pc*m/c.m) for y,c in zip(ys,crits)])
+    Pcm = (0.2905 - 0.085*wm) * 8.314 * Tcm / Vcm * 10
+    Tbm = sum([y*c.Tb for y,c in zip(ys,crits)])
+    d = mljr.func_calc_density(m, t, Tcm, Pcm, Vcm, Tbm)
+    return {'m':m, 'Vcm':Vcm, 'Tcm':Tcm, 'wm':wm, 'Pcm':Pcm, 'Tbm':Tbm, 'd':d}
+
+
+@pytest.mark.parametrize('smiles, ys', [
+    (['C[N+](C)(C)CCO.[Cl-]', 'OCC(O)CO'], [0.25, 0.75]),
+    (['C[N+](C)(C)CCO.[Cl-]', 'OCC(O)CO', 'CCO'], [0.2, 0.5, 0.3]),
+    (['CC[NH3+].[Cl-]', 'NC(N)=O', 'OCCO', 'CC(N)=O'], [0.4, 0.3, 0.2, 0.1]),
+])
+def test_mixture(smiles, ys):
+    comps = [fcomponent(s) for s in smiles]
+    kwargs = dict([('table{:}'.format(i+1),c) for i,c in enumerate(comps)])
+    kwargs.update([('y{:}'.format(i+1),y) for i,y in enumerate(ys)])
+    rst = mljr.MLJR(type='mixture', **kwargs)
+    rst.run(320.0)
+
+    crits = []
+    for c in comps:
+        one = mljr.MLJR(type='purity', table=c)
+        one.run()
+        crits.append(one)
+    for k,v in fexplicit(crits, ys, 320.0).items():
+        assert getattr(rst,k) == pytest.approx(v, rel=1e-12), k
+    for i,c in enumerate(crits):
+        assert getattr(rst,'Tc{:}'.format(i+1)) == c.Tc
+
+    # same as defined in one system
+    spec = {'type':'mixture', 'ratio':' : '.join([str(y) for y in ys])}
+    spec.update([('smiles{:}'.format(i+1),s) for i,s in enumerate(smiles)])
+    assert mljr.compute(spec)['Tcm'] == pytest.approx(rst.Tcm, rel=1e-12)
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from mljr import mljr
+
+np = pytest.importorskip('numpy')
+
+
+def fcomponent(smiles):
+    log, m, comp = mljr.func_pro_component(mljr.func_pro_spec({'smiles':smiles}))
+    assert log['nice'], log
+    return comp
+
+
+@pytest.mark.parametrize('smiles, ys', [
+    (['C[N+](C)(C)CCO.[Cl-]'], None),
+    (['C[N+](C)(C)CCO.[Cl-]', 'OCC(O)CO'], [1/3, 2/3]),
+])
+def test_gradients(smiles, ys, monkeypatch):
+    comps = [fcomponent(s) for s in smiles]
+    t, t_ref, q_ref = 320.0, 298.15, 50.0
+    names, values, jac = mljr.func_calc_gradients(comps, ys, t, t_ref, q_ref)
+
+    def fvalues(ys=ys, t=t):
+        return mljr.func_calc_gradients(comps, ys, t, t_ref, q_ref)[1]
+
+    # central finite differences
+    h = 1e-6
+    checks = [('T', lambda e: fvalues(t=t+e))]
+    if ys is not None:
+        checks.append(('y1', lambda e: fvalues(ys=[ys[0]+e, ys[1]-e])))
+    for k in ['CONST_AM', 'CONST_BM', 'CONST_CM', 'CONST_EM']:
+        def fconst(e, k=k, v=getattr(mljr.MLJR,k)):
+            monkeypatch.setattr(mljr.MLJR, k, v+e)
+            try:
+                return fvalues()
+            finally:
+                monkeypatch.setattr(mljr.MLJR, k, v)
+        checks.append((k, fconst))
+    for name, func in checks:
+        up, down = func(h), func(-h)
+        for out in values:
+            fd = (float(up[out]) - float(down[out])) / (2*h)
+            assert float(jac[out][names.index(name)]) == pytest.approx(fd, rel=1e-5, abs=1e-6), (name, out)
+
+    # boiling temperature is linear in group counts
+    out = 'Tb' if ys is None else 'Tbm'
+    col = names.index('no-ring:-CH3' if ys is None else 'no-ring-1:-CH3')
+    offsets, rows = mljr.func_group_columns()
+    dTb = rows[col][0] if ys is None else rows[col][0] * ys[0]
+    assert float(jac[out][col]) == pytest.approx(dTb)
+
+
+def test_fit(tmp_path, monkeypatch):
+    smiles = ['C[N+](C)(C)CCO.[Cl-]', 'CC[NH3+].[Cl-]', 'OCC(O)CO', 'NC(N)=O', 'CCO', 'CN(C)C']
+    # measured values are made by known constants
+    target = {'AM':0.5802, 'BM':1.0050}
+    monkeypatch.setattr(mljr.MLJR, 'CONST_AM', target['AM'])
+    monkeypatch.setattr(mljr.MLJR, 'CONST_BM', target['BM'])
+    rows = []
+    for s in smiles:
+        r = mljr.compute({'smiles':s}, calc=[298.15])
+        rows.append({'type':'purity', 'smiles':s, 't-ref':298.15, 't':298.15, 'exp':{'Tc':r.Tc, 'd':r.d}})
+    monkeypatch.undo()
+
+    path = tmp_path / 'dataset.jsonl'
+    path.write_text('\n'.join([json.dumps(r) for r in rows]) + '\n')
+    systems, errors = mljr.func_pro_dataset([str(path)])
+    assert errors == []
+    fit = mljr.func_calc_fit(systems, [], ['AM','BM'])
+    assert fit['rms0'] > 1e-3
+    assert fit['rms'] < 1e-8
+    for k,v in target.items():
+        assert fit['fit']['const'][k] == pytest.approx(v, rel=1e-6)
+
+
+def test_sweep_solve():
+    rst = mljr.MLJR(type='mixture', table1=fcomponent('C[N+](C)(C)CCO.[Cl-]'), table2=fcomponent('OCC(O)CO'))
+    y1 = np.array([0.1, 1/3, 0.5, 0.8])
+    sweep = rst.sweep(y1)
+
+    # sweep is the same as run for each ratio
+    for n,y in enumerate(y1):
+        one = mljr.MLJR(type='mixture', table1=rst.table1, table2=rst.table2, y1=y, y2=1-y)
+        one.run()
+        for k in ['m', 'Vcm', 'Tcm', 'wm', 'Pcm', 'Tbm']:
+            assert sweep[k][n] == pytest.approx(getattr(one,k), rel=1e-12)
+
+    # solve finds the ratios back
+    t = 320.0
+    d = mljr.func_calc_density(sweep['m'], t, sweep['Tcm'], sweep['Pcm'], sweep['Vcm'], sweep['Tbm'])
+    assert rst.solve(d, t) == pytest.approx(y1, abs=1e-8)
+    st = mljr.func_calc_st(t, 50.0, 298.15, sweep['Tcm'])
+    assert rst.solve(st, t, 'st', 298.15, 50.0) == pytest.approx(y1, abs=1e-8)
+    assert np.isnan(rst.solve([100.0], t)[0])
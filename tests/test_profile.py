@@ -0,0 +1,44 @@
+import os
+import sys
+import subprocess
+
+from mljr import mljr
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, 'samples', 'ethylammonium-chloride-urea.txt')
+
+
+def test_profiler():
+    events = []
+    profiler = mljr.Profiler()
+    mljr.add_profile_hook(profiler)
+    mljr.add_profile_hook(events.append)
+    try:
+        log, info = mljr.func_calc_file(SAMPLE, [298.15])
+    finally:
+        mljr.remove_profile_hook(profiler)
+        mljr.remove_profile_hook(events.append)
+    assert log['nice'], log
+
+    report = profiler.report()
+    for k in ['file', 'formula', 'groups', 'run', 'property', 'output']:
+        assert report[k]['calls'] == len([e for e in events if e['stage'] == k]) > 0, k
+        assert 0.0 <= report[k]['time'] <= report['total']['time']
+        assert report[k]['mean'] == report[k]['time'] / report[k]['calls']
+    assert list(report) == [k for k in mljr.PROFILE_STAGES if k in report] + ['total']
+    assert all([e['start'] >= profiler.beg for e in events])
+
+    # no event without hooks
+    n = len(events)
+    mljr.func_calc_file(SAMPLE, [298.15])
+    assert len(events) == n
+
+
+def test_cli():
+    out = subprocess.run([sys.executable, '-m', 'mljr', '-f', SAMPLE, '--profile'], cwd=ROOT,
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    assert b'Tcm' in out.stdout
+    stages = [i.split()[0] for i in out.stderr.decode().splitlines() if not i.startswith('#')]
+    assert stages[0] == 'argparse' and stages[-1] == 'total'
+    assert 'run' in stages
@@ -0,0 +1,98 @@
+import io
+import json
+
+import pytest
+
+from mljr import mljr
+
+
+RECORDS = '''type : purity
+smiles : C[N+](C)(C)CCO.[Cl-]
+---
+# group which does not exist
+type : purity
+smiles : CX
+---
+type : purity
+smiles : OCC(O)CO
+'''
+
+
+def test_calc_file(tmp_path, monkeypatch):
+    path = tmp_path / 'records.txt'
+    path.write_text(RECORDS)
+
+    # each system is written as soon as it is calculated
+    fout = io.StringIO()
+    calc = mljr.func_calc_fdict
+    def fcalc(fdict, *args):
+        written.append(fout.getvalue())
+        return calc(fdict, *args)
+    written = []
+    monkeypatch.setattr(mljr, 'func_calc_fdict', fcalc)
+    log, info = mljr.func_calc_file(str(path), fout=fout)
+    assert info == ''
+    assert written[:2] == ['', '']
+    assert '## System in line < 1 >' in written[2]
+    assert '## System in line < 5 >' in written[2]
+    assert not log['nice']
+    assert 'in line < 5 >' in log['info']
+    assert '< 1 > of < 3 >' in log['info']
+
+    # the bad record does not abort the others
+    report = fout.getvalue()
+    assert report == mljr.func_calc_file(str(path))[1]
+    assert report.count('## System in line') == 3
+    heads = report.split('## System in line')[1:]
+    assert heads[0].startswith(' < 1 >') and 'Tc' in heads[0]
+    assert heads[1].startswith(' < 5 >\n# Error: for SMILES < CX >')
+    assert heads[2].startswith(' < 8 >') and 'Tc' in heads[2]
+
+
+def test_calc_file_one(tmp_path):
+    path = tmp_path / 'one.txt'
+    path.write_text(RECORDS.split('---')[0])
+    log, info = mljr.func_calc_file(str(path))
+    assert log['nice']
+    assert '## System in line' not in info
+    fout = io.StringIO()
+    assert mljr.func_calc_file(str(path), fout=fout) == (log, '')
+    assert fout.getvalue() == info
+
+
+def test_calc_files(tmp_path):
+    # a long file first, thus the short ones are done earlier by other workers
+    files = []
+    for n,smiles in enumerate(['C[N+](C)(C)CCO.[Cl-]', 'OCC(O)CO', 'CX', 'NC(N)=O']):
+        path = tmp_path / 'system-{:}.txt'.format(n)
+        path.write_text('---\n'.join(['type : purity\nsmiles : {:}\n'.format(smiles)] * (40 if n == 0 else 1)))
+        files.append(str(path))
+    files.append(str(tmp_path / 'missing.txt'))
+
+    serial = mljr.func_calc_files(files, workers=1)
+    parallel = mljr.func_calc_files(files, workers=2)
+    assert [r[0] for r in parallel] == files
+    assert parallel == serial
+    assert [r[1]['nice'] for r in parallel] == [True, True, False, True, False]
+    assert parallel[1][2] == mljr.func_calc_file(files[1])[1]
+
+
+def test_calc_jsonl():
+    lines = [
+        '{"type": "purity", "smiles": "OCC(O)CO", "id": "glycerol"}',
+        '{"type": "purity", "smiles": "CX", "id": 2}',
+        'not json',
+        '[{"type": "purity", "smiles": "NC(N)=O"}, {"type": "mixture"}]',
+        '{"type": "purity", "smiles": "CCO"}',
+    ]
+    fout = io.StringIO()
+    assert mljr.func_calc_jsonl(io.StringIO('\n'.join(lines) + '\n'), fout) == (5, 3)
+    rsts = [json.loads(i) for i in fout.getvalue().splitlines()]
+    assert len(rsts) == 5
+    assert rsts[0]['id'] == 'glycerol'
+    assert rsts[0]['Tc'] == pytest.approx(mljr.compute({'smiles':'OCC(O)CO'})['Tc'])
+    assert rsts[1]['line'] == 2 and rsts[1]['id'] == 2 and 'CX' in rsts[1]['error']
+    assert rsts[2]['line'] == 3 and 'error' in rsts[2]
+    assert rsts[3][0]['Tc'] == pytest.approx(mljr.compute({'smiles':'NC(N)=O'})['Tc'])
+    assert rsts[3][1]['line'] == 4 and 'error' in rsts[3][1]
+    assert rsts[4]['Tc'] == pytest.approx(mljr.compute({'smiles':'CCO'})['Tc'])
@@ -0,0 +1,56 @@
+import pytest
+
+from mljr import mljr
+
+np = pytest.importorskip('numpy')
+
+
+def fcomponent(smiles):
+    log, m, comp = mljr.func_pro_component(mljr.func_pro_spec({'smiles':smiles}))
+    comp.name = smiles
+    return comp
+
+
+HBA = ['C[N+](C)(C)CCO.[Cl-]', 'CC[NH3+].[Cl-]', 'CC[N+](C)(C)CCO.[Cl-]']
+HBD = ['OCC(O)CO', 'NC(N)=O', 'OCCO', 'CC(N)=O']
+Y1 = [0.2, 1/3, 0.5]
+
+
+def fbrute(objective, t, order):
+    """All results of the cross product, sorted"""
+    rows = []
+    for a in HBA:
+        for b in HBD:
+            for y in Y1:
+                rst = mljr.MLJR(type='mixture', table1=fcomponent(a), table2=fcomponent(b), y1=y, y2=1-y)
+                rst.run(t)
+                rows.append((getattr(rst,objective), a, b, y))
+    return sorted(rows, key=lambda x: x[0], reverse=(order == 'max'))
+
+
+@pytest.mark.parametrize('objective, order', [('d','max'), ('d','min'), ('Tcm','max')])
+def test_screen(objective, order):
+    hba = [fcomponent(s) for s in HBA]
+    hbd = [fcomponent(s) for s in HBD]
+    results, nerr = mljr.func_screen(iter(hba), hbd, Y1, t=320.0, objective=objective, k=5, order=order)
+    assert nerr == 0
+    brute = fbrute(objective, 320.0, order)
+    assert len(results) == 5
+    for r, (score, a, b, y) in zip(results, brute):
+        assert r['score'] == pytest.approx(score, rel=1e-10)
+        assert (r['hba'], r['hbd']) == (a, b)
+        assert r['y1'] == pytest.approx(y)
+
+    # k larger than the cross product
+    results, nerr = mljr.func_screen(hba, hbd, Y1, t=320.0, objective=objective, k=100, order=order)
+    assert [r['score'] for r in results] == pytest.approx([i[0] for i in brute], rel=1e-10)
+
+
+def test_ties():
+    # same scores are in the sequence they are found
+    hbd = [fcomponent('OCCO') for i in range(3)]
+    for i,c in enumerate(hbd): c.name = 'hbd-{:}'.format(i)
+    results, nerr = mljr.func_screen([fcomponent(HBA[0])], hbd, [0.5], objective='Tcm', k=2)
+    assert [r['hbd'] for r in results] == ['hbd-0', 'hbd-1']
+    with pytest.raises(ValueError):
+        mljr.func_screen([], hbd, [0.5], objective='d')
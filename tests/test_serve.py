@@ -0,0 +1,92 @@
+import json
+import time
+import socket
+import threading
+import http.client
+
+import pytest
+
+from mljr import mljr
+
+
+SYSTEM = json.dumps({'type':'purity', 'smiles':'C[N+](C)(C)CCO.[Cl-]', 'id':1}) + '\n'
+
+
+def fserve(server):
+    server.cache = None
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def unix_server(tmp_path):
+    if not hasattr(socket,'AF_UNIX'): pytest.skip('Unix socket is not supported')
+    JSONLinesHandler, HTTPHandler, ThreadingUnixServer, ThreadingHTTPServer = mljr.func_serve_classes()
+    path = str(tmp_path / 'mljr.sock')
+    server = fserve(ThreadingUnixServer(path, JSONLinesHandler))
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def http_server():
+    JSONLinesHandler, HTTPHandler, ThreadingUnixServer, ThreadingHTTPServer = mljr.func_serve_classes()
+    server = fserve(ThreadingHTTPServer(('127.0.0.1',0), HTTPHandler))
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def fconnect(path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(10)
+    client.connect(path)
+    return client
+
+
+def test_socket(unix_server):
+    # a client which never reads its results does not block other clients
+    stalled = fconnect(unix_server)
+    sender = threading.Thread(target=lambda: stalled.sendall((SYSTEM * 5000).encode('utf-8')))
+    sender.daemon = True
+    sender.start()
+    # until the results fill the socket buffer, the writer of the stalled client is blocked
+    time.sleep(1.5)
+
+    client = fconnect(unix_server)
+    client.sendall((SYSTEM + '{"type":"purity"}\n').encode('utf-8'))
+    fin = client.makefile('r', encoding='utf-8')
+    rst = json.loads(fin.readline())
+    assert rst['id'] == 1
+    assert rst['Tc'] == pytest.approx(mljr.compute({'smiles':'C[N+](C)(C)CCO.[Cl-]'})['Tc'])
+    err = json.loads(fin.readline())
+    assert err['line'] == 2
+    assert 'error' in err
+    fin.close()
+    client.close()
+    stalled.close()
+
+
+def fpost(port, body, headers):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.putrequest('POST', '/')
+    for k,v in headers.items(): conn.putheader(k, v)
+    conn.endheaders()
+    if body: conn.send(body)
+    rsp = conn.getresponse()
+    data = json.loads(rsp.read().decode('utf-8'))
+    conn.close()
+    return rsp.status, data
+
+
+def test_http(http_server):
+    body = SYSTEM.encode('utf-8')
+    status, rst = fpost(http_server, body, {'Content-Length':str(len(body))})
+    assert status == 200
+    assert rst['id'] == 1
+    assert fpost(http_server, body, {})[0] == 411
+    for length in ['-1', 'abc']:
+        assert fpost(http_server, body, {'Content-Length':length})[0] == 400
@@ -0,0 +1,81 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from mljr import mljr
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = os.path.join(ROOT, 'samples')
+
+# components of samples, defined by SMILES
+SAMPLE_SMILES = {
+    'N-ethyl-N,N-dimethylethanolammonium-chloride-TFA.txt' : ['CC[N+](C)(C)CCO.[Cl-]', 'NC(=O)C(F)(F)F'],
+    'N-ethyl-N,N-dimethylethanolammonium-chloride-ethylene-glycol.txt' : ['CC[N+](C)(C)CCO.[Cl-]', 'OCCO'],
+    'ethylammonium-chloride-TFA.txt' : ['CC[NH3+].[Cl-]', 'NC(=O)C(F)(F)F'],
+    'ethylammonium-chloride-acetamide.txt' : ['CC[NH3+].[Cl-]', 'CC(N)=O'],
+    'ethylammonium-chloride-urea.txt' : ['CC[NH3+].[Cl-]', 'NC(N)=O'],
+}
+
+
+def fcomponent(smiles):
+    log, m, comp = mljr.func_pro_component(mljr.func_pro_spec({'smiles':smiles}))
+    assert log['nice'], log
+    return comp
+
+
+@pytest.mark.parametrize('file', sorted(SAMPLE_SMILES))
+def test_samples(file):
+    fdict = mljr.func_pro_spec(os.path.join(SAMPLES, file))
+    for i,smiles in enumerate(SAMPLE_SMILES[file]):
+        log, m, comp = mljr.func_pro_component(fdict, i+1)
+        assert log['nice'], log
+        other = fcomponent(smiles)
+        assert list(other.counts) == list(comp.counts)
+        assert other.M == pytest.approx(comp.M)
+
+
+@pytest.mark.parametrize('smiles, groups, M', [
+    ('C[N+](C)(C)CCO.[Cl-]', {'no-ring':{'-CH3':3, '>N-':1, '-CH2-':2, '-OH':1, '-Cl':1}}, 139.622),
+    ('OCC(O)CO', {'no-ring':{'-OH':3, '-CH2-':2, '>CH-':1}}, 92.094),
+    ('NC(N)=O', {'no-ring':{'-NH2':2, '>C=O':1}}, 60.062),
+    ('CC[NH3+].[Cl-]', {'no-ring':{'-CH3':1, '-CH2-':1, '>N-':1, '-Cl':1}}, 81.544),
+    ('OC=O', {'no-ring':{'-COOH':1}}, 46.026),
+    ('CC(=O)O', {'no-ring':{'-COOH':1, '-CH3':1}}, 60.052),
+    ('[O-]C=O', {'no-ring':{'HCOO-':1}}, 45.018),
+    ('CC(=O)[O-]', {'no-ring':{'-COO-':1, '-CH3':1}}, 59.044),
+    ('Oc1ccccc1', {'ring':{'=CH-':5, '=C<':1, '-OH':1}}, 94.108),
+])
+def test_groups(smiles, groups, M):
+    log, rst, m = mljr.func_pro_smiles(smiles)
+    assert log['nice'], log
+    assert rst == groups
+    assert m == pytest.approx(M, abs=1e-3)
+
+
+@pytest.mark.parametrize('smiles', ['[O-]C', 'C1CC', 'CC(C', 'C%1', 'CX'])
+def test_errors(smiles):
+    log, rst, m = mljr.func_pro_smiles(smiles)
+    assert not log['nice']
+    assert rst == {}
+
+
+def test_key():
+    # same molecule in different SMILES
+    keys = [mljr.func_pro_smiles_key(*mljr.func_pro_smiles_graph(s)) for s in ['OCC(O)CO', 'C(CO)(O)CO', 'OCC(CO)O']]
+    assert len(set(keys)) == 1
+    assert keys[0] != mljr.func_pro_smiles_key(*mljr.func_pro_smiles_graph('OCCCO'))
+
+    # non-isomorphic graphs which cannot be told apart by refining atom invariants alone
+    for pair in [('C1CCCCC1', 'C1CC1.C1CC1'), ('C1CCC2CCCCC2C1', 'C1CCC(C1)C1CCCC1'), ('C1CCCCC1.CC', 'C1CCCC1.CCC')]:
+        a, b = [mljr.func_pro_smiles_key(*mljr.func_pro_smiles_graph(s)) for s in pair]
+        assert a != b, pair
+
+    # independent of hash randomization
+    code = 'from mljr import mljr; print(mljr.func_pro_smiles_key(*mljr.func_pro_smiles_graph("OCC(O)CO")))'
+    for seed in ['1', '2']:
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, stdout=subprocess.PIPE, check=True)
+        assert out.stdout.decode().strip() == keys[0]
@@ -0,0 +1,64 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from mljr import mljr
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# milliseconds, best of runs of `import mljr`, interpreter startup is excluded
+IMPORT_BUDGET = float(os.environ.get('MLJR_IMPORT_BUDGET', 50))
+
+# modules only imported by the features using them
+DEFERRED = ['numpy', 'argparse', 'asyncio', 'sqlite3', 'hashlib', 'concurrent.futures', 'http.server']
+
+
+def frun(code, env=None):
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, stdout=subprocess.PIPE, check=True)
+    return out.stdout.decode('utf-8')
+
+
+def test_import_time():
+    # bytecode is written by the first run, same as an installed package
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = 'import time; beg = time.perf_counter(); import mljr; print(time.perf_counter() - beg)'
+    best = min([float(frun(code, env)) for i in range(5)]) * 1000
+    assert best < IMPORT_BUDGET, 'import mljr takes {:.1f} ms, over budget {:.1f} ms'.format(best, IMPORT_BUDGET)
+
+
+@pytest.mark.parametrize('argv', [[], ['-v'], ['-g'], ['--avail-group-name']])
+def test_deferred(argv):
+    # -v and -g build no parser
+    code = 'import sys; sys.argv = ["mljr"] + {:}\n'.format(repr(argv))
+    code += 'import mljr.mljr\n'
+    if argv:
+        code += 'try:\n    mljr.mljr.main()\nexcept SystemExit:\n    pass\n'
+    code += 'print("imported:", " ".join([m for m in {:} if m in sys.modules]))'.format(repr(DEFERRED))
+    out = frun(code).rstrip('\n').split('\n')
+    assert out[-1] == 'imported: '
+
+
+def test_groups_fast_path():
+    assert frun('import sys; sys.argv = ["mljr", "-g"]; import mljr.mljr; mljr.mljr.main()') == \
+           frun('import sys; sys.argv = ["mljr", "-g", "-o"]; import mljr.mljr; mljr.mljr.main()')
+
+
+def test_snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / '_tables.bin')
+    mljr.func_write_snapshot(path)
+    tables = mljr.func_load_snapshot(path)
+    for key, data in [('ring',mljr.DATA_LJR_RING), ('no-ring',mljr.DATA_LJR_NO_RING)]:
+        expected = mljr.func_proDATA(data)
+        loaded = mljr.GroupTable.from_snapshot(*tables[key])
+        assert list(loaded) == list(expected)
+        assert loaded.index == expected.index
+        assert loaded.lookup('-cl') == expected.lookup('-cl')
+
+    # outdated snapshot is not used
+    monkeypatch.setattr(mljr, '__version__', 0.0)
+    assert mljr.func_load_snapshot(path) is None
+    assert mljr.func_load_snapshot(str(tmp_path / 'missing.bin')) is None